@@ -0,0 +1,420 @@
+"""Asyncio counterpart of api.auth.repo for use inside request handlers.
+
+Function names, arguments and return shapes match api.auth.repo; the SQL is
+shared so the two surfaces cannot drift apart.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any, Optional
+from uuid import UUID, uuid4
+
+from api.auth import repo
+from api.auth.audit_buffer import AUDIT_BUFFER_ENABLED, audit_buffer
+from api.auth.profile_cache import profile_cache
+from api.auth.repo import User
+from api.auth.user_cache import user_cache
+from api.db import READ_YOUR_WRITES, async_db_conn, note_write, run_read_async
+
+
+def _prepare(sql: str) -> bool | None:
+    # Hot statements are prepared on first use per connection; everything else
+    # falls back to psycopg's prepare_threshold heuristic.
+    return True if sql in _PREPARED_SQL else None
+
+
+async def _fetchone(sql: str, params: tuple[Any, ...], *, replica_key: Any = None) -> Any:
+    """One row from the primary, or (with `replica_key`) a READ_YOUR_WRITES replica read."""
+
+    async def _query(conn: Any) -> Any:
+        async with conn.cursor() as cur:
+            await cur.execute(sql, params, prepare=_prepare(sql))
+            return await cur.fetchone()
+
+    if replica_key is not None:
+        return await run_read_async(_query, read=READ_YOUR_WRITES, key=replica_key)
+    async with async_db_conn() as conn:
+        return await _query(conn)
+
+
+async def _fetchall(sql: str, params: tuple[Any, ...], *, replica_key: Any = None) -> list[Any]:
+    async def _query(conn: Any) -> list[Any]:
+        async with conn.cursor() as cur:
+            await cur.execute(sql, params, prepare=_prepare(sql))
+            return list(await cur.fetchall() or [])
+
+    if replica_key is not None:
+        return await run_read_async(_query, read=READ_YOUR_WRITES, key=replica_key)
+    async with async_db_conn() as conn:
+        return await _query(conn)
+
+
+async def _execute(sql: str, params: tuple[Any, ...]) -> None:
+    async with async_db_conn() as conn:
+        await conn.execute(sql, params, prepare=_prepare(sql))
+
+
+async def create_user(*, email: str, password_hash: str) -> User:
+    user_id = uuid4()
+    normalized_email = email.strip().lower()
+    row = await _fetchone(repo.SQL_CREATE_USER, (str(user_id), normalized_email, password_hash))
+    note_write(repo._user_key(user_id))
+    return repo._user_from_row(row)
+
+
+async def get_user_by_email(email: str) -> Optional[User]:
+    normalized_email = email.strip().lower()
+    row = await _fetchone(repo.SQL_GET_USER_BY_EMAIL, (normalized_email,))
+    if not row:
+        return None
+    return repo._user_from_row(row)
+
+
+async def get_user_by_id(user_id: UUID, *, primary: bool = False) -> Optional[User]:
+    replica_key = None if primary else repo._user_key(user_id)
+    row = await _fetchone(repo.SQL_GET_USER_BY_ID, (str(user_id),), replica_key=replica_key)
+    if not row:
+        return None
+    return repo._user_from_row(row)
+
+
+async def update_profile(*, user_id: UUID, display_name: str | None, avatar_url: str | None, bio: str | None) -> User:
+    sql, values = repo._profile_update_sql(display_name=display_name, avatar_url=avatar_url, bio=bio)
+
+    if not sql:
+        u = await get_user_by_id(user_id)
+        if u is None:
+            raise RuntimeError("user_not_found")
+        return u
+
+    values.append(str(user_id))
+    row = await _fetchone(sql, tuple(values))
+    user_cache.invalidate(user_id)
+    await profile_cache.invalidate(user_id)
+    note_write(repo._user_key(user_id))
+    if not row:
+        raise RuntimeError("user_not_found")
+    return repo._user_from_row(row)
+
+
+async def get_user_lock_state(*, user_id: UUID) -> dict[str, Any]:
+    row = await _fetchone(repo.SQL_GET_USER_LOCK_STATE, (str(user_id),))
+    return repo._lock_state_from_row(row)
+
+
+async def register_login_failure(*, user_id: UUID, max_failures: int, lock_minutes: int) -> dict[str, Any]:
+    mf = max(1, int(max_failures))
+    lm = max(1, int(lock_minutes))
+    row = await _fetchone(repo.SQL_REGISTER_LOGIN_FAILURE, (mf, str(lm), str(user_id)))
+    return repo._lock_state_from_row(row)
+
+
+async def reset_login_failures(*, user_id: UUID) -> None:
+    await _execute(repo.SQL_RESET_LOGIN_FAILURES, (str(user_id),))
+
+
+async def insert_audit_event(*, user_id: UUID | None, action: str, ip: str, user_agent: str, metadata: dict[str, Any] | None = None) -> None:
+    params = repo._audit_event_params(user_id=user_id, action=action, ip=ip, user_agent=user_agent, metadata=metadata)
+    if AUDIT_BUFFER_ENABLED:
+        # Off the request path: written in batches by the audit buffer thread.
+        audit_buffer.add(repo._buffered_audit_row(params))
+        return
+    await _execute(repo.SQL_INSERT_AUDIT_EVENT, params)
+
+
+async def create_refresh_token(
+    *,
+    user_id: UUID,
+    token_hash: str,
+    ttl_days: int,
+    ip: str,
+    user_agent: str,
+) -> tuple[UUID, datetime]:
+    token_id = uuid4()
+    expires_at = repo._utcnow() + timedelta(days=ttl_days)
+    await _execute(
+        repo.SQL_CREATE_REFRESH_TOKEN,
+        (str(token_id), str(user_id), token_hash, expires_at, ip or "", user_agent or ""),
+    )
+    note_write(repo._user_key(user_id))
+    return token_id, expires_at
+
+
+async def find_refresh_token(*, token_hash: str) -> Optional[dict[str, Any]]:
+    row = await _fetchone(repo.SQL_FIND_REFRESH_TOKEN, (token_hash,))
+    if not row:
+        return None
+    return repo._refresh_token_from_row(row)
+
+
+async def touch_refresh_token(*, token_id: UUID, ip: str, user_agent: str) -> None:
+    await _execute(repo.SQL_TOUCH_REFRESH_TOKEN, (ip or "", user_agent or "", str(token_id)))
+
+
+async def list_active_refresh_sessions(*, user_id: UUID) -> list[dict[str, Any]]:
+    rows = await _fetchall(repo.SQL_LIST_ACTIVE_REFRESH_SESSIONS, (str(user_id),), replica_key=repo._user_key(user_id))
+    return [repo._session_from_row(r) for r in rows]
+
+
+async def revoke_all_refresh_tokens_except(*, user_id: UUID, keep_token_id: UUID) -> None:
+    await _execute(repo.SQL_REVOKE_ALL_REFRESH_TOKENS_EXCEPT, (str(user_id), str(keep_token_id)))
+    note_write(repo._user_key(user_id))
+
+
+async def revoke_refresh_token(*, token_id: UUID, replaced_by_token_id: UUID | None = None) -> None:
+    await _execute(
+        repo.SQL_REVOKE_REFRESH_TOKEN,
+        (str(replaced_by_token_id) if replaced_by_token_id else None, str(token_id)),
+    )
+
+
+async def revoke_all_refresh_tokens(*, user_id: UUID) -> None:
+    await _execute(repo.SQL_REVOKE_ALL_REFRESH_TOKENS, (str(user_id),))
+    note_write(repo._user_key(user_id))
+
+
+async def set_user_email_verified(*, user_id: UUID) -> None:
+    await _execute(repo.SQL_SET_USER_EMAIL_VERIFIED, (str(user_id),))
+    user_cache.invalidate(user_id)
+    await profile_cache.invalidate(user_id)
+    note_write(repo._user_key(user_id))
+
+
+async def set_user_password_hash(*, user_id: UUID, password_hash: str) -> None:
+    await _execute(repo.SQL_SET_USER_PASSWORD_HASH, (password_hash, str(user_id)))
+    user_cache.invalidate(user_id)
+    note_write(repo._user_key(user_id))
+
+
+async def update_user_email(*, user_id: UUID, email: str) -> None:
+    normalized = (email or "").strip().lower()
+    if not normalized:
+        raise ValueError("invalid_email")
+
+    async with async_db_conn() as conn, conn.cursor() as cur:
+        # Ensure unique email (best-effort; DB unique constraint will also enforce).
+        await cur.execute(repo.SQL_EMAIL_TAKEN_BY_OTHER, (normalized, str(user_id)))
+        if await cur.fetchone() is not None:
+            raise ValueError("email_taken")
+
+        await cur.execute(repo.SQL_UPDATE_USER_EMAIL, (normalized, str(user_id)))
+    user_cache.invalidate(user_id)
+    await profile_cache.invalidate(user_id)
+    note_write(repo._user_key(user_id))
+
+
+async def create_one_time_token(*, user_id: UUID | None, token_hash: str, token_type: str, ttl_minutes: int) -> tuple[UUID, datetime]:
+    token_id = uuid4()
+    expires_at = repo._utcnow() + timedelta(minutes=max(1, int(ttl_minutes)))
+    await _execute(
+        repo.SQL_CREATE_ONE_TIME_TOKEN,
+        (str(token_id), (str(user_id) if user_id else None), token_hash, token_type, expires_at),
+    )
+    return token_id, expires_at
+
+
+async def find_one_time_token(*, token_hash: str, token_type: str) -> Optional[dict[str, Any]]:
+    row = await _fetchone(repo.SQL_FIND_ONE_TIME_TOKEN, (token_hash, token_type))
+    if not row:
+        return None
+    return repo._one_time_token_from_row(row)
+
+
+async def consume_one_time_token(*, token_id: UUID) -> None:
+    await _execute(repo.SQL_CONSUME_ONE_TIME_TOKEN, (str(token_id),))
+
+
+async def find_oauth_account(*, provider: str, provider_account_id: str) -> Optional[dict[str, Any]]:
+    row = await _fetchone(
+        repo.SQL_FIND_OAUTH_ACCOUNT,
+        (provider, provider_account_id),
+        replica_key=repo._oauth_key(provider, provider_account_id),
+    )
+    if not row:
+        return None
+    return repo._oauth_account_from_row(row)
+
+
+async def create_oauth_account(*, user_id: UUID, provider: str, provider_account_id: str, email: str = "") -> UUID:
+    account_id = uuid4()
+    await _execute(
+        repo.SQL_CREATE_OAUTH_ACCOUNT,
+        (str(account_id), str(user_id), provider, provider_account_id, (email or "")),
+    )
+    note_write(repo._oauth_key(provider, provider_account_id))
+    return account_id
+
+
+# Login is the hottest write path, so its bookkeeping is collapsed into as few
+# round trips as possible: one read for user + lockout state, and one
+# data-modifying CTE for either the success or the failure outcome.
+SQL_GET_USER_FOR_LOGIN = f"""
+    SELECT {repo._USER_COLUMNS}, failed_login_attempts, locked_until
+    FROM api_auth_users
+    WHERE email=%s
+"""
+
+SQL_COMPLETE_LOGIN = """
+    WITH new_token AS (
+      INSERT INTO api_auth_refresh_tokens(id, user_id, token_hash, expires_at, ip, user_agent)
+      VALUES (%s, %s, %s, %s, %s, %s)
+      RETURNING user_id
+    ), reset_lockout AS (
+      UPDATE api_auth_users
+      SET failed_login_attempts = 0,
+          locked_until = NULL,
+          updated_at = NOW()
+      WHERE id = (SELECT user_id FROM new_token)
+        AND (failed_login_attempts <> 0 OR locked_until IS NOT NULL)
+    )
+    INSERT INTO api_auth_audit_events(id, user_id, action, ip, user_agent, metadata_json)
+    VALUES (%s, %s, %s, %s, %s, %s::jsonb)
+"""
+
+SQL_RECORD_LOGIN_FAILURE = f"""
+    WITH failure AS (
+      {repo.SQL_REGISTER_LOGIN_FAILURE}
+    ), audit AS (
+      INSERT INTO api_auth_audit_events(id, user_id, action, ip, user_agent, metadata_json)
+      VALUES (%s, %s, %s, %s, %s, %s::jsonb)
+    )
+    SELECT failed_login_attempts, locked_until FROM failure
+"""
+
+# Refresh rotation in one statement. The UPDATE only matches a live token, and
+# a concurrent rotation of the same token blocks on its row lock, then
+# re-checks `revoked_at IS NULL` and matches nothing, so exactly one wins.
+SQL_ROTATE_REFRESH_TOKEN = f"""
+    WITH old_token AS (
+      UPDATE api_auth_refresh_tokens AS t
+      SET revoked_at = NOW(),
+          replaced_by_token_id = %s,
+          last_seen_at = NOW(),
+          ip = %s,
+          user_agent = %s
+      WHERE t.token_hash = %s
+        AND t.revoked_at IS NULL
+        AND t.expires_at > NOW()
+      RETURNING t.user_id
+    ), account AS (
+      SELECT {", ".join(f"u.{c.strip()}" for c in repo._USER_COLUMNS.split(","))}
+      FROM api_auth_users AS u
+      JOIN old_token ON old_token.user_id = u.id
+    ), new_token AS (
+      INSERT INTO api_auth_refresh_tokens(id, user_id, token_hash, expires_at, ip, user_agent)
+      SELECT %s::uuid, id, %s, %s::timestamptz, %s, %s FROM account
+    ), audit AS (
+      INSERT INTO api_auth_audit_events(id, user_id, action, ip, user_agent, metadata_json)
+      SELECT %s::uuid, id, %s, %s, %s, %s::jsonb FROM account
+    )
+    SELECT {repo._USER_COLUMNS} FROM account
+"""
+
+
+async def get_user_for_login(email: str) -> Optional[tuple[User, dict[str, Any]]]:
+    """Return (user, lock_state) for an email in a single query."""
+    normalized_email = email.strip().lower()
+    row = await _fetchone(SQL_GET_USER_FOR_LOGIN, (normalized_email,))
+    if not row:
+        return None
+    return repo._user_from_row(row), repo._lock_state_from_row(row[8:])
+
+
+async def complete_login(
+    *,
+    user_id: UUID,
+    token_hash: str,
+    ttl_days: int,
+    ip: str,
+    user_agent: str,
+    action: str = "auth.login",
+) -> tuple[UUID, datetime]:
+    """Insert the refresh token, clear lockout state and write the audit row atomically."""
+    token_id = uuid4()
+    expires_at = repo._utcnow() + timedelta(days=ttl_days)
+    audit = repo._audit_event_params(user_id=user_id, action=action, ip=ip, user_agent=user_agent, metadata=None)
+    await _execute(
+        SQL_COMPLETE_LOGIN,
+        (str(token_id), str(user_id), token_hash, expires_at, ip or "", user_agent or "", *audit),
+    )
+    note_write(repo._user_key(user_id))
+    return token_id, expires_at
+
+
+async def record_login_failure(*, user_id: UUID, max_failures: int, lock_minutes: int, ip: str, user_agent: str) -> dict[str, Any]:
+    """Bump the failure counter (locking if needed) and audit the failure in one statement."""
+    mf = max(1, int(max_failures))
+    lm = max(1, int(lock_minutes))
+    audit = repo._audit_event_params(user_id=user_id, action="auth.login_failed", ip=ip, user_agent=user_agent, metadata=None)
+    row = await _fetchone(SQL_RECORD_LOGIN_FAILURE, (mf, str(lm), str(user_id), *audit))
+    return repo._lock_state_from_row(row)
+
+
+async def rotate_refresh_token(
+    *,
+    token_hash: str,
+    new_token_hash: str,
+    ttl_days: int,
+    ip: str,
+    user_agent: str,
+) -> Optional[tuple[User, UUID, datetime]]:
+    """Revoke a live refresh token and issue its replacement atomically.
+
+    Returns (user, new_token_id, new_expires_at), or None when the token is
+    unknown, revoked, expired or was rotated concurrently.
+    """
+    new_token_id = uuid4()
+    expires_at = repo._utcnow() + timedelta(days=ttl_days)
+    event_id, _no_user, action, audit_ip, audit_ua, metadata_json = repo._audit_event_params(
+        user_id=None, action="auth.refresh", ip=ip, user_agent=user_agent, metadata=None
+    )
+    row = await _fetchone(
+        SQL_ROTATE_REFRESH_TOKEN,
+        (
+            str(new_token_id),
+            ip or "",
+            user_agent or "",
+            token_hash,
+            str(new_token_id),
+            new_token_hash,
+            expires_at,
+            ip or "",
+            user_agent or "",
+            event_id,
+            action,
+            audit_ip,
+            audit_ua,
+            metadata_json,
+        ),
+    )
+    if not row:
+        return None
+    user = repo._user_from_row(row)
+    note_write(repo._user_key(user.id))
+    # A refresh is usually followed by /auth/me: serve it from the fresh row.
+    user_cache.put(user)
+    return user, new_token_id, expires_at
+
+
+# Statement registry: the fixed-shape queries on the login, refresh and
+# authenticated-request paths. psycopg prepares each one server-side the first
+# time a pooled connection runs it, then executes it by name (Bind/Execute only)
+# so Postgres skips parsing and planning. See DB_PREPARED_STATEMENTS.
+PREPARED_STATEMENTS: dict[str, str] = {
+    "get_user_by_id": repo.SQL_GET_USER_BY_ID,
+    "get_user_by_email": repo.SQL_GET_USER_BY_EMAIL,
+    "get_user_for_login": SQL_GET_USER_FOR_LOGIN,
+    "complete_login": SQL_COMPLETE_LOGIN,
+    "record_login_failure": SQL_RECORD_LOGIN_FAILURE,
+    "rotate_refresh_token": SQL_ROTATE_REFRESH_TOKEN,
+    "insert_audit_event": repo.SQL_INSERT_AUDIT_EVENT,
+    "create_refresh_token": repo.SQL_CREATE_REFRESH_TOKEN,
+    "find_refresh_token": repo.SQL_FIND_REFRESH_TOKEN,
+    "touch_refresh_token": repo.SQL_TOUCH_REFRESH_TOKEN,
+    "revoke_refresh_token": repo.SQL_REVOKE_REFRESH_TOKEN,
+    "list_active_refresh_sessions": repo.SQL_LIST_ACTIVE_REFRESH_SESSIONS,
+    "find_one_time_token": repo.SQL_FIND_ONE_TIME_TOKEN,
+}
+
+_PREPARED_SQL = frozenset(PREPARED_STATEMENTS.values())
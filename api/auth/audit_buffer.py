@@ -0,0 +1,327 @@
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager, suppress
+from typing import Any
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+try:  # POSIX only; the API runs in Linux containers.
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+
+logger = logging.getLogger("api.audit")
+
+# Rows are built by repo._buffered_audit_row:
+# (id, user_id, action, ip, user_agent, metadata_json, created_at).
+AuditRow = tuple[Any, ...]
+
+# created_at is stamped when the event happens, not when the batch is written:
+# it is part of the (partitioned) table's primary key, so a replayed row
+# conflicts with its earlier copy instead of being inserted twice.
+SQL_INSERT_AUDIT_EVENTS = """
+    INSERT INTO api_auth_audit_events(id, user_id, action, ip, user_agent, metadata_json, created_at)
+    VALUES %s
+    ON CONFLICT DO NOTHING
+"""
+_VALUES_TEMPLATE = "(%s, %s, %s, %s, %s, %s::jsonb, COALESCE(%s::timestamptz, NOW()))"
+_ROW_LEN = 7
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    raw = os.getenv(name)
+    if raw is None or not raw.strip():
+        return default
+    return raw.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _is_row_error(exc: BaseException) -> bool:
+    """True when the row itself is bad (FK or constraint violation, bad data), not the database."""
+    return isinstance(exc, (psycopg2.IntegrityError, psycopg2.DataError))
+
+
+def _write_rows(rows: list[AuditRow]) -> None:
+    from api.db import db_conn
+
+    with db_conn() as conn:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            execute_values(cur, SQL_INSERT_AUDIT_EVENTS, rows, template=_VALUES_TEMPLATE, page_size=len(rows) or 1)
+
+
+class AuditBuffer:
+    """Collects audit rows in memory and writes them with one multi-row INSERT.
+
+    A background thread flushes every `flush_interval_ms`, or as soon as
+    `flush_max_events` rows are pending. If the insert fails, the batch is
+    appended to `spill_path` (JSON lines) and replayed before the next
+    successful flush. Event ids and timestamps are generated client-side and
+    inserts use ON CONFLICT DO NOTHING, so a replay never duplicates rows.
+
+    A batch the database rejects because of its data (e.g. the user was
+    deleted before the flush) is retried row by row; rows that still fail go
+    to `<spill_path>.dead` and are not retried. `add()` never does I/O: when
+    the backlog passes `max_pending` it is handed to the flusher thread to
+    spill, or dropped (and counted) if an earlier backlog is still waiting.
+    Every worker process shares the spill file, so appends and replays hold
+    an exclusive lock on `<spill_path>.lock`.
+    """
+
+    def __init__(
+        self,
+        *,
+        write: Callable[[list[AuditRow]], None] = _write_rows,
+        flush_max_events: int = 100,
+        flush_interval_ms: int = 200,
+        max_pending: int = 10000,
+        spill_path: str = "",
+    ) -> None:
+        self._write = write
+        self.flush_max_events = max(1, int(flush_max_events))
+        self.flush_interval_sec = max(1, int(flush_interval_ms)) / 1000
+        self.max_pending = max(1, int(max_pending))
+        self.spill_path = spill_path
+        self._pending: list[AuditRow] = []
+        # Backlog moved out of memory by add(), spilled by the flusher thread.
+        self._overflow: list[AuditRow] = []
+        self._cond = threading.Condition()
+        # Serializes writes (flusher thread vs. explicit flush()).
+        self._write_lock = threading.Lock()
+        self._file_lock_depth = 0
+        self._thread: threading.Thread | None = None
+        self._pid = 0
+        self._stopping = False
+        self.flushed = 0
+        self.spilled = 0
+        self.failures = 0
+        self.quarantined = 0
+        self.dropped = 0
+
+    @classmethod
+    def from_env(cls) -> AuditBuffer:
+        return cls(
+            flush_max_events=int(os.getenv("AUDIT_FLUSH_MAX_EVENTS", "100") or 100),
+            flush_interval_ms=int(os.getenv("AUDIT_FLUSH_INTERVAL_MS", "200") or 200),
+            max_pending=int(os.getenv("AUDIT_BUFFER_MAX_PENDING", "10000") or 10000),
+            spill_path=os.getenv("AUDIT_SPILL_PATH", "/tmp/base2-audit-spill.jsonl") or "",
+        )
+
+    def add(self, row: AuditRow) -> None:
+        # Runs on the event loop: only in-memory work here.
+        with self._cond:
+            self._ensure_thread()
+            self._pending.append(row)
+            if len(self._pending) > self.max_pending:
+                # The database is not keeping up: the flusher spills the
+                # backlog to disk instead of memory growing without bound.
+                if self._overflow:
+                    self.dropped += len(self._pending)
+                    with suppress(Exception):
+                        logger.error("audit_events_dropped", extra={"events": len(self._pending)})
+                else:
+                    self._overflow = self._pending
+                self._pending = []
+                self._cond.notify()
+            elif len(self._pending) >= self.flush_max_events:
+                self._cond.notify()
+
+    def flush(self) -> None:
+        """Write everything pending now (shutdown hook, tests, short-lived scripts)."""
+        with self._cond:
+            rows, self._pending = self._pending, []
+            overflow, self._overflow = self._overflow, []
+        self._spill_overflow(overflow)
+        self._flush_rows(rows)
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._pending) + len(self._overflow)
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+            thread = self._thread
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=5)
+        self.flush()
+
+    def _ensure_thread(self) -> None:
+        # Called with self._cond held. A forked child inherits the parent's
+        # state but not its thread: start a fresh flusher there.
+        pid = os.getpid()
+        if self._thread is not None and self._pid == pid and self._thread.is_alive():
+            return
+        self._pid = pid
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="audit-buffer", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._stopping and not self._overflow and len(self._pending) < self.flush_max_events:
+                    self._cond.wait(self.flush_interval_sec)
+                rows, self._pending = self._pending, []
+                overflow, self._overflow = self._overflow, []
+                stopping = self._stopping
+            self._spill_overflow(overflow)
+            self._flush_rows(rows)
+            if stopping:
+                return
+
+    def _spill_overflow(self, rows: list[AuditRow]) -> None:
+        if rows:
+            with self._write_lock:
+                self._spill(rows)
+
+    def _flush_rows(self, rows: list[AuditRow]) -> None:
+        with self._write_lock:
+            try:
+                self._replay_spill()
+                if rows:
+                    self.flushed += self._write_batch(rows)
+            except Exception as e:
+                self.failures += 1
+                with suppress(Exception):
+                    logger.warning("audit_flush_failed", extra={"events": len(rows), "error": str(e)})
+                if rows:
+                    self._spill(rows)
+
+    def _write_batch(self, rows: list[AuditRow]) -> int:
+        """Insert rows, quarantining the ones the database rejects; raises if it is unavailable.
+
+        Returns the number of rows written.
+        """
+        try:
+            self._write(rows)
+            return len(rows)
+        except Exception as e:
+            if not _is_row_error(e):
+                raise
+        written = 0
+        for row in rows:
+            try:
+                self._write([row])
+                written += 1
+            except Exception as e:
+                if not _is_row_error(e):
+                    raise
+                self._quarantine(row, e)
+        return written
+
+    def _quarantine(self, row: AuditRow, error: Exception) -> None:
+        self.quarantined += 1
+        with suppress(Exception):
+            logger.error(
+                "audit_event_quarantined",
+                extra={"event_id": str(row[0]), "audit_action": str(row[2]), "error": str(error)},
+            )
+        if self.spill_path:
+            self._append_lines(f"{self.spill_path}.dead", [row], event="audit_dead_letter_failed")
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        # Serializes spill appends and replays across worker processes;
+        # _write_lock only covers threads of this process. Callers hold
+        # _write_lock, so the depth counter makes it reentrant (a replay
+        # quarantining a row appends to the dead-letter file).
+        if fcntl is None or self._file_lock_depth:
+            self._file_lock_depth += 1
+            try:
+                yield
+            finally:
+                self._file_lock_depth -= 1
+            return
+        with open(f"{self.spill_path}.lock", "a", encoding="utf-8") as lock:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            self._file_lock_depth += 1
+            try:
+                yield
+            finally:
+                self._file_lock_depth -= 1
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+    def _append_lines(self, path: str, rows: list[AuditRow], *, event: str) -> bool:
+        try:
+            with self._file_lock(), open(path, "a", encoding="utf-8") as f:
+                for row in rows:
+                    f.write(json.dumps(list(row)) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            return True
+        except Exception as e:
+            with suppress(Exception):
+                logger.error(event, extra={"events": len(rows), "error": str(e)})
+            return False
+
+    def _spill(self, rows: list[AuditRow]) -> None:
+        # Called with self._write_lock held, so a replay never renames the file mid-append.
+        if not self.spill_path:
+            self.dropped += len(rows)
+            with suppress(Exception):
+                logger.error("audit_events_dropped", extra={"events": len(rows)})
+            return
+        if self._append_lines(self.spill_path, rows, event="audit_spill_failed"):
+            self.spilled += len(rows)
+
+    def _replay_spill(self) -> None:
+        # Called with self._write_lock held; raises if the database is still down.
+        if not self.spill_path:
+            return
+        replaying = f"{self.spill_path}.replay"
+        if not (os.path.exists(replaying) or os.path.exists(self.spill_path)):
+            return
+        with self._file_lock():
+            while os.path.exists(replaying) or os.path.exists(self.spill_path):
+                # A leftover .replay is from an interrupted replay; it goes first.
+                if not os.path.exists(replaying):
+                    os.replace(self.spill_path, replaying)
+                with open(replaying, encoding="utf-8") as f:
+                    # Spill files written before created_at was buffered hold
+                    # six columns; those rows get the replay time.
+                    rows = [
+                        (*row, *(None,) * (_ROW_LEN - len(row)))
+                        for row in (tuple(json.loads(line)) for line in f if line.strip())
+                    ]
+                for i in range(0, len(rows), self.flush_max_events):
+                    self._write_batch(rows[i : i + self.flush_max_events])
+                os.remove(replaying)
+                with suppress(Exception):
+                    logger.info("audit_spill_replayed", extra={"events": len(rows)})
+
+    def samples(self) -> list[tuple[str, str, str, dict[str, str], float]]:
+        return [
+            ("base2_api_audit_buffer_pending", "gauge", "Audit events waiting to be written", {}, self.pending()),
+            ("base2_api_audit_events_written_total", "counter", "Audit events written by the buffered writer", {}, self.flushed),
+            ("base2_api_audit_events_spilled_total", "counter", "Audit events written to the local spill file", {}, self.spilled),
+            ("base2_api_audit_flush_failures_total", "counter", "Failed audit batch inserts", {}, self.failures),
+            ("base2_api_audit_events_quarantined_total", "counter", "Audit events the database rejected, moved to the dead-letter file", {}, self.quarantined),
+            ("base2_api_audit_events_dropped_total", "counter", "Audit events dropped because nothing could hold them", {}, self.dropped),
+        ]
+
+
+# AUDIT_BUFFER_ENABLED=false restores one synchronous INSERT per event.
+AUDIT_BUFFER_ENABLED = _env_bool("AUDIT_BUFFER_ENABLED", True)
+
+audit_buffer = AuditBuffer.from_env()
+
+
+def flush_audit_events() -> None:
+    audit_buffer.flush()
+
+
+atexit.register(audit_buffer.stop)
+
+with suppress(ImportError):
+    from api.metrics import metrics
+
+    metrics.register_collector(audit_buffer.samples)
@@ -0,0 +1,95 @@
+"""FastAPI dependencies for bearer-authenticated routes.
+
+The access token is decoded at most once per request and the user id is kept
+on `request.state` for anything else in the request that needs it.
+
+GET /users/me and GET /auth/me depend on `CurrentProfile`, which reads the
+shared Redis profile cache first and falls back to the user row (through the
+per-process user cache). Only a missing user is a 401; database errors
+propagate to the app's error handlers.
+"""
+
+from __future__ import annotations
+
+from typing import Annotated, Any, Optional
+from uuid import UUID
+
+from fastapi import Depends, HTTPException, Request
+
+from api.auth import async_repo
+from api.auth.profile_cache import profile_cache, profile_of
+from api.auth.repo import User
+from api.auth.tokens import decode_access_token
+from api.auth.user_cache import user_cache
+
+
+def _not_authenticated() -> HTTPException:
+    return HTTPException(status_code=401, detail="Not authenticated")
+
+
+def _bearer_token(request: Request) -> str:
+    auth = request.headers.get("authorization", "")
+    if not auth.lower().startswith("bearer "):
+        raise _not_authenticated()
+    token = auth.split(" ", 1)[1].strip()
+    if not token:
+        raise _not_authenticated()
+    return token
+
+
+async def load_user(user_id: UUID) -> Optional[User]:
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
+    user = await async_repo.get_user_by_id(user_id)
+    if user is not None:
+        user_cache.put(user)
+    return user
+
+
+async def load_profile(user_id: UUID) -> Optional[dict[str, Any]]:
+    profile, version = await profile_cache.get(user_id)
+    if profile is not None:
+        return profile
+    if version is None:
+        # Redis was not consulted; nothing will be stored, so the per-process
+        # cache is as good as the primary.
+        user = await load_user(user_id)
+        return profile_of(user) if user is not None else None
+    # What is stored here is served to every worker for the cache TTL, so it
+    # is read from the primary: the local cache and a lagging replica may both
+    # predate a write made by another worker.
+    user = await async_repo.get_user_by_id(user_id, primary=True)
+    if user is None:
+        return None
+    user_cache.put(user)
+    profile = profile_of(user)
+    await profile_cache.put(user_id, version, profile)
+    return profile
+
+
+async def get_current_user_id(request: Request) -> UUID:
+    user_id = getattr(request.state, "user_id", None)
+    if isinstance(user_id, UUID):
+        return user_id
+
+    token = _bearer_token(request)
+    try:
+        payload = decode_access_token(token)
+        user_id = UUID(str(payload.get("sub")))
+    except Exception as e:
+        raise _not_authenticated() from e
+
+    request.state.user_id = user_id
+    return user_id
+
+
+async def get_current_profile(request: Request) -> dict[str, Any]:
+    profile = await load_profile(await get_current_user_id(request))
+    if profile is None:
+        raise _not_authenticated()
+    return profile
+
+
+CurrentUserId = Annotated[UUID, Depends(get_current_user_id)]
+CurrentProfile = Annotated[dict[str, Any], Depends(get_current_profile)]
@@ -1,7 +1,17 @@
 from __future__ import annotations
 
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable
+
 from passlib.context import CryptContext
 
+from api.exceptions import ServiceOverloaded
+
 
 _pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 
@@ -15,3 +25,86 @@ def verify_password(password: str, password_hash: str) -> bool:
         return _pwd_context.verify(password, password_hash)
     except Exception:
         return False
+
+
+# PBKDF2 is CPU-bound for tens of milliseconds, so callers on the request path
+# go through a per-process pool of hashing workers instead of running it on the
+# event loop. The pool is created lazily so each gunicorn worker owns its own.
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = threading.Lock()
+_pending = 0
+
+
+def _pool_limits() -> tuple[int, int]:
+    from api.settings import settings
+
+    workers = int(settings.PASSWORD_HASH_WORKERS or 0)
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    max_pending = max(0, int(settings.PASSWORD_HASH_MAX_PENDING))
+    return workers, max_pending
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is not None:
+        return _executor
+
+    with _executor_lock:
+        if _executor is None:
+            workers, _max_pending = _pool_limits()
+            # spawn: forking a threaded server process is unsafe.
+            _executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        return _executor
+
+
+def shutdown_hash_executor() -> None:
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _release(_fut: Future) -> None:
+    global _pending
+    with _executor_lock:
+        _pending -= 1
+
+
+def _submit(fn: Callable[..., Any], *args: Any) -> Future:
+    """Queue work on the hashing pool; raise ServiceOverloaded when the queue is full."""
+    global _pending
+    _workers, max_pending = _pool_limits()
+    with _executor_lock:
+        if _pending >= max_pending:
+            raise ServiceOverloaded("password_hashing")
+        _pending += 1
+
+    try:
+        try:
+            fut = _get_executor().submit(fn, *args)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed); start a fresh pool once.
+            shutdown_hash_executor()
+            fut = _get_executor().submit(fn, *args)
+    except BaseException:
+        with _executor_lock:
+            _pending -= 1
+        raise
+
+    fut.add_done_callback(_release)
+    return fut
+
+
+async def hash_password_async(password: str) -> str:
+    return await asyncio.wrap_future(_submit(hash_password, password))
+
+
+async def verify_password_async(password: str, password_hash: str) -> bool:
+    return await asyncio.wrap_future(_submit(verify_password, password, password_hash))
+
+
+def hash_password_pooled(password: str) -> str:
+    """Blocking variant for scripts that should share the same hashing pool."""
+    return _submit(hash_password, password).result()
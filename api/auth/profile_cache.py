@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from contextlib import suppress
+from typing import TYPE_CHECKING, Any, Optional
+from uuid import UUID
+
+from api import redis_client
+
+if TYPE_CHECKING:
+    from api.auth.repo import User
+
+# Bump when the cached payload changes shape; entries under the old prefix are
+# simply never read again and expire on their own.
+_PAYLOAD_VERSION = "v1"
+
+# One round trip: the user's current version and the entry stored under it.
+_GET_LUA = """
+local version = redis.call('GET', KEYS[1]) or '0'
+return {version, redis.call('GET', ARGV[1] .. version)}
+"""
+
+
+def profile_of(user: User) -> dict[str, Any]:
+    """The fields served by GET /users/me and GET /auth/me."""
+    return {
+        "id": str(user.id),
+        "email": user.email,
+        "display_name": user.display_name,
+        "avatar_url": user.avatar_url,
+        "bio": user.bio,
+    }
+
+
+class ProfileCache:
+    """Read-through Redis cache of user profiles, shared by all workers.
+
+    Entries live under `profile:v1:<user_id>:<version>`. Writers bump the
+    user's version counter instead of deleting the entry, so a reader that
+    loaded the row before the write stores it under a version nobody reads.
+    Redis errors are treated as misses, and Redis is skipped for
+    `error_cooldown_seconds` after one.
+    """
+
+    def __init__(self, *, ttl_seconds: float, error_cooldown_seconds: float) -> None:
+        self.ttl = max(0, int(ttl_seconds))
+        self.error_cooldown = max(0.0, float(error_cooldown_seconds))
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.errors = 0
+        self.invalidations = 0
+        self._down_until = float("-inf")
+        self._lock = threading.Lock()
+        self._script: tuple[Any, Any] | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def _version_key(self, user_id: UUID) -> str:
+        return redis_client.key("profile", "ver", str(user_id))
+
+    def _entry_prefix(self, user_id: UUID) -> str:
+        return redis_client.key("profile", _PAYLOAD_VERSION, str(user_id)) + ":"
+
+    def _count(self, field: str) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def _failed(self) -> None:
+        with self._lock:
+            self.errors += 1
+            self._down_until = time.monotonic() + self.error_cooldown
+
+    def _available(self) -> bool:
+        with self._lock:
+            return time.monotonic() >= self._down_until
+
+    def _get_script(self, client: Any) -> Any:
+        if self._script is None or self._script[0] is not client:
+            self._script = (client, client.register_script(_GET_LUA))
+        return self._script[1]
+
+    async def get(self, user_id: UUID) -> tuple[Optional[dict[str, Any]], Optional[str]]:
+        """(profile, version): profile is None on a miss; version is None when Redis was not consulted."""
+        if not self.enabled or not self._available():
+            self._count("bypassed")
+            return None, None
+        try:
+            client = redis_client.get_async_client()
+            version, raw = await self._get_script(client)(keys=[self._version_key(user_id)], args=[self._entry_prefix(user_id)])
+            version = version.decode() if isinstance(version, bytes) else str(version)
+            profile = json.loads(raw) if raw else None
+        except Exception:
+            self._failed()
+            return None, None
+        self._count("hits" if profile is not None else "misses")
+        return profile, version
+
+    async def put(self, user_id: UUID, version: str, profile: dict[str, Any]) -> None:
+        try:
+            client = redis_client.get_async_client()
+            await client.set(self._entry_prefix(user_id) + version, json.dumps(profile), ex=self.ttl)
+        except Exception:
+            self._failed()
+
+    def _bump(self, pipe: Any, user_id: UUID) -> None:
+        # The counter outlives every entry stored under an older version, so
+        # letting it expire can never resurrect one.
+        version_key = self._version_key(user_id)
+        pipe.incr(version_key)
+        pipe.expire(version_key, self.ttl * 2)
+
+    async def invalidate(self, user_id: UUID) -> None:
+        # Attempted even during an error cooldown: a missed bump leaves the old
+        # profile visible for up to the TTL.
+        if not self.enabled:
+            return
+        try:
+            pipe = redis_client.get_async_client().pipeline(transaction=False)
+            self._bump(pipe, user_id)
+            await pipe.execute()
+        except Exception:
+            self._failed()
+            return
+        self._count("invalidations")
+
+    def invalidate_sync(self, user_id: UUID) -> None:
+        """invalidate() for the sync repo (scripts, Celery tasks)."""
+        if not self.enabled:
+            return
+        try:
+            pipe = redis_client.get_client().pipeline(transaction=False)
+            self._bump(pipe, user_id)
+            pipe.execute()
+        except Exception:
+            self._failed()
+            return
+        self._count("invalidations")
+
+    def reset(self) -> None:
+        with self._lock:
+            self.hits = self.misses = self.bypassed = self.errors = self.invalidations = 0
+            self._down_until = float("-inf")
+        self._script = None
+
+    def samples(self) -> list[tuple[str, str, str, dict[str, str], float]]:
+        name, help_text = "base2_api_profile_cache_lookups_total", "Profile cache lookups by result"
+        return [
+            (name, "counter", help_text, {"result": "hit"}, self.hits),
+            (name, "counter", help_text, {"result": "miss"}, self.misses),
+            (name, "counter", help_text, {"result": "bypass"}, self.bypassed),
+            ("base2_api_profile_cache_errors_total", "counter", "Failed profile cache Redis calls", {}, self.errors),
+            ("base2_api_profile_cache_invalidations_total", "counter", "Profile versions bumped by writes", {}, self.invalidations),
+        ]
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)) or default)
+    except ValueError:
+        return default
+
+
+profile_cache = ProfileCache(
+    ttl_seconds=_env_float("PROFILE_CACHE_TTL_SECONDS", 300.0),
+    error_cooldown_seconds=_env_float("PROFILE_CACHE_ERROR_COOLDOWN_SECONDS", 5.0),
+)
+
+with suppress(ImportError):
+    from api.metrics import metrics
+
+    metrics.register_collector(profile_cache.samples)
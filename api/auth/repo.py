@@ -6,7 +6,10 @@ from datetime import datetime, timedelta, timezone
 from typing import Any, Optional
 from uuid import UUID, uuid4
 
-from api.db import db_conn
+from api.auth.audit_buffer import AUDIT_BUFFER_ENABLED, audit_buffer
+from api.auth.profile_cache import profile_cache
+from api.auth.user_cache import user_cache
+from api.db import READ_YOUR_WRITES, db_conn, note_write, run_read
 
 
 @dataclass(frozen=True)
@@ -21,27 +24,157 @@ class User:
     bio: str
 
 
-def _utcnow() -> datetime:
-    return datetime.now(timezone.utc)
+# SQL is kept at module level so the sync repo (scripts, tests) and the async
+# repo used by request handlers (api.auth.async_repo) run identical statements.
+_USER_COLUMNS = "id, email, password_hash, is_active, is_email_verified, display_name, avatar_url, bio"
+
+SQL_CREATE_USER = f"""
+    INSERT INTO api_auth_users(id, email, password_hash)
+    VALUES (%s, %s, %s)
+    RETURNING {_USER_COLUMNS}
+"""
+
+SQL_GET_USER_BY_EMAIL = f"""
+    SELECT {_USER_COLUMNS}
+    FROM api_auth_users
+    WHERE email=%s
+"""
+
+SQL_GET_USER_BY_ID = f"""
+    SELECT {_USER_COLUMNS}
+    FROM api_auth_users
+    WHERE id=%s
+"""
+
+SQL_GET_USER_LOCK_STATE = """
+    SELECT failed_login_attempts, locked_until
+    FROM api_auth_users
+    WHERE id=%s
+"""
+
+SQL_REGISTER_LOGIN_FAILURE = """
+    UPDATE api_auth_users
+    SET failed_login_attempts = failed_login_attempts + 1,
+        locked_until = CASE
+          WHEN (failed_login_attempts + 1) >= %s THEN (NOW() + (%s || ' minutes')::interval)
+          ELSE locked_until
+        END,
+        updated_at = NOW()
+    WHERE id=%s
+    RETURNING failed_login_attempts, locked_until
+"""
+
+SQL_RESET_LOGIN_FAILURES = """
+    UPDATE api_auth_users
+    SET failed_login_attempts = 0,
+        locked_until = NULL,
+        updated_at = NOW()
+    WHERE id=%s
+"""
+
+SQL_INSERT_AUDIT_EVENT = """
+    INSERT INTO api_auth_audit_events(id, user_id, action, ip, user_agent, metadata_json)
+    VALUES (%s, %s, %s, %s, %s, %s::jsonb)
+"""
+
+SQL_CREATE_REFRESH_TOKEN = """
+    INSERT INTO api_auth_refresh_tokens(id, user_id, token_hash, expires_at, ip, user_agent)
+    VALUES (%s, %s, %s, %s, %s, %s)
+"""
+
+SQL_FIND_REFRESH_TOKEN = """
+    SELECT id, user_id, token_hash, created_at, last_seen_at, expires_at, revoked_at, replaced_by_token_id, user_agent, ip
+    FROM api_auth_refresh_tokens
+    WHERE token_hash=%s
+"""
+
+SQL_TOUCH_REFRESH_TOKEN = """
+    UPDATE api_auth_refresh_tokens
+    SET last_seen_at=NOW(), ip=%s, user_agent=%s
+    WHERE id=%s
+"""
+
+SQL_LIST_ACTIVE_REFRESH_SESSIONS = """
+    SELECT id, created_at, last_seen_at, expires_at, user_agent, ip
+    FROM api_auth_refresh_tokens
+    WHERE user_id=%s
+      AND revoked_at IS NULL
+      AND expires_at > NOW()
+    ORDER BY last_seen_at DESC, created_at DESC
+"""
+
+SQL_REVOKE_ALL_REFRESH_TOKENS_EXCEPT = """
+    UPDATE api_auth_refresh_tokens
+    SET revoked_at=NOW()
+    WHERE user_id=%s AND revoked_at IS NULL AND id <> %s
+"""
+
+SQL_REVOKE_REFRESH_TOKEN = """
+    UPDATE api_auth_refresh_tokens
+    SET revoked_at=NOW(), replaced_by_token_id=%s
+    WHERE id=%s
+"""
+
+SQL_REVOKE_ALL_REFRESH_TOKENS = """
+    UPDATE api_auth_refresh_tokens
+    SET revoked_at=NOW()
+    WHERE user_id=%s AND revoked_at IS NULL
+"""
+
+SQL_SET_USER_EMAIL_VERIFIED = """
+    UPDATE api_auth_users
+    SET is_email_verified=TRUE, updated_at=NOW()
+    WHERE id=%s
+"""
+
+SQL_SET_USER_PASSWORD_HASH = """
+    UPDATE api_auth_users
+    SET password_hash=%s, updated_at=NOW()
+    WHERE id=%s
+"""
+
+SQL_EMAIL_TAKEN_BY_OTHER = "SELECT 1 FROM api_auth_users WHERE email=%s AND id<>%s"
+
+SQL_UPDATE_USER_EMAIL = """
+    UPDATE api_auth_users
+    SET email=%s, is_email_verified=FALSE, updated_at=NOW()
+    WHERE id=%s
+"""
+
+SQL_CREATE_ONE_TIME_TOKEN = """
+    INSERT INTO api_auth_one_time_tokens(id, user_id, token_hash, type, expires_at)
+    VALUES (%s, %s, %s, %s, %s)
+"""
+
+SQL_FIND_ONE_TIME_TOKEN = """
+    SELECT id, user_id, token_hash, type, expires_at, consumed_at
+    FROM api_auth_one_time_tokens
+    WHERE token_hash=%s AND type=%s
+"""
+
+SQL_CONSUME_ONE_TIME_TOKEN = """
+    UPDATE api_auth_one_time_tokens
+    SET consumed_at=NOW()
+    WHERE id=%s AND consumed_at IS NULL
+"""
+
+SQL_FIND_OAUTH_ACCOUNT = """
+    SELECT id, user_id, provider, provider_account_id, email
+    FROM api_auth_oauth_accounts
+    WHERE provider=%s AND provider_account_id=%s
+"""
+
+SQL_CREATE_OAUTH_ACCOUNT = """
+    INSERT INTO api_auth_oauth_accounts(id, user_id, provider, provider_account_id, email)
+    VALUES (%s, %s, %s, %s, %s)
+"""
 
 
-def create_user(*, email: str, password_hash: str) -> User:
-    user_id = uuid4()
-    normalized_email = email.strip().lower()
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
 
-    with db_conn() as conn:
-        conn.autocommit = True
-        with conn.cursor() as cur:
-            cur.execute(
-                """
-                INSERT INTO api_auth_users(id, email, password_hash)
-                VALUES (%s, %s, %s)
-                RETURNING id, email, password_hash, is_active, is_email_verified, display_name, avatar_url, bio
-                """,
-                (str(user_id), normalized_email, password_hash),
-            )
-            row = cur.fetchone()
 
+def _user_from_row(row: Any) -> User:
     return User(
         id=UUID(str(row[0])),
         email=row[1],
@@ -54,63 +187,61 @@ def create_user(*, email: str, password_hash: str) -> User:
     )
 
 
-def get_user_by_email(email: str) -> Optional[User]:
-    normalized_email = email.strip().lower()
-    with db_conn() as conn, conn.cursor() as cur:
-        cur.execute(
-            """
-            SELECT id, email, password_hash, is_active, is_email_verified, display_name, avatar_url, bio
-            FROM api_auth_users
-            WHERE email=%s
-            """,
-            (normalized_email,),
-        )
-        row = cur.fetchone()
-
+def _lock_state_from_row(row: Any) -> dict[str, Any]:
     if not row:
-        return None
+        return {"failed_login_attempts": 0, "locked_until": None}
+    return {"failed_login_attempts": int(row[0] or 0), "locked_until": row[1]}
 
-    return User(
-        id=UUID(str(row[0])),
-        email=row[1],
-        password_hash=row[2],
-        is_active=bool(row[3]),
-        is_email_verified=bool(row[4]),
-        display_name=row[5] or "",
-        avatar_url=row[6] or "",
-        bio=row[7] or "",
-    )
 
+def _refresh_token_from_row(row: Any) -> dict[str, Any]:
+    return {
+        "id": UUID(str(row[0])),
+        "user_id": UUID(str(row[1])),
+        "token_hash": row[2],
+        "created_at": row[3],
+        "last_seen_at": row[4],
+        "expires_at": row[5],
+        "revoked_at": row[6],
+        "replaced_by_token_id": (UUID(str(row[7])) if row[7] else None),
+        "user_agent": row[8] or "",
+        "ip": row[9] or "",
+    }
 
-def get_user_by_id(user_id: UUID) -> Optional[User]:
-    with db_conn() as conn, conn.cursor() as cur:
-        cur.execute(
-            """
-            SELECT id, email, password_hash, is_active, is_email_verified, display_name, avatar_url, bio
-            FROM api_auth_users
-            WHERE id=%s
-            """,
-            (str(user_id),),
-        )
-        row = cur.fetchone()
 
-    if not row:
-        return None
+def _session_from_row(row: Any) -> dict[str, Any]:
+    return {
+        "id": UUID(str(row[0])),
+        "created_at": row[1],
+        "last_seen_at": row[2],
+        "expires_at": row[3],
+        "user_agent": row[4] or "",
+        "ip": row[5] or "",
+    }
 
-    return User(
-        id=UUID(str(row[0])),
-        email=row[1],
-        password_hash=row[2],
-        is_active=bool(row[3]),
-        is_email_verified=bool(row[4]),
-        display_name=row[5] or "",
-        avatar_url=row[6] or "",
-        bio=row[7] or "",
-    )
 
+def _one_time_token_from_row(row: Any) -> dict[str, Any]:
+    return {
+        "id": UUID(str(row[0])),
+        "user_id": (UUID(str(row[1])) if row[1] else None),
+        "token_hash": row[2],
+        "type": row[3],
+        "expires_at": row[4],
+        "consumed_at": row[5],
+    }
 
-def update_profile(*, user_id: UUID, display_name: str | None, avatar_url: str | None, bio: str | None) -> User:
-    # Only update provided fields.
+
+def _oauth_account_from_row(row: Any) -> dict[str, Any]:
+    return {
+        "id": UUID(str(row[0])),
+        "user_id": UUID(str(row[1])),
+        "provider": row[2],
+        "provider_account_id": row[3],
+        "email": row[4] or "",
+    }
+
+
+def _profile_update_sql(*, display_name: str | None, avatar_url: str | None, bio: str | None) -> tuple[str, list[Any]]:
+    # Only update provided fields; returns ("", []) when nothing changes.
     fields: list[str] = []
     values: list[Any] = []
 
@@ -125,6 +256,89 @@ def update_profile(*, user_id: UUID, display_name: str | None, avatar_url: str |
         values.append(bio)
 
     if not fields:
+        return "", []
+
+    sql = f"""
+        UPDATE api_auth_users
+        SET {', '.join(fields)}, updated_at=NOW()
+        WHERE id=%s
+        RETURNING {_USER_COLUMNS}
+    """
+    return sql, values
+
+
+# Keys for api.db read-your-writes routing: reads keyed like a write this
+# worker just made are served by the primary until the replica has caught up.
+def _user_key(user_id: UUID) -> tuple[str, str]:
+    return ("user", str(user_id))
+
+
+def _oauth_key(provider: str, provider_account_id: str) -> tuple[str, str, str]:
+    return ("oauth", provider, provider_account_id)
+
+
+def _replica_fetchone(sql: str, params: tuple[Any, ...], *, key: Any) -> Any:
+    def _query(conn: Any) -> Any:
+        with conn.cursor() as cur:
+            cur.execute(sql, params)
+            return cur.fetchone()
+
+    return run_read(_query, read=READ_YOUR_WRITES, key=key)
+
+
+def _replica_fetchall(sql: str, params: tuple[Any, ...], *, key: Any) -> list[Any]:
+    def _query(conn: Any) -> list[Any]:
+        with conn.cursor() as cur:
+            cur.execute(sql, params)
+            return list(cur.fetchall() or [])
+
+    return run_read(_query, read=READ_YOUR_WRITES, key=key)
+
+
+def create_user(*, email: str, password_hash: str) -> User:
+    user_id = uuid4()
+    normalized_email = email.strip().lower()
+
+    with db_conn() as conn:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(SQL_CREATE_USER, (str(user_id), normalized_email, password_hash))
+            row = cur.fetchone()
+    note_write(_user_key(user_id))
+
+    return _user_from_row(row)
+
+
+def get_user_by_email(email: str) -> Optional[User]:
+    normalized_email = email.strip().lower()
+    with db_conn() as conn, conn.cursor() as cur:
+        cur.execute(SQL_GET_USER_BY_EMAIL, (normalized_email,))
+        row = cur.fetchone()
+
+    if not row:
+        return None
+
+    return _user_from_row(row)
+
+
+def get_user_by_id(user_id: UUID, *, primary: bool = False) -> Optional[User]:
+    if primary:
+        with db_conn() as conn, conn.cursor() as cur:
+            cur.execute(SQL_GET_USER_BY_ID, (str(user_id),))
+            row = cur.fetchone()
+    else:
+        row = _replica_fetchone(SQL_GET_USER_BY_ID, (str(user_id),), key=_user_key(user_id))
+
+    if not row:
+        return None
+
+    return _user_from_row(row)
+
+
+def update_profile(*, user_id: UUID, display_name: str | None, avatar_url: str | None, bio: str | None) -> User:
+    sql, values = _profile_update_sql(display_name=display_name, avatar_url=avatar_url, bio=bio)
+
+    if not sql:
         u = get_user_by_id(user_id)
         if u is None:
             raise RuntimeError("user_not_found")
@@ -135,46 +349,23 @@ def update_profile(*, user_id: UUID, display_name: str | None, avatar_url: str |
     with db_conn() as conn:
         conn.autocommit = True
         with conn.cursor() as cur:
-            cur.execute(
-                f"""
-                UPDATE api_auth_users
-                SET {', '.join(fields)}, updated_at=NOW()
-                WHERE id=%s
-                RETURNING id, email, password_hash, is_active, is_email_verified, display_name, avatar_url, bio
-                """,
-                tuple(values),
-            )
+            cur.execute(sql, tuple(values))
             row = cur.fetchone()
+    user_cache.invalidate(user_id)
+    profile_cache.invalidate_sync(user_id)
+    note_write(_user_key(user_id))
 
     if not row:
         raise RuntimeError("user_not_found")
 
-    return User(
-        id=UUID(str(row[0])),
-        email=row[1],
-        password_hash=row[2],
-        is_active=bool(row[3]),
-        is_email_verified=bool(row[4]),
-        display_name=row[5] or "",
-        avatar_url=row[6] or "",
-        bio=row[7] or "",
-    )
+    return _user_from_row(row)
 
 
 def get_user_lock_state(*, user_id: UUID) -> dict[str, Any]:
     with db_conn() as conn, conn.cursor() as cur:
-        cur.execute(
-            """
-            SELECT failed_login_attempts, locked_until
-            FROM api_auth_users
-            WHERE id=%s
-            """,
-            (str(user_id),),
-        )
+        cur.execute(SQL_GET_USER_LOCK_STATE, (str(user_id),))
         row = cur.fetchone()
-    if not row:
-        return {"failed_login_attempts": 0, "locked_until": None}
-    return {"failed_login_attempts": int(row[0] or 0), "locked_until": row[1]}
+    return _lock_state_from_row(row)
 
 
 def register_login_failure(*, user_id: UUID, max_failures: int, lock_minutes: int) -> dict[str, Any]:
@@ -183,55 +374,38 @@ def register_login_failure(*, user_id: UUID, max_failures: int, lock_minutes: in
     with db_conn() as conn:
         conn.autocommit = True
         with conn.cursor() as cur:
-            cur.execute(
-                """
-                UPDATE api_auth_users
-                SET failed_login_attempts = failed_login_attempts + 1,
-                    locked_until = CASE
-                      WHEN (failed_login_attempts + 1) >= %s THEN (NOW() + (%s || ' minutes')::interval)
-                      ELSE locked_until
-                    END,
-                    updated_at = NOW()
-                WHERE id=%s
-                RETURNING failed_login_attempts, locked_until
-                """,
-                (mf, lm, str(user_id)),
-            )
+            cur.execute(SQL_REGISTER_LOGIN_FAILURE, (mf, lm, str(user_id)))
             row = cur.fetchone()
-    if not row:
-        return {"failed_login_attempts": 0, "locked_until": None}
-    return {"failed_login_attempts": int(row[0] or 0), "locked_until": row[1]}
+    return _lock_state_from_row(row)
 
 
 def reset_login_failures(*, user_id: UUID) -> None:
     with db_conn() as conn:
         conn.autocommit = True
         with conn.cursor() as cur:
-            cur.execute(
-                """
-                UPDATE api_auth_users
-                SET failed_login_attempts = 0,
-                    locked_until = NULL,
-                    updated_at = NOW()
-                WHERE id=%s
-                """,
-                (str(user_id),),
-            )
+            cur.execute(SQL_RESET_LOGIN_FAILURES, (str(user_id),))
 
 
-def insert_audit_event(*, user_id: UUID | None, action: str, ip: str, user_agent: str, metadata: dict[str, Any] | None = None) -> None:
+def _audit_event_params(*, user_id: UUID | None, action: str, ip: str, user_agent: str, metadata: dict[str, Any] | None) -> tuple[Any, ...]:
     event_id = uuid4()
     metadata_json = json.dumps(metadata or {})
+    return (str(event_id), (str(user_id) if user_id else None), action, ip or "", user_agent or "", metadata_json)
+
+
+def _buffered_audit_row(params: tuple[Any, ...]) -> tuple[Any, ...]:
+    # The buffer writes later; keep the time the event actually happened.
+    return (*params, _utcnow().isoformat())
+
+
+def insert_audit_event(*, user_id: UUID | None, action: str, ip: str, user_agent: str, metadata: dict[str, Any] | None = None) -> None:
+    params = _audit_event_params(user_id=user_id, action=action, ip=ip, user_agent=user_agent, metadata=metadata)
+    if AUDIT_BUFFER_ENABLED:
+        audit_buffer.add(_buffered_audit_row(params))
+        return
     with db_conn() as conn:
         conn.autocommit = True
         with conn.cursor() as cur:
-            cur.execute(
-                """
-                INSERT INTO api_auth_audit_events(id, user_id, action, ip, user_agent, metadata_json)
-                VALUES (%s, %s, %s, %s, %s, %s::jsonb)
-                """,
-                (str(event_id), (str(user_id) if user_id else None), action, ip or "", user_agent or "", metadata_json),
-            )
+            cur.execute(SQL_INSERT_AUDIT_EVENT, params)
 
 
 def create_refresh_token(
@@ -249,101 +423,44 @@ def create_refresh_token(
         conn.autocommit = True
         with conn.cursor() as cur:
             cur.execute(
-                """
-                INSERT INTO api_auth_refresh_tokens(id, user_id, token_hash, expires_at, ip, user_agent)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                """,
+                SQL_CREATE_REFRESH_TOKEN,
                 (str(token_id), str(user_id), token_hash, expires_at, ip or "", user_agent or ""),
             )
+    note_write(_user_key(user_id))
 
     return token_id, expires_at
 
 
 def find_refresh_token(*, token_hash: str) -> Optional[dict[str, Any]]:
     with db_conn() as conn, conn.cursor() as cur:
-        cur.execute(
-            """
-            SELECT id, user_id, token_hash, created_at, last_seen_at, expires_at, revoked_at, replaced_by_token_id, user_agent, ip
-            FROM api_auth_refresh_tokens
-            WHERE token_hash=%s
-            """,
-            (token_hash,),
-        )
+        cur.execute(SQL_FIND_REFRESH_TOKEN, (token_hash,))
         row = cur.fetchone()
 
     if not row:
         return None
 
-    return {
-        "id": UUID(str(row[0])),
-        "user_id": UUID(str(row[1])),
-        "token_hash": row[2],
-        "created_at": row[3],
-        "last_seen_at": row[4],
-        "expires_at": row[5],
-        "revoked_at": row[6],
-        "replaced_by_token_id": (UUID(str(row[7])) if row[7] else None),
-        "user_agent": row[8] or "",
-        "ip": row[9] or "",
-    }
+    return _refresh_token_from_row(row)
 
 
 def touch_refresh_token(*, token_id: UUID, ip: str, user_agent: str) -> None:
     with db_conn() as conn:
         conn.autocommit = True
         with conn.cursor() as cur:
-            cur.execute(
-                """
-                UPDATE api_auth_refresh_tokens
-                SET last_seen_at=NOW(), ip=%s, user_agent=%s
-                WHERE id=%s
-                """,
-                (ip or "", user_agent or "", str(token_id)),
-            )
+            cur.execute(SQL_TOUCH_REFRESH_TOKEN, (ip or "", user_agent or "", str(token_id)))
 
 
 def list_active_refresh_sessions(*, user_id: UUID) -> list[dict[str, Any]]:
-    with db_conn() as conn, conn.cursor() as cur:
-        cur.execute(
-            """
-            SELECT id, created_at, last_seen_at, expires_at, user_agent, ip
-            FROM api_auth_refresh_tokens
-            WHERE user_id=%s
-              AND revoked_at IS NULL
-              AND expires_at > NOW()
-            ORDER BY last_seen_at DESC, created_at DESC
-            """,
-            (str(user_id),),
-        )
-        rows = cur.fetchall() or []
-
-    out: list[dict[str, Any]] = []
-    for r in rows:
-        out.append(
-            {
-                "id": UUID(str(r[0])),
-                "created_at": r[1],
-                "last_seen_at": r[2],
-                "expires_at": r[3],
-                "user_agent": r[4] or "",
-                "ip": r[5] or "",
-            }
-        )
-    return out
+    rows = _replica_fetchall(SQL_LIST_ACTIVE_REFRESH_SESSIONS, (str(user_id),), key=_user_key(user_id))
+
+    return [_session_from_row(r) for r in rows]
 
 
 def revoke_all_refresh_tokens_except(*, user_id: UUID, keep_token_id: UUID) -> None:
     with db_conn() as conn:
         conn.autocommit = True
         with conn.cursor() as cur:
-            cur.execute(
-                """
-                UPDATE api_auth_refresh_tokens
-                SET revoked_at=NOW()
-                WHERE user_id=%s AND revoked_at IS NULL AND id <> %s
-                """,
-                (str(user_id), str(keep_token_id)),
-            )
+            cur.execute(SQL_REVOKE_ALL_REFRESH_TOKENS_EXCEPT, (str(user_id), str(keep_token_id)))
+    note_write(_user_key(user_id))
 
 
 def revoke_refresh_token(*, token_id: UUID, replaced_by_token_id: UUID | None = None) -> None:
@@ -351,11 +468,7 @@ def revoke_refresh_token(*, token_id: UUID, replaced_by_token_id: UUID | None =
         conn.autocommit = True
         with conn.cursor() as cur:
             cur.execute(
-                """
-                UPDATE api_auth_refresh_tokens
-                SET revoked_at=NOW(), replaced_by_token_id=%s
-                WHERE id=%s
-                """,
+                SQL_REVOKE_REFRESH_TOKEN,
                 (str(replaced_by_token_id) if replaced_by_token_id else None, str(token_id)),
             )
 
@@ -364,42 +477,27 @@ def revoke_all_refresh_tokens(*, user_id: UUID) -> None:
     with db_conn() as conn:
         conn.autocommit = True
         with conn.cursor() as cur:
-            cur.execute(
-                """
-                UPDATE api_auth_refresh_tokens
-                SET revoked_at=NOW()
-                WHERE user_id=%s AND revoked_at IS NULL
-                """,
-                (str(user_id),),
-            )
+            cur.execute(SQL_REVOKE_ALL_REFRESH_TOKENS, (str(user_id),))
+    note_write(_user_key(user_id))
 
 
 def set_user_email_verified(*, user_id: UUID) -> None:
     with db_conn() as conn:
         conn.autocommit = True
         with conn.cursor() as cur:
-            cur.execute(
-                """
-                UPDATE api_auth_users
-                SET is_email_verified=TRUE, updated_at=NOW()
-                WHERE id=%s
-                """,
-                (str(user_id),),
-            )
+            cur.execute(SQL_SET_USER_EMAIL_VERIFIED, (str(user_id),))
+    user_cache.invalidate(user_id)
+    profile_cache.invalidate_sync(user_id)
+    note_write(_user_key(user_id))
 
 
 def set_user_password_hash(*, user_id: UUID, password_hash: str) -> None:
     with db_conn() as conn:
         conn.autocommit = True
         with conn.cursor() as cur:
-            cur.execute(
-                """
-                UPDATE api_auth_users
-                SET password_hash=%s, updated_at=NOW()
-                WHERE id=%s
-                """,
-                (password_hash, str(user_id)),
-            )
+            cur.execute(SQL_SET_USER_PASSWORD_HASH, (password_hash, str(user_id)))
+    user_cache.invalidate(user_id)
+    note_write(_user_key(user_id))
 
 
 def update_user_email(*, user_id: UUID, email: str) -> None:
@@ -411,18 +509,14 @@ def update_user_email(*, user_id: UUID, email: str) -> None:
         conn.autocommit = True
         with conn.cursor() as cur:
             # Ensure unique email (best-effort; DB unique constraint will also enforce).
-            cur.execute("SELECT 1 FROM api_auth_users WHERE email=%s AND id<>%s", (normalized, str(user_id)))
+            cur.execute(SQL_EMAIL_TAKEN_BY_OTHER, (normalized, str(user_id)))
             if cur.fetchone() is not None:
                 raise ValueError("email_taken")
 
-            cur.execute(
-                """
-                UPDATE api_auth_users
-                SET email=%s, is_email_verified=FALSE, updated_at=NOW()
-                WHERE id=%s
-                """,
-                (normalized, str(user_id)),
-            )
+            cur.execute(SQL_UPDATE_USER_EMAIL, (normalized, str(user_id)))
+    user_cache.invalidate(user_id)
+    profile_cache.invalidate_sync(user_id)
+    note_write(_user_key(user_id))
 
 
 def create_one_time_token(*, user_id: UUID | None, token_hash: str, token_type: str, ttl_minutes: int) -> tuple[UUID, datetime]:
@@ -433,10 +527,7 @@ def create_one_time_token(*, user_id: UUID | None, token_hash: str, token_type:
         conn.autocommit = True
         with conn.cursor() as cur:
             cur.execute(
-                """
-                INSERT INTO api_auth_one_time_tokens(id, user_id, token_hash, type, expires_at)
-                VALUES (%s, %s, %s, %s, %s)
-                """,
+                SQL_CREATE_ONE_TIME_TOKEN,
                 (str(token_id), (str(user_id) if user_id else None), token_hash, token_type, expires_at),
             )
 
@@ -445,65 +536,31 @@ def create_one_time_token(*, user_id: UUID | None, token_hash: str, token_type:
 
 def find_one_time_token(*, token_hash: str, token_type: str) -> Optional[dict[str, Any]]:
     with db_conn() as conn, conn.cursor() as cur:
-        cur.execute(
-            """
-            SELECT id, user_id, token_hash, type, expires_at, consumed_at
-            FROM api_auth_one_time_tokens
-            WHERE token_hash=%s AND type=%s
-            """,
-            (token_hash, token_type),
-        )
+        cur.execute(SQL_FIND_ONE_TIME_TOKEN, (token_hash, token_type))
         row = cur.fetchone()
 
     if not row:
         return None
 
-    return {
-        "id": UUID(str(row[0])),
-        "user_id": (UUID(str(row[1])) if row[1] else None),
-        "token_hash": row[2],
-        "type": row[3],
-        "expires_at": row[4],
-        "consumed_at": row[5],
-    }
+    return _one_time_token_from_row(row)
 
 
 def consume_one_time_token(*, token_id: UUID) -> None:
     with db_conn() as conn:
         conn.autocommit = True
         with conn.cursor() as cur:
-            cur.execute(
-                """
-                UPDATE api_auth_one_time_tokens
-                SET consumed_at=NOW()
-                WHERE id=%s AND consumed_at IS NULL
-                """,
-                (str(token_id),),
-            )
+            cur.execute(SQL_CONSUME_ONE_TIME_TOKEN, (str(token_id),))
 
 
 def find_oauth_account(*, provider: str, provider_account_id: str) -> Optional[dict[str, Any]]:
-    with db_conn() as conn, conn.cursor() as cur:
-        cur.execute(
-            """
-            SELECT id, user_id, provider, provider_account_id, email
-            FROM api_auth_oauth_accounts
-            WHERE provider=%s AND provider_account_id=%s
-            """,
-            (provider, provider_account_id),
-        )
-        row = cur.fetchone()
+    row = _replica_fetchone(
+        SQL_FIND_OAUTH_ACCOUNT, (provider, provider_account_id), key=_oauth_key(provider, provider_account_id)
+    )
 
     if not row:
         return None
 
-    return {
-        "id": UUID(str(row[0])),
-        "user_id": UUID(str(row[1])),
-        "provider": row[2],
-        "provider_account_id": row[3],
-        "email": row[4] or "",
-    }
+    return _oauth_account_from_row(row)
 
 
 def create_oauth_account(*, user_id: UUID, provider: str, provider_account_id: str, email: str = "") -> UUID:
@@ -512,11 +569,9 @@ def create_oauth_account(*, user_id: UUID, provider: str, provider_account_id: s
         conn.autocommit = True
         with conn.cursor() as cur:
             cur.execute(
-                """
-                INSERT INTO api_auth_oauth_accounts(id, user_id, provider, provider_account_id, email)
-                VALUES (%s, %s, %s, %s, %s)
-                """,
+                SQL_CREATE_OAUTH_ACCOUNT,
                 (str(account_id), str(user_id), provider, provider_account_id, (email or "")),
             )
+    note_write(_oauth_key(provider, provider_account_id))
 
     return account_id
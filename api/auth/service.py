@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 from dataclasses import dataclass
 from datetime import datetime
 import os
@@ -7,8 +8,8 @@ from uuid import UUID
 
 import secrets
 
-from api.auth import repo
-from api.auth.passwords import hash_password, verify_password
+from api.auth import async_repo as repo
+from api.auth.passwords import hash_password_async, verify_password_async
 from api.auth.tokens import create_access_token, hash_token, new_refresh_token
 
 
@@ -34,15 +35,15 @@ def _new_one_time_token() -> str:
     return secrets.token_urlsafe(32)
 
 
-def issue_verify_email(*, email: str, host: str | None, proto: str | None, request_id: str | None = None, ttl_minutes: int = 60 * 24) -> None:
-    user = repo.get_user_by_email(email)
+async def issue_verify_email(*, email: str, host: str | None, proto: str | None, request_id: str | None = None, ttl_minutes: int = 60 * 24) -> None:
+    user = await repo.get_user_by_email(email)
     if user is None:
         return
     if user.is_email_verified:
         return
 
     raw = _new_one_time_token()
-    repo.create_one_time_token(
+    await repo.create_one_time_token(
         user_id=user.id,
         token_hash=hash_token(raw),
         token_type="verify_email",
@@ -56,24 +57,24 @@ def issue_verify_email(*, email: str, host: str | None, proto: str | None, reque
     try:
         from api.services.email_service import queue_email
 
-        queue_email(
+        await asyncio.to_thread(
+            queue_email,
             to_email=user.email,
             subject="Verify your email",
             body_text=body,
             body_html="",
             request_id=request_id,
-            send_async=True,
         )
     except Exception:
         # Never fail the request path.
         pass
 
 
-def verify_email(*, token: str) -> UUID:
+async def verify_email(*, token: str) -> UUID:
     if not token:
         raise ValueError("invalid_token")
 
-    rec = repo.find_one_time_token(token_hash=hash_token(token), token_type="verify_email")
+    rec = await repo.find_one_time_token(token_hash=hash_token(token), token_type="verify_email")
     if rec is None:
         raise ValueError("invalid_token")
 
@@ -90,21 +91,21 @@ def verify_email(*, token: str) -> UUID:
     if user_id is None:
         raise ValueError("invalid_token")
 
-    repo.set_user_email_verified(user_id=user_id)
-    repo.consume_one_time_token(token_id=rec["id"])
+    await repo.set_user_email_verified(user_id=user_id)
+    await repo.consume_one_time_token(token_id=rec["id"])
 
     return user_id
 
 
-def issue_password_reset(*, email: str, host: str | None, proto: str | None, request_id: str | None = None, ttl_minutes: int = 60) -> None:
-    user = repo.get_user_by_email(email)
+async def issue_password_reset(*, email: str, host: str | None, proto: str | None, request_id: str | None = None, ttl_minutes: int = 60) -> None:
+    user = await repo.get_user_by_email(email)
     if user is None:
         return
     if not user.is_active:
         return
 
     raw = _new_one_time_token()
-    repo.create_one_time_token(
+    await repo.create_one_time_token(
         user_id=user.id,
         token_hash=hash_token(raw),
         token_type="password_reset",
@@ -118,25 +119,25 @@ def issue_password_reset(*, email: str, host: str | None, proto: str | None, req
     try:
         from api.services.email_service import queue_email
 
-        queue_email(
+        await asyncio.to_thread(
+            queue_email,
             to_email=user.email,
             subject="Reset your password",
             body_text=body,
             body_html="",
             request_id=request_id,
-            send_async=True,
         )
     except Exception:
         pass
 
 
-def reset_password(*, token: str, new_password: str) -> UUID:
+async def reset_password(*, token: str, new_password: str) -> UUID:
     if not token:
         raise ValueError("invalid_token")
 
     _validate_password_or_raise(new_password)
 
-    rec = repo.find_one_time_token(token_hash=hash_token(token), token_type="password_reset")
+    rec = await repo.find_one_time_token(token_hash=hash_token(token), token_type="password_reset")
     if rec is None:
         raise ValueError("invalid_token")
 
@@ -153,25 +154,25 @@ def reset_password(*, token: str, new_password: str) -> UUID:
     if user_id is None:
         raise ValueError("invalid_token")
 
-    repo.set_user_password_hash(user_id=user_id, password_hash=hash_password(new_password))
-    repo.consume_one_time_token(token_id=rec["id"])
-    repo.revoke_all_refresh_tokens(user_id=user_id)
+    await repo.set_user_password_hash(user_id=user_id, password_hash=await hash_password_async(new_password))
+    await repo.consume_one_time_token(token_id=rec["id"])
+    await repo.revoke_all_refresh_tokens(user_id=user_id)
 
     return user_id
 
 
-def register_user(*, email: str, password: str, ip: str, user_agent: str, refresh_ttl_days: int, access_ttl_minutes: int) -> tuple[repo.User, AuthTokens]:
+async def register_user(*, email: str, password: str, ip: str, user_agent: str, refresh_ttl_days: int, access_ttl_minutes: int) -> tuple[repo.User, AuthTokens]:
     _validate_password_or_raise(password)
 
-    existing = repo.get_user_by_email(email)
+    existing = await repo.get_user_by_email(email)
     if existing is not None:
         raise ValueError("email_taken")
 
-    user = repo.create_user(email=email, password_hash=hash_password(password))
+    user = await repo.create_user(email=email, password_hash=await hash_password_async(password))
 
     refresh = new_refresh_token()
     refresh_hash = hash_token(refresh)
-    _token_id, refresh_expires_at = repo.create_refresh_token(
+    _token_id, refresh_expires_at = await repo.create_refresh_token(
         user_id=user.id,
         token_hash=refresh_hash,
         ttl_days=refresh_ttl_days,
@@ -181,55 +182,56 @@ def register_user(*, email: str, password: str, ip: str, user_agent: str, refres
 
     access = create_access_token(subject=str(user.id), email=user.email, ttl_minutes=access_ttl_minutes)
 
-    repo.insert_audit_event(user_id=user.id, action="user.register", ip=ip, user_agent=user_agent)
+    await repo.insert_audit_event(user_id=user.id, action="user.register", ip=ip, user_agent=user_agent)
 
     return user, AuthTokens(access_token=access, refresh_token=refresh, refresh_token_expires_at=refresh_expires_at)
 
 
-def login_user(*, email: str, password: str, ip: str, user_agent: str, refresh_ttl_days: int, access_ttl_minutes: int) -> tuple[repo.User, AuthTokens]:
-    user = repo.get_user_by_email(email)
-    if user is None:
-        repo.insert_audit_event(user_id=None, action="auth.login_failed", ip=ip, user_agent=user_agent, metadata={"email": email.strip().lower()})
+async def login_user(*, email: str, password: str, ip: str, user_agent: str, refresh_ttl_days: int, access_ttl_minutes: int) -> tuple[repo.User, AuthTokens]:
+    # User row and lockout state come back in one query.
+    found = await repo.get_user_for_login(email)
+    if found is None:
+        await repo.insert_audit_event(user_id=None, action="auth.login_failed", ip=ip, user_agent=user_agent, metadata={"email": email.strip().lower()})
         raise ValueError("invalid_credentials")
+    user, lock_state = found
 
     # Always return generic invalid credentials.
     if not user.is_active:
-        repo.insert_audit_event(user_id=user.id, action="auth.login_failed", ip=ip, user_agent=user_agent)
+        await repo.insert_audit_event(user_id=user.id, action="auth.login_failed", ip=ip, user_agent=user_agent)
         raise ValueError("invalid_credentials")
 
     # Account lockout window.
-    try:
-        st = repo.get_user_lock_state(user_id=user.id)
-        locked_until = st.get("locked_until")
-        if locked_until is not None:
-            now = datetime.now(locked_until.tzinfo) if getattr(locked_until, "tzinfo", None) else datetime.utcnow()
-            if locked_until > now:
-                repo.insert_audit_event(user_id=user.id, action="auth.login_locked", ip=ip, user_agent=user_agent)
-                raise ValueError("invalid_credentials")
-    except ValueError:
-        raise
-    except Exception:
-        # Never block login because lock metadata couldn't be read.
-        pass
-
-    if not verify_password(password, user.password_hash):
-        repo.insert_audit_event(user_id=user.id, action="auth.login_failed", ip=ip, user_agent=user_agent)
+    locked_until = lock_state.get("locked_until")
+    if locked_until is not None:
+        now = datetime.now(locked_until.tzinfo) if getattr(locked_until, "tzinfo", None) else datetime.utcnow()
+        if locked_until > now:
+            await repo.insert_audit_event(user_id=user.id, action="auth.login_locked", ip=ip, user_agent=user_agent)
+            raise ValueError("invalid_credentials")
+
+    if not await verify_password_async(password, user.password_hash):
         try:
             max_failures = int(os.getenv("AUTH_LOCKOUT_MAX_FAILURES", "5") or 5)
             lock_minutes = int(os.getenv("AUTH_LOCKOUT_MINUTES", "15") or 15)
-            st = repo.register_login_failure(user_id=user.id, max_failures=max_failures, lock_minutes=lock_minutes)
-            if st.get("locked_until") is not None and int(st.get("failed_login_attempts") or 0) >= max_failures:
-                repo.insert_audit_event(user_id=user.id, action="auth.account_locked", ip=ip, user_agent=user_agent)
+            st = await repo.record_login_failure(
+                user_id=user.id,
+                max_failures=max_failures,
+                lock_minutes=lock_minutes,
+                ip=ip,
+                user_agent=user_agent,
+            )
         except Exception:
-            # Never block login because lock metadata couldn't be updated.
-            pass
+            # Never block login because lock metadata couldn't be updated; still audit the failure.
+            await repo.insert_audit_event(user_id=user.id, action="auth.login_failed", ip=ip, user_agent=user_agent)
+        else:
+            if st.get("locked_until") is not None and int(st.get("failed_login_attempts") or 0) >= max_failures:
+                await repo.insert_audit_event(user_id=user.id, action="auth.account_locked", ip=ip, user_agent=user_agent)
         raise ValueError("invalid_credentials")
 
     refresh = new_refresh_token()
-    refresh_hash = hash_token(refresh)
-    _token_id, refresh_expires_at = repo.create_refresh_token(
+    # Refresh token, lockout reset and audit row are written in one statement.
+    _token_id, refresh_expires_at = await repo.complete_login(
         user_id=user.id,
-        token_hash=refresh_hash,
+        token_hash=hash_token(refresh),
         ttl_days=refresh_ttl_days,
         ip=ip,
         user_agent=user_agent,
@@ -237,12 +239,6 @@ def login_user(*, email: str, password: str, ip: str, user_agent: str, refresh_t
 
     access = create_access_token(subject=str(user.id), email=user.email, ttl_minutes=access_ttl_minutes)
 
-    from contextlib import suppress
-    with suppress(Exception):
-        repo.reset_login_failures(user_id=user.id)
-
-    repo.insert_audit_event(user_id=user.id, action="auth.login", ip=ip, user_agent=user_agent)
-
     return user, AuthTokens(access_token=access, refresh_token=refresh, refresh_token_expires_at=refresh_expires_at)
 
 
@@ -257,45 +253,34 @@ def _validate_password_or_raise(password: str) -> None:
         raise ValueError("invalid_password")
 
 
-def refresh_tokens(*, refresh_token: str, ip: str, user_agent: str, refresh_ttl_days: int, access_ttl_minutes: int) -> tuple[repo.User, AuthTokens]:
+async def refresh_tokens(*, refresh_token: str, ip: str, user_agent: str, refresh_ttl_days: int, access_ttl_minutes: int) -> tuple[repo.User, AuthTokens]:
     token_hash = hash_token(refresh_token)
-    rec = repo.find_refresh_token(token_hash=token_hash)
-    if rec is None:
-        raise ValueError("invalid_refresh")
-
-    if rec["revoked_at"] is not None:
-        # Reuse detection (basic): revoked token used again.
-        repo.insert_audit_event(user_id=rec["user_id"], action="auth.refresh_reuse", ip=ip, user_agent=user_agent)
-        raise ValueError("invalid_refresh")
-
-    expires_at = rec["expires_at"]
-    if expires_at is not None:
-        now = datetime.now(expires_at.tzinfo) if getattr(expires_at, "tzinfo", None) else datetime.utcnow()
-        if expires_at <= now:
-            raise ValueError("expired_refresh")
-
-    user = repo.get_user_by_id(rec["user_id"])
-    if user is None:
-        raise ValueError("invalid_refresh")
-
-    from contextlib import suppress
-    with suppress(Exception):
-        repo.touch_refresh_token(token_id=rec["id"], ip=ip, user_agent=user_agent)
-
     new_refresh = new_refresh_token()
-    new_refresh_hash = hash_token(new_refresh)
-    new_token_id, new_expires_at = repo.create_refresh_token(
-        user_id=user.id,
-        token_hash=new_refresh_hash,
+    rotated = await repo.rotate_refresh_token(
+        token_hash=token_hash,
+        new_token_hash=hash_token(new_refresh),
         ttl_days=refresh_ttl_days,
         ip=ip,
         user_agent=user_agent,
     )
+    if rotated is None:
+        # Rare path: work out why, for the error code and reuse detection.
+        rec = await repo.find_refresh_token(token_hash=token_hash)
+        if rec is None:
+            raise ValueError("invalid_refresh")
+        if rec["revoked_at"] is not None:
+            # Reuse detection (basic): revoked token used again, or a concurrent
+            # refresh of the same token lost the rotation race.
+            await repo.insert_audit_event(user_id=rec["user_id"], action="auth.refresh_reuse", ip=ip, user_agent=user_agent)
+            raise ValueError("invalid_refresh")
+        expires_at = rec["expires_at"]
+        if expires_at is not None:
+            now = datetime.now(expires_at.tzinfo) if getattr(expires_at, "tzinfo", None) else datetime.utcnow()
+            if expires_at <= now:
+                raise ValueError("expired_refresh")
+        raise ValueError("invalid_refresh")
 
-    repo.revoke_refresh_token(token_id=rec["id"], replaced_by_token_id=new_token_id)
-
+    user, _new_token_id, new_expires_at = rotated
     access = create_access_token(subject=str(user.id), email=user.email, ttl_minutes=access_ttl_minutes)
 
-    repo.insert_audit_event(user_id=user.id, action="auth.refresh", ip=ip, user_agent=user_agent)
-
     return user, AuthTokens(access_token=access, refresh_token=new_refresh, refresh_token_expires_at=new_expires_at)
@@ -3,6 +3,9 @@ from __future__ import annotations
 import hashlib
 import os
 import secrets
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict
 
@@ -54,11 +57,87 @@ def create_access_token(*, subject: str, email: str, ttl_minutes: int) -> str:
     return jwt.encode(payload, secret, algorithm="HS256")
 
 
-def decode_access_token(token: str) -> Dict[str, Any]:
-    secret = (os.getenv("JWT_SECRET") or "").strip()
-    if not secret:
-        raise RuntimeError("Missing JWT_SECRET")
+class TokenVerifier:
+    """Verifies access tokens with key material resolved once.
+
+    Recently verified tokens are kept in a bounded LRU keyed by token digest,
+    so repeat calls with the same bearer token skip signature verification
+    until the token's own `exp`.
+    """
+
+    def __init__(self, *, secret: str, issuer: str, audience: str, cache_size: int = 1024) -> None:
+        if not secret:
+            raise RuntimeError("Missing JWT_SECRET")
+        self._key = secret.encode("utf-8")
+        self._issuer = issuer
+        self._audience = audience
+        self._jwt = jwt.PyJWT()
+        self._cache_size = max(0, int(cache_size))
+        self._cache: OrderedDict[bytes, tuple[float, Dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "TokenVerifier":
+        try:
+            cache_size = int(os.getenv("JWT_VERIFY_CACHE_SIZE", "1024") or 1024)
+        except ValueError:
+            cache_size = 1024
+        return cls(
+            secret=(os.getenv("JWT_SECRET") or "").strip(),
+            issuer=(os.getenv("JWT_ISSUER") or "base2").strip() or "base2",
+            audience=(os.getenv("JWT_AUDIENCE") or "base2").strip() or "base2",
+            cache_size=cache_size,
+        )
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        digest = hashlib.sha256(token.encode("utf-8")).digest()
+        now = time.time()
+        with self._lock:
+            hit = self._cache.get(digest)
+            if hit is not None:
+                if hit[0] > now:
+                    self._cache.move_to_end(digest)
+                    return dict(hit[1])
+                del self._cache[digest]
+
+        payload = self._jwt.decode(
+            token,
+            self._key,
+            algorithms=["HS256"],
+            issuer=self._issuer,
+            audience=self._audience,
+        )
+
+        exp = payload.get("exp")
+        if self._cache_size and isinstance(exp, (int, float)):
+            with self._lock:
+                self._cache[digest] = (float(exp), dict(payload))
+                self._cache.move_to_end(digest)
+                while len(self._cache) > self._cache_size:
+                    self._cache.popitem(last=False)
+        return payload
+
+
+_verifier: TokenVerifier | None = None
+_verifier_lock = threading.Lock()
+
+
+def get_token_verifier() -> TokenVerifier:
+    global _verifier
+    if _verifier is not None:
+        return _verifier
+    with _verifier_lock:
+        if _verifier is None:
+            _verifier = TokenVerifier.from_env()
+        return _verifier
+
+
+def reset_token_verifier() -> None:
+    """Drop the process-wide verifier so the next call re-reads JWT_* env (key rotation, tests)."""
+    global _verifier
+    with _verifier_lock:
+        _verifier = None
 
-    issuer = (os.getenv("JWT_ISSUER") or "base2").strip() or "base2"
-    audience = (os.getenv("JWT_AUDIENCE") or "base2").strip() or "base2"
-    return jwt.decode(token, secret, algorithms=["HS256"], issuer=issuer, audience=audience)
+
+def decode_access_token(token: str) -> Dict[str, Any]:
+    return get_token_verifier().decode(token)
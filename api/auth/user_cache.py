@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Optional
+from uuid import UUID
+
+if TYPE_CHECKING:
+    from api.auth.repo import User
+
+
+class UserCache:
+    """Short-TTL, per-process cache of user rows keyed by id.
+
+    Writes that change a user row call `invalidate()`; other processes may see
+    the old row for at most `ttl_seconds`.
+    """
+
+    def __init__(self, *, ttl_seconds: float, max_entries: int) -> None:
+        self._ttl = max(0.0, float(ttl_seconds))
+        self._max = max(0, int(max_entries))
+        self._entries: OrderedDict[UUID, tuple[float, User]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: UUID) -> Optional[User]:
+        now = time.monotonic()
+        with self._lock:
+            hit = self._entries.get(user_id)
+            if hit is None:
+                return None
+            if hit[0] <= now:
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return hit[1]
+
+    def put(self, user: User) -> None:
+        if self._ttl <= 0 or self._max <= 0:
+            return
+        with self._lock:
+            self._entries[user.id] = (time.monotonic() + self._ttl, user)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self._max:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: UUID) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)) or default)
+    except ValueError:
+        return default
+
+
+user_cache = UserCache(
+    ttl_seconds=_env_float("USER_CACHE_TTL_SECONDS", 5.0),
+    max_entries=int(_env_float("USER_CACHE_MAX_ENTRIES", 4096)),
+)
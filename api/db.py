@@ -1,14 +1,327 @@
+import asyncio
 import os
-from contextlib import contextmanager, suppress
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager, suppress
 import threading
+from typing import Any, AsyncIterator, Awaitable, Callable, TypeVar
 
-from psycopg2.pool import ThreadedConnectionPool
+import psycopg
+import psycopg2
+from psycopg import AsyncConnection
+from psycopg2 import extensions as pg_ext
+from psycopg2.pool import PoolError
+from psycopg_pool import AsyncConnectionPool, PoolTimeout
 
+from api.exceptions import ServiceOverloaded
+from api.metrics import metrics
 from api.settings import settings
 
 
-_pool: ThreadedConnectionPool | None = None
+class ConnectionPool:
+    """Thread-safe psycopg2 pool with bounded waiting and connection health checks.
+
+    - `getconn()` waits up to `acquire_timeout` for a free slot instead of
+      failing immediately, then raises ServiceOverloaded.
+    - Connections older than `max_lifetime` or idle longer than `max_idle` are
+      replaced; ones idle longer than `ping_after_idle` are pinged first.
+    - Broken connections and connections in an unknown transaction state are
+      discarded when returned.
+    """
+
+    def __init__(
+        self,
+        *,
+        dsn: str,
+        min_size: int,
+        max_size: int,
+        acquire_timeout: float,
+        max_lifetime: float,
+        max_idle: float,
+        ping_after_idle: float,
+        **connect_kwargs: Any,
+    ) -> None:
+        self._dsn = dsn
+        self._connect_kwargs = connect_kwargs
+        self.min_size = max(0, int(min_size))
+        self.max_size = max(1, int(max_size))
+        self._acquire_timeout = max(0.0, float(acquire_timeout))
+        self._max_lifetime = float(max_lifetime)
+        self._max_idle = float(max_idle)
+        self._ping_after_idle = float(ping_after_idle)
+
+        self._cond = threading.Condition()
+        # Idle connections as (conn, created_at, idle_since); used LIFO so
+        # surplus connections age out via max_idle.
+        self._idle: deque[tuple[Any, float, float]] = deque()
+        self._created_at: dict[int, float] = {}
+        self._size = 0
+        self._waiting = 0
+        self._closed = False
+
+        self._acquired_total = 0
+        self._wait_seconds_sum = 0.0
+        self._timeouts_total = 0
+        self._recycled_total = 0
+
+        for _ in range(self.min_size):
+            conn = self._connect()
+            with self._cond:
+                self._size += 1
+                self._idle.append((conn, self._created_at[id(conn)], time.monotonic()))
+
+    def _connect(self) -> Any:
+        conn = psycopg2.connect(self._dsn, **self._connect_kwargs)
+        self._created_at[id(conn)] = time.monotonic()
+        return conn
+
+    def _discard(self, conn: Any) -> None:
+        self._created_at.pop(id(conn), None)
+        with suppress(Exception):
+            conn.close()
+
+    def _usable(self, conn: Any, created_at: float, idle_since: float) -> bool:
+        now = time.monotonic()
+        if getattr(conn, "closed", 0):
+            return False
+        if self._max_lifetime > 0 and now - created_at > self._max_lifetime:
+            return False
+        if self._max_idle > 0 and now - idle_since > self._max_idle:
+            return False
+        if now - idle_since >= self._ping_after_idle:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT 1")
+                    cur.fetchone()
+                if conn.get_transaction_status() != pg_ext.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception:
+                return False
+        return True
+
+    def getconn(self) -> Any:
+        started = time.monotonic()
+        deadline = started + self._acquire_timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolError("connection pool is closed")
+                if self._idle:
+                    candidate: tuple[Any, float, float] | None = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    # Reserve the slot now; connect outside the lock.
+                    self._size += 1
+                    candidate = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts_total += 1
+                    raise ServiceOverloaded("db_pool")
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+        try:
+            conn = None
+            if candidate is not None:
+                conn = candidate[0]
+                if not self._usable(*candidate):
+                    # Replace it in the same slot.
+                    self._discard(conn)
+                    conn = None
+                    with self._cond:
+                        self._recycled_total += 1
+            if conn is None:
+                conn = self._connect()
+        except BaseException:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._acquired_total += 1
+            self._wait_seconds_sum += time.monotonic() - started
+        return conn
+
+    def putconn(self, conn: Any, close: bool = False) -> None:
+        keep = not close and not self._closed and not getattr(conn, "closed", 0)
+        if keep:
+            try:
+                status = conn.get_transaction_status()
+                if status == pg_ext.TRANSACTION_STATUS_UNKNOWN:
+                    keep = False
+                elif status != pg_ext.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception:
+                keep = False
+        created_at = self._created_at.get(id(conn), 0.0)
+        if keep and self._max_lifetime > 0 and time.monotonic() - created_at > self._max_lifetime:
+            keep = False
+
+        if not keep:
+            self._discard(conn)
+        with self._cond:
+            if keep:
+                self._idle.append((conn, created_at, time.monotonic()))
+            else:
+                self._size -= 1
+            self._cond.notify()
+
+    def closeall(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn, _created_at, _idle_since in idle:
+            self._discard(conn)
+
+    def stats(self) -> dict[str, float]:
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                "size": self._size,
+                "max": self.max_size,
+                "idle": idle,
+                "in_use": self._size - idle,
+                "waiting": self._waiting,
+                "acquired_total": self._acquired_total,
+                "wait_seconds_sum": self._wait_seconds_sum,
+                "timeouts_total": self._timeouts_total,
+                "recycled_total": self._recycled_total,
+            }
+
+
+T = TypeVar("T")
+
+# Read consistency hints for db_conn()/async_db_conn(). Without one, the
+# connection comes from the primary (all writes, and reads that must be current).
+READ_ONLY = "read_only"  # any replica within DB_REPLICA_MAX_LAG_SEC is fine
+READ_YOUR_WRITES = "read_your_writes"  # replica, unless this worker recently wrote `key`
+
+# Seconds the replica is behind. An idle primary generates no new WAL, so a
+# replica that has replayed everything it received counts as current.
+SQL_REPLICA_LAG = """
+    SELECT CASE
+      WHEN NOT pg_is_in_recovery() THEN 0
+      WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+      ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+class ReplicaRouter:
+    """Decides per read whether the replica may serve it, and tracks replica health.
+
+    - Lag is re-measured at most every `check_interval_sec`, on a connection
+      that is about to serve a read anyway.
+    - Reads go to the primary while lag exceeds `max_lag_sec`, and for a
+      cool-down after the replica failed.
+    - `note_write(key)` sends READ_YOUR_WRITES reads for `key` to the primary
+      until any replica we would still use must have replayed the write. This
+      is per process: another worker does not see the write marker.
+    """
+
+    def __init__(self, *, max_lag_sec: float, check_interval_sec: float, max_keys: int = 10000) -> None:
+        self.max_lag_sec = max(0.0, float(max_lag_sec))
+        self.check_interval_sec = max(0.0, float(check_interval_sec))
+        self.max_keys = max(1, int(max_keys))
+        self._lock = threading.Lock()
+        self._lag: float | None = None
+        self._checked_at = float("-inf")
+        self._down_until = 0.0
+        self._writes: OrderedDict[Any, float] = OrderedDict()
+        self._routed: dict[tuple[str, str], int] = {}
+
+    @property
+    def write_window_sec(self) -> float:
+        return self.max_lag_sec + self.check_interval_sec
+
+    def note_write(self, key: Any) -> None:
+        if key is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._writes[key] = now
+            self._writes.move_to_end(key)
+            while self._writes and (
+                len(self._writes) > self.max_keys or now - next(iter(self._writes.values())) >= self.write_window_sec
+            ):
+                self._writes.popitem(last=False)
+
+    def choose(self, read: str, key: Any = None) -> str | None:
+        """None if the replica may serve this read, else why it goes to the primary."""
+        now = time.monotonic()
+        with self._lock:
+            if now < self._down_until:
+                return "replica_unavailable"
+            if read == READ_YOUR_WRITES and key is not None:
+                wrote_at = self._writes.get(key)
+                if wrote_at is not None and now - wrote_at < self.write_window_sec:
+                    return "recent_write"
+            if self._lagging() and now - self._checked_at < self.check_interval_sec:
+                return "replica_lagging"
+        return None
+
+    def needs_check(self) -> bool:
+        with self._lock:
+            return time.monotonic() - self._checked_at >= self.check_interval_sec
+
+    def record_lag(self, lag_sec: float) -> None:
+        with self._lock:
+            self._lag = max(0.0, float(lag_sec))
+            self._checked_at = time.monotonic()
+
+    def lagging(self) -> bool:
+        with self._lock:
+            return self._lagging()
+
+    def _lagging(self) -> bool:
+        return self._lag is not None and self._lag > self.max_lag_sec
+
+    def mark_failed(self) -> None:
+        with self._lock:
+            self._lag = None
+            self._checked_at = float("-inf")
+            self._down_until = time.monotonic() + max(1.0, 5 * self.check_interval_sec)
+
+    def count(self, target: str, reason: str) -> None:
+        with self._lock:
+            self._routed[(target, reason)] = self._routed.get((target, reason), 0) + 1
+
+    def samples(self) -> list[tuple[str, str, str, dict[str, str], float]]:
+        with self._lock:
+            up = 0.0 if time.monotonic() < self._down_until else 1.0
+            out: list[tuple[str, str, str, dict[str, str], float]] = [
+                ("base2_api_db_replica_up", "gauge", "Whether reads may use the replica (0 during failure cool-down)", {}, up),
+            ]
+            if self._lag is not None:
+                out.append(("base2_api_db_replica_lag_seconds", "gauge", "Replica replay lag at the last check", {}, self._lag))
+            for (target, reason), n in sorted(self._routed.items()):
+                out.append(
+                    ("base2_api_db_reads_total", "counter", "Routed reads by target and reason", {"target": target, "reason": reason}, n)
+                )
+            return out
+
+
+_pool: ConnectionPool | None = None
 _pool_lock = threading.Lock()
+_replica_pool: ConnectionPool | None = None
+_router: ReplicaRouter | None = None
+
+# Async pool used by request handlers. It is bound to the event loop that
+# opened it, so it is recreated if a different loop asks for it (test clients).
+_async_pool: AsyncConnectionPool | None = None
+_async_pool_loop: asyncio.AbstractEventLoop | None = None
+_async_replica_pool: AsyncConnectionPool | None = None
+_async_replica_pool_loop: asyncio.AbstractEventLoop | None = None
+# The replica pool's connections_errors counter at the last acquire timeout.
+_async_replica_connect_errors = 0
 
 
 def _build_dsn() -> str:
@@ -27,7 +340,53 @@ def _build_dsn() -> str:
     return f"postgresql://{user}:{password}@{host}:{port}/{name}"
 
 
-def _get_pool() -> ThreadedConnectionPool:
+def _build_replica_dsn() -> str | None:
+    return (os.getenv("DATABASE_REPLICA_URL") or "").strip() or None
+
+
+def _get_router() -> ReplicaRouter | None:
+    """The replica router, or None when no DATABASE_REPLICA_URL is configured."""
+    global _router
+    if _router is None and _build_replica_dsn():
+        with _pool_lock:
+            if _router is None:
+                _router = ReplicaRouter(
+                    max_lag_sec=settings.DB_REPLICA_MAX_LAG_SEC,
+                    check_interval_sec=settings.DB_REPLICA_CHECK_INTERVAL_SEC,
+                )
+    return _router
+
+
+def note_write(key: Any) -> None:
+    """Route this worker's READ_YOUR_WRITES reads for `key` to the primary for a while."""
+    router = _get_router()
+    if router is not None:
+        router.note_write(key)
+
+
+def _session_options(*, read_only: bool = False) -> str:
+    options = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+    if read_only:
+        options += " -c default_transaction_read_only=on"
+    return options
+
+
+def _new_pool(dsn: str, *, read_only: bool = False) -> ConnectionPool:
+    return ConnectionPool(
+        dsn=dsn,
+        min_size=settings.DB_POOL_MIN,
+        max_size=settings.DB_POOL_MAX,
+        acquire_timeout=settings.DB_POOL_ACQUIRE_TIMEOUT_SEC,
+        max_lifetime=settings.DB_POOL_MAX_LIFETIME_SEC,
+        max_idle=settings.DB_POOL_MAX_IDLE_SEC,
+        ping_after_idle=settings.DB_POOL_PING_AFTER_IDLE_SEC,
+        connect_timeout=settings.DB_CONNECT_TIMEOUT_SEC,
+        options=_session_options(read_only=read_only),
+        application_name="base2-api",
+    )
+
+
+def _get_pool() -> ConnectionPool:
     global _pool
     if _pool is not None:
         return _pool
@@ -35,61 +394,109 @@ def _get_pool() -> ThreadedConnectionPool:
     with _pool_lock:
         if _pool is not None:
             return _pool
-
-        dsn = _build_dsn()
-        options = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
-        _pool = ThreadedConnectionPool(
-            minconn=settings.DB_POOL_MIN,
-            maxconn=settings.DB_POOL_MAX,
-            dsn=dsn,
-            connect_timeout=settings.DB_CONNECT_TIMEOUT_SEC,
-            options=options,
-            application_name="base2-api",
-        )
+        _pool = _new_pool(_build_dsn())
         return _pool
 
 
-def _get_conn() -> object:
-    pool = _get_pool()
-    # Try a few times in case the pool contains closed connections from a prior bug.
-    for _ in range(3):
-        conn = pool.getconn()
+def _get_replica_pool() -> ConnectionPool:
+    global _replica_pool
+    if _replica_pool is not None:
+        return _replica_pool
+
+    with _pool_lock:
+        if _replica_pool is not None:
+            return _replica_pool
+        dsn = _build_replica_dsn()
+        if not dsn:
+            raise RuntimeError("DATABASE_REPLICA_URL is not set")
+        _replica_pool = _new_pool(dsn, read_only=True)
+        return _replica_pool
+
+
+def _replica_conn(read: str, key: Any) -> tuple[ConnectionPool, Any] | None:
+    """A replica connection for this read, or None to use the primary."""
+    router = _get_router()
+    if router is None:
+        return None
+    reason = router.choose(read, key)
+    if reason is None:
+        pool: ConnectionPool | None = None
         try:
-            if getattr(conn, "closed", 0):
-                with suppress(Exception):
-                    pool.putconn(conn, close=True)
-                continue
-            return conn
+            pool = _get_replica_pool()
+            conn = pool.getconn()
+        except ServiceOverloaded:
+            reason = "replica_busy"
         except Exception:
-            # If inspection fails, try again
-            with suppress(Exception):
-                pool.putconn(conn, close=True)
-            continue
-    # As a fallback, reset the pool and get a fresh connection.
-    close_pool()
-    pool = _get_pool()
-    return pool.getconn()
+            router.mark_failed()
+            reason = "replica_unavailable"
+        else:
+            if router.needs_check():
+                try:
+                    with conn.cursor() as cur:
+                        cur.execute(SQL_REPLICA_LAG)
+                        router.record_lag(float(cur.fetchone()[0]))
+                    if not conn.autocommit:
+                        conn.rollback()
+                except Exception:
+                    pool.putconn(conn, close=True)
+                    router.mark_failed()
+                    reason = "replica_unavailable"
+            if reason is None and router.lagging():
+                pool.putconn(conn)
+                reason = "replica_lagging"
+            if reason is None:
+                router.count("replica", read)
+                return pool, conn
+    router.count("primary", reason)
+    return None
 
 
 @contextmanager
-def db_conn():
-    pool = _get_pool()
-    conn = _get_conn()
+def db_conn(*, read: str | None = None, key: Any = None):
+    """Borrow a pooled connection: the primary, or a replica when `read` allows it."""
+    borrowed = _replica_conn(read, key) if read else None
+    pool, conn = borrowed if borrowed is not None else (_get_pool(), None)
+    if conn is None:
+        conn = pool.getconn()
     try:
         yield conn
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        if borrowed is not None:
+            router = _get_router()
+            if router is not None:
+                router.mark_failed()
+        raise
     finally:
         with suppress(Exception):
             pool.putconn(conn)
 
 
+def run_read(fn: Callable[[Any], T], *, read: str, key: Any = None) -> T:
+    """Run `fn(conn)` where `read` allows; a replica failing mid-query is retried once on the primary."""
+    borrowed = _replica_conn(read, key)
+    if borrowed is not None:
+        pool, conn = borrowed
+        try:
+            return fn(conn)
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            # Includes recovery-conflict cancellations and timeouts on a busy replica.
+            router = _get_router()
+            if router is not None:
+                router.mark_failed()
+                router.count("primary", "replica_error")
+        finally:
+            with suppress(Exception):
+                pool.putconn(conn)
+    with db_conn() as conn:
+        return fn(conn)
+
+
 def close_pool() -> None:
-    global _pool
-    if _pool is None:
-        return
-    try:
-        _pool.closeall()
-    finally:
-        _pool = None
+    global _pool, _replica_pool
+    pools, _pool, _replica_pool = [_pool, _replica_pool], None, None
+    for pool in pools:
+        if pool is not None:
+            pool.closeall()
 
 
 def db_ping() -> bool:
@@ -100,3 +507,238 @@ def db_ping() -> bool:
         return True
     except Exception:
         return False
+
+
+async def _stamp_idle(conn: AsyncConnection) -> None:
+    conn._base2_idle_since = time.monotonic()
+
+
+async def _check_if_idle(conn: AsyncConnection) -> None:
+    # Pre-ping only connections that sat idle for a while; a busy pool pays nothing.
+    idle_since = getattr(conn, "_base2_idle_since", 0.0)
+    if time.monotonic() - idle_since >= settings.DB_POOL_PING_AFTER_IDLE_SEC:
+        await AsyncConnectionPool.check_connection(conn)
+
+
+def _new_async_pool(conninfo: str, *, read_only: bool = False) -> AsyncConnectionPool:
+    return AsyncConnectionPool(
+        conninfo=conninfo,
+        min_size=settings.DB_POOL_MIN,
+        max_size=settings.DB_POOL_MAX,
+        kwargs={
+            "autocommit": True,
+            "connect_timeout": settings.DB_CONNECT_TIMEOUT_SEC,
+            "options": _session_options(read_only=read_only),
+            "application_name": "base2-api",
+            # None turns prepared statements off entirely, including prepare=True.
+            "prepare_threshold": 5 if settings.DB_PREPARED_STATEMENTS else None,
+        },
+        configure=_stamp_idle,
+        check=_check_if_idle,
+        reset=_stamp_idle,
+        timeout=float(settings.DB_POOL_ACQUIRE_TIMEOUT_SEC),
+        max_lifetime=float(settings.DB_POOL_MAX_LIFETIME_SEC),
+        max_idle=float(settings.DB_POOL_MAX_IDLE_SEC),
+        open=False,
+    )
+
+
+async def _get_async_pool() -> AsyncConnectionPool:
+    global _async_pool, _async_pool_loop
+    loop = asyncio.get_running_loop()
+    if _async_pool is not None and _async_pool_loop is loop:
+        return _async_pool
+
+    pool = _new_async_pool(_build_dsn())
+    await pool.open(wait=False)
+    _async_pool, _async_pool_loop = pool, loop
+    return pool
+
+
+async def _get_async_replica_pool() -> AsyncConnectionPool:
+    global _async_replica_pool, _async_replica_pool_loop
+    loop = asyncio.get_running_loop()
+    if _async_replica_pool is not None and _async_replica_pool_loop is loop:
+        return _async_replica_pool
+
+    dsn = _build_replica_dsn()
+    if not dsn:
+        raise RuntimeError("DATABASE_REPLICA_URL is not set")
+    pool = _new_async_pool(dsn, read_only=True)
+    await pool.open(wait=False)
+    _async_replica_pool, _async_replica_pool_loop = pool, loop
+    return pool
+
+
+def _async_replica_connects_failing(pool: AsyncConnectionPool) -> bool:
+    """True if the pool failed to open a replica connection since the last call."""
+    global _async_replica_connect_errors
+    errors = int(pool.get_stats().get("connections_errors", 0))
+    failing = errors > _async_replica_connect_errors
+    _async_replica_connect_errors = errors
+    return failing
+
+
+async def _async_replica_conn(read: str, key: Any) -> tuple[AsyncConnectionPool, AsyncConnection] | None:
+    """Asyncio counterpart of _replica_conn."""
+    router = _get_router()
+    if router is None:
+        return None
+    reason = router.choose(read, key)
+    if reason is None:
+        pool: AsyncConnectionPool | None = None
+        try:
+            pool = await _get_async_replica_pool()
+            # A down replica shows up as a timeout here (the pool keeps
+            # reconnecting in the background), so do not wait the full
+            # acquire timeout before falling back.
+            conn = await pool.getconn(
+                timeout=min(float(settings.DB_POOL_ACQUIRE_TIMEOUT_SEC), float(settings.DB_CONNECT_TIMEOUT_SEC))
+            )
+        except PoolTimeout:
+            # Like ServiceOverloaded on the sync path: a saturated replica is
+            # busy, not failed. Only failing background connects mean it is down.
+            if pool is not None and _async_replica_connects_failing(pool):
+                router.mark_failed()
+                reason = "replica_unavailable"
+            else:
+                reason = "replica_busy"
+        except Exception:
+            router.mark_failed()
+            reason = "replica_unavailable"
+        else:
+            if router.needs_check():
+                try:
+                    async with conn.cursor() as cur:
+                        await cur.execute(SQL_REPLICA_LAG)
+                        router.record_lag(float((await cur.fetchone())[0]))
+                except Exception:
+                    await pool.putconn(conn)
+                    router.mark_failed()
+                    reason = "replica_unavailable"
+            if reason is None and router.lagging():
+                await pool.putconn(conn)
+                reason = "replica_lagging"
+            if reason is None:
+                router.count("replica", read)
+                return pool, conn
+    router.count("primary", reason)
+    return None
+
+
+@asynccontextmanager
+async def async_db_conn(*, read: str | None = None, key: Any = None) -> AsyncIterator[AsyncConnection]:
+    """Borrow an autocommit connection from the asyncio pool.
+
+    Pass `read=READ_ONLY` or `read=READ_YOUR_WRITES` (with `key`) to let a
+    replica serve it. Use `async with conn.transaction():` for multi-statement
+    units of work.
+    """
+    borrowed = await _async_replica_conn(read, key) if read else None
+    if borrowed is not None:
+        pool, conn = borrowed
+    else:
+        pool = await _get_async_pool()
+        try:
+            conn = await pool.getconn()
+        except PoolTimeout as e:
+            raise ServiceOverloaded("db_pool") from e
+    try:
+        yield conn
+    except (psycopg.OperationalError, psycopg.InterfaceError):
+        if borrowed is not None:
+            router = _get_router()
+            if router is not None:
+                router.mark_failed()
+        raise
+    finally:
+        await pool.putconn(conn)
+
+
+async def run_read_async(fn: Callable[[AsyncConnection], Awaitable[T]], *, read: str, key: Any = None) -> T:
+    """Asyncio counterpart of run_read."""
+    borrowed = await _async_replica_conn(read, key)
+    if borrowed is not None:
+        pool, conn = borrowed
+        try:
+            return await fn(conn)
+        except (psycopg.OperationalError, psycopg.InterfaceError):
+            router = _get_router()
+            if router is not None:
+                router.mark_failed()
+                router.count("primary", "replica_error")
+        finally:
+            await pool.putconn(conn)
+    async with async_db_conn() as conn:
+        return await fn(conn)
+
+
+async def close_async_pool() -> None:
+    global _async_pool, _async_pool_loop, _async_replica_pool, _async_replica_pool_loop
+    pools = [_async_pool, _async_replica_pool]
+    _async_pool, _async_pool_loop = None, None
+    _async_replica_pool, _async_replica_pool_loop = None, None
+    for pool in pools:
+        if pool is not None:
+            with suppress(Exception):
+                await pool.close()
+
+
+async def async_db_ping() -> bool:
+    try:
+        async with async_db_conn() as conn, conn.cursor() as cur:
+            await cur.execute("SELECT 1")
+            await cur.fetchone()
+        return True
+    except Exception:
+        return False
+
+
+def _pool_samples() -> list[tuple[str, str, str, dict[str, str], float]]:
+    samples: list[tuple[str, str, str, dict[str, str], float]] = []
+
+    def add(pool_name: str, stats: dict[str, float]) -> None:
+        labels = {"pool": pool_name}
+        samples.extend(
+            [
+                ("base2_api_db_pool_connections", "gauge", "Open DB connections by state", {**labels, "state": "in_use"}, stats["in_use"]),
+                ("base2_api_db_pool_connections", "gauge", "Open DB connections by state", {**labels, "state": "idle"}, stats["idle"]),
+                ("base2_api_db_pool_max_connections", "gauge", "Configured DB pool size limit", labels, stats["max"]),
+                ("base2_api_db_pool_waiting", "gauge", "Callers currently waiting for a DB connection", labels, stats["waiting"]),
+                ("base2_api_db_pool_wait_seconds_sum", "counter", "Total time spent waiting for DB connections", labels, stats["wait_seconds_sum"]),
+                ("base2_api_db_pool_wait_seconds_count", "counter", "DB connection acquisitions", labels, stats["acquired_total"]),
+                ("base2_api_db_pool_timeouts_total", "counter", "DB connection acquisitions that timed out", labels, stats["timeouts_total"]),
+            ]
+        )
+
+    def add_async(pool_name: str, apool: AsyncConnectionPool) -> None:
+        raw = apool.get_stats()
+        size = raw.get("pool_size", 0)
+        available = raw.get("pool_available", 0)
+        add(
+            pool_name,
+            {
+                "in_use": max(0, size - available),
+                "idle": available,
+                "max": raw.get("pool_max", settings.DB_POOL_MAX),
+                "waiting": raw.get("requests_waiting", 0),
+                "wait_seconds_sum": raw.get("requests_wait_ms", 0) / 1000.0,
+                "acquired_total": raw.get("requests_num", 0),
+                "timeouts_total": raw.get("requests_errors", 0),
+            },
+        )
+
+    for name, pool in (("sync", _pool), ("replica_sync", _replica_pool)):
+        if pool is not None:
+            add(name, pool.stats())
+    for name, apool in (("async", _async_pool), ("replica_async", _async_replica_pool)):
+        if apool is not None:
+            add_async(name, apool)
+
+    router = _router
+    if router is not None:
+        samples.extend(router.samples())
+    return samples
+
+
+metrics.register_collector(_pool_samples)
@@ -8,3 +8,7 @@ class UpstreamBadResponse(Exception):
 
 class ConfigError(Exception):
     """Raised when application configuration is invalid or missing."""
+
+
+class ServiceOverloaded(Exception):
+    """Raised when a bounded local work queue is full and the request should be shed."""
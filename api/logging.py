@@ -1,14 +1,28 @@
 from __future__ import annotations
 
+import atexit
+import copy
 import json
 import logging
+import logging.handlers
 import os
+import queue
+import random
 import re
 import sys
+import threading
+from contextlib import suppress
 from contextvars import ContextVar
 from datetime import datetime, timezone
+from types import ModuleType
 from typing import Any
 
+_orjson: ModuleType | None
+try:  # Optional fast JSON encoder.
+    import orjson as _orjson
+except Exception:  # pragma: no cover
+    _orjson = None
+
 _request_id_ctx: ContextVar[str | None] = ContextVar("request_id", default=None)
 
 
@@ -71,18 +85,29 @@ def _redact_value(value: Any) -> Any:
     return value
 
 
+# Attributes every LogRecord has; only `extra=` fields are candidates for redaction.
+_STANDARD_RECORD_ATTRS = frozenset(logging.makeLogRecord({}).__dict__) | {"message", "asctime"}
+
+# Free-text fields that JsonFormatter emits and that may carry credentials.
+_TEXT_FIELDS = ("path", "user_agent")
+
+
 class RedactingFilter(logging.Filter):
+    """Scrub the rendered message, sensitive `extra=` keys and emitted free-text fields."""
+
     def filter(self, record: logging.LogRecord) -> bool:
         try:
-            if isinstance(record.msg, str):
-                record.msg = _redact_text(record.msg)
-
-            # Scrub common extra fields if present.
-            for key, raw in list(record.__dict__.items()):
-                if _is_sensitive_key(str(key)):
+            message = record.getMessage()
+            redacted = _redact_text(message)
+            if redacted != message or record.args:
+                record.msg = redacted
+                record.args = None
+
+            for key in list(record.__dict__.keys() - _STANDARD_RECORD_ATTRS):
+                if _is_sensitive_key(key):
                     record.__dict__[key] = "[REDACTED]"
-                elif isinstance(raw, (dict, list, tuple, set, str, bytes)):
-                    record.__dict__[key] = _redact_value(raw)
+                elif key in _TEXT_FIELDS:
+                    record.__dict__[key] = _redact_value(record.__dict__[key])
         except Exception:
             # Never block logging.
             return True
@@ -97,13 +122,20 @@ def get_request_id() -> str | None:
     return _request_id_ctx.get()
 
 
+def _dumps(payload: dict[str, Any]) -> str:
+    if _orjson is not None:
+        return _orjson.dumps(payload, default=str).decode("utf-8")
+    return json.dumps(payload, ensure_ascii=False, default=str)
+
+
 class JsonFormatter(logging.Formatter):
     def __init__(self, *, service: str):
         super().__init__()
         self._service = service
 
     def format(self, record: logging.LogRecord) -> str:
-        timestamp = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+        # Use the record time: with the queued pipeline, formatting happens later.
+        timestamp = datetime.fromtimestamp(record.created, timezone.utc).isoformat().replace("+00:00", "Z")
 
         payload: dict[str, Any] = {
             "timestamp": timestamp,
@@ -132,9 +164,12 @@ class JsonFormatter(logging.Formatter):
 
         if record.exc_info:
             payload["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            # Already rendered by _BoundedQueueHandler before crossing threads.
+            payload["exc_info"] = record.exc_text
 
         try:
-            return json.dumps(payload, ensure_ascii=False)
+            return _dumps(payload)
         except Exception:
             # Never break the app due to logging serialization.
             return json.dumps(
@@ -148,20 +183,227 @@ class JsonFormatter(logging.Formatter):
             )
 
 
+def _env_rate(raw: str | None, default: float) -> float:
+    try:
+        return min(1.0, max(0.0, float(raw))) if raw not in (None, "") else default
+    except ValueError:
+        return default
+
+
+class AccessLogSampler:
+    """Decide which successful requests get an access log line.
+
+    Errors (status >= 400) and requests at or above `slow_ms` are always
+    logged. Other requests to `exclude_paths` (probes) are dropped, and the
+    rest are kept with the probability for their route template (falling back
+    to `default_rate`). Dropped lines are counted by route and reason.
+    """
+
+    def __init__(
+        self,
+        *,
+        default_rate: float = 1.0,
+        route_rates: dict[str, float] | None = None,
+        exclude_paths: frozenset[str] = frozenset(),
+        slow_ms: float = 1000.0,
+    ) -> None:
+        self.default_rate = default_rate
+        self.route_rates = dict(route_rates or {})
+        self.exclude_paths = exclude_paths
+        self.slow_ms = slow_ms
+        self._lock = threading.Lock()
+        self.sampled_out: dict[tuple[str, str], int] = {}
+
+    @classmethod
+    def from_env(cls) -> "AccessLogSampler":
+        route_rates: dict[str, float] = {}
+        # ACCESS_LOG_ROUTE_RATES="/api/users/me=0.1,/api/auth/refresh=0.25"
+        for item in (os.getenv("ACCESS_LOG_ROUTE_RATES", "") or "").split(","):
+            route, sep, rate = item.strip().rpartition("=")
+            if sep and route:
+                route_rates[route.strip()] = _env_rate(rate.strip(), 1.0)
+        exclude = os.getenv("ACCESS_LOG_EXCLUDE_PATHS")
+        if exclude is None:
+            exclude = "/api/health,/api/metrics"
+        try:
+            slow_ms = float(os.getenv("ACCESS_LOG_SLOW_MS", "1000"))
+        except ValueError:
+            slow_ms = 1000.0
+        return cls(
+            default_rate=_env_rate(os.getenv("ACCESS_LOG_SAMPLE_RATE"), 1.0),
+            route_rates=route_rates,
+            exclude_paths=frozenset(p.strip() for p in exclude.split(",") if p.strip()),
+            slow_ms=slow_ms,
+        )
+
+    def should_log(self, *, route: str, path: str, status: int, latency_ms: float) -> bool:
+        if status >= 400 or latency_ms >= self.slow_ms:
+            return True
+        key = route or path
+        if path in self.exclude_paths or key in self.exclude_paths:
+            self._count(key, "excluded")
+            return False
+        rate = self.route_rates.get(key, self.default_rate)
+        if rate >= 1.0 or random.random() < rate:
+            return True
+        self._count(key, "sampled")
+        return False
+
+    def _count(self, route: str, reason: str) -> None:
+        with self._lock:
+            self.sampled_out[(route, reason)] = self.sampled_out.get((route, reason), 0) + 1
+
+    def samples(self) -> list[tuple[str, str, str, dict[str, str], float]]:
+        with self._lock:
+            counts = sorted(self.sampled_out.items())
+        return [
+            ("base2_api_access_log_sampled_out_total", "counter", "Access log lines skipped by the sampling policy", {"route": route, "reason": reason}, n)
+            for (route, reason), n in counts
+        ]
+
+
+access_log_sampler = AccessLogSampler.from_env()
+
+
+class _BoundedQueueHandler(logging.handlers.QueueHandler):
+    """Hand records to the writer thread; drop (and count) when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.maxsize = log_queue.maxsize
+        self._dropped_lock = threading.Lock()
+        self.dropped: dict[str, int] = {}
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve everything that depends on the calling thread (args, traceback)
+        # but leave JSON rendering and redaction to the writer thread.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        if getattr(record, "request_id", None) is None:
+            request_id = get_request_id()
+            if request_id:
+                record.request_id = request_id
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped[record.levelname] = self.dropped.get(record.levelname, 0) + 1
+
+
+class _StdoutHandler(logging.StreamHandler):
+    """StreamHandler that always writes to the current sys.stdout."""
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, _value) -> None:
+        pass
+
+
+_listener: logging.handlers.QueueListener | None = None
+_queue_handler: _BoundedQueueHandler | None = None
+
+
+def _stop_listener() -> None:
+    global _listener
+    listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+
+
+def _restart_listener_after_fork() -> None:
+    # The writer thread does not survive fork() and may have held the queue's
+    # lock; give the child a fresh queue and writer.
+    global _listener
+    if _listener is None or _queue_handler is None:
+        return
+    fresh: queue.Queue = queue.Queue(maxsize=_queue_handler.maxsize)
+    _queue_handler.queue = fresh
+    _listener = logging.handlers.QueueListener(fresh, *_listener.handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def flush_logging() -> None:
+    """Write out everything queued so far (e.g. before exiting on a fatal error)."""
+    global _listener
+    listener = _listener
+    if listener is None:
+        return
+    listener.stop()
+    _listener = logging.handlers.QueueListener(listener.queue, *listener.handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def dropped_log_records() -> dict[str, int]:
+    """Records dropped because the log queue was full, by level."""
+    handler = _queue_handler
+    if handler is None:
+        return {}
+    with handler._dropped_lock:
+        return dict(handler.dropped)
+
+
+def _log_samples() -> list[tuple[str, str, str, dict[str, str], float]]:
+    return [
+        ("base2_api_log_records_dropped_total", "counter", "Log records dropped because the log queue was full", {"level": level}, count)
+        for level, count in sorted(dropped_log_records().items())
+    ]
+
+
 def configure_logging(*, service: str) -> None:
+    """Route all logging through a bounded queue drained by a background writer.
+
+    Set LOG_ASYNC=false to write synchronously (e.g. for debugging).
+    """
+    global _listener, _queue_handler
+
     level_name = os.getenv("LOG_LEVEL", "INFO").upper()
     level = getattr(logging, level_name, logging.INFO)
 
-    handler = logging.StreamHandler(sys.stdout)
+    handler = _StdoutHandler()
     handler.setFormatter(JsonFormatter(service=service))
     handler.addFilter(RedactingFilter())
 
     root = logging.getLogger()
     root.setLevel(level)
 
-    # Replace existing handlers to prevent duplicated logs in container runtimes.
-    root.handlers = [handler]
+    _stop_listener()
+    if (os.getenv("LOG_ASYNC", "true") or "").strip().lower() in {"0", "false", "no", "off"}:
+        _queue_handler = None
+        # Replace existing handlers to prevent duplicated logs in container runtimes.
+        root.handlers = [handler]
+    else:
+        try:
+            max_size = int(os.getenv("LOG_QUEUE_MAX", "10000"))
+        except ValueError:
+            max_size = 10000
+        log_queue: queue.Queue = queue.Queue(maxsize=max(1, max_size))
+        _queue_handler = _BoundedQueueHandler(log_queue)
+        _listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+        _listener.start()
+        root.handlers = [_queue_handler]
 
     # Keep common noisy libraries from spamming JSON logs.
     logging.getLogger("httpx").setLevel(logging.WARNING)
     logging.getLogger("urllib3").setLevel(logging.WARNING)
+
+    with suppress(ImportError):
+        from api.metrics import metrics
+
+        metrics.register_collector(_log_samples)
+        metrics.register_collector(access_log_sampler.samples)
+
+
+# Flush queued records on interpreter exit.
+atexit.register(_stop_listener)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_listener_after_fork)
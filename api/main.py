@@ -1,16 +1,15 @@
 from fastapi import FastAPI, HTTPException, Body, Request
-from fastapi.responses import JSONResponse
+import asyncio
 import logging
 import os
-import time
-from celery.result import AsyncResult
-from api import tasks  # ensure tasks module is importable
-from api.db import db_ping
+from api.db import async_db_ping, close_async_pool
 from fastapi.middleware.cors import CORSMiddleware
 
-from api.logging import configure_logging
+from api.logging import configure_logging, flush_logging
+from api.middleware.request_context import RequestContextMiddleware
+from api.precomputed_json import PrecomputedJson
 from typing import Any
-from contextlib import suppress
+from contextlib import asynccontextmanager, suppress
 
 _metrics: Any
 try:
@@ -35,6 +34,8 @@ except Exception as e:
     _boot_logger = logging.getLogger("api.boot")
     _boot_logger.error("settings_import_failed", extra={"env": env_val, "error": str(e)})
     if env_val in {"staging", "production"}:
+        with suppress(Exception):
+            flush_logging()
         raise
     # Development fallback only
     class _Fallback:
@@ -45,6 +46,7 @@ except Exception as e:
         API_OPENAPI_URL = os.getenv("API_OPENAPI_URL", "/openapi.json") or "/openapi.json"
         FRONTEND_URL = os.getenv("FRONTEND_URL", "") or ""
         E2E_TEST_MODE = (os.getenv("E2E_TEST_MODE", "") or "").strip().lower() in {"1", "true", "yes", "on"}
+        API_LAZY_IMPORTS = (os.getenv("API_LAZY_IMPORTS", "") or "").strip().lower() in {"1", "true", "yes", "on"}
 
     settings = _Fallback()
 
@@ -54,23 +56,81 @@ _redoc_url = str(getattr(settings, "API_REDOC_URL", "/redoc"))
 _openapi_url = str(getattr(settings, "API_OPENAPI_URL", "/openapi.json"))
 
 _E2E_TEST_MODE = bool(getattr(settings, "E2E_TEST_MODE", False))
+_LAZY_IMPORTS = bool(getattr(settings, "API_LAZY_IMPORTS", False))
+
+
+def _celery_tasks():
+    # Celery (and its result backend) is the single most expensive import in
+    # the API; with API_LAZY_IMPORTS it is loaded by the first Celery request.
+    from api import tasks
+
+    return tasks
+
+
+if not _LAZY_IMPORTS:
+    _celery_tasks()  # fail at boot, not on first use, if tasks cannot import
 
 configure_logging(service="api")
 logger = logging.getLogger("api.http")
 
+
+@asynccontextmanager
+async def _lifespan(_app: FastAPI):
+    with suppress(Exception):
+        # Resolve JWT key material once per worker, before the first request.
+        from api.auth.tokens import get_token_verifier
+
+        get_token_verifier()
+    if not _LAZY_IMPORTS:
+        with suppress(Exception):
+            # Every route is registered by now: serialize the schema once.
+            _openapi_document()
+    yield
+    with suppress(Exception):
+        from api.auth.audit_buffer import flush_audit_events
+
+        await asyncio.to_thread(flush_audit_events)
+    with suppress(Exception):
+        await close_async_pool()
+    with suppress(Exception):
+        from api.auth.passwords import shutdown_hash_executor
+
+        shutdown_hash_executor()
+
+
 app = FastAPI(
     title="Base2 API",
+    lifespan=_lifespan,
     docs_url=(_docs_url if _docs_enabled else None),
     redoc_url=(_redoc_url if _docs_enabled else None),
     openapi_url=(_openapi_url if _docs_enabled else None),
 )
 
 
+_openapi_doc: PrecomputedJson | None = None
+
+
+def _openapi_document() -> PrecomputedJson:
+    # The schema is static once all routes are registered, so it is encoded
+    # (and compressed) a single time instead of on every request.
+    global _openapi_doc
+    if _openapi_doc is None:
+        _openapi_doc = PrecomputedJson(app.openapi())
+    return _openapi_doc
+
+
 @app.get("/api/openapi.json", include_in_schema=False)
-async def openapi_alias():
+async def openapi_alias(request: Request):
     # Keep /api/openapi.json stable for contract/runtime checks even if
     # docs/openapi are served at /openapi.json (e.g., swagger subdomain).
-    return JSONResponse(app.openapi())
+    return _openapi_document().response(request)
+
+
+if app.openapi_url:
+    # Serve the docs URL from the same precomputed document instead of
+    # FastAPI's default route, which re-encodes the schema per request.
+    app.router.routes[:] = [r for r in app.router.routes if getattr(r, "path", None) != app.openapi_url]
+    app.add_api_route(app.openapi_url, openapi_alias, include_in_schema=False)
 
 # Observability: optional OpenTelemetry
 try:
@@ -116,74 +176,9 @@ except Exception:
 
 # Schema ownership is Django. API must not run migrations at boot.
 
-# Middleware: request id
-try:
-    from api.middleware.request_id import request_id_middleware
-
-    @app.middleware("http")
-    async def _add_request_id(request: Request, call_next):
-        return await request_id_middleware(request, call_next)
-except Exception:
-    pass
-
-# Middleware: tenant context
-try:
-    from api.middleware.tenant import tenant_context_middleware
-
-    @app.middleware("http")
-    async def _add_tenant_context(request: Request, call_next):
-        return await tenant_context_middleware(request, call_next)
-except Exception:
-    pass
-
-
-@app.middleware("http")
-async def _access_log(request: Request, call_next):
-    start = time.perf_counter()
-    try:
-        response = await call_next(request)
-    except Exception:
-        latency_ms = int((time.perf_counter() - start) * 1000)
-        req_id = getattr(request.state, "request_id", "")
-        try:
-            if metrics is not None:
-                metrics.observe(status=500, latency_ms=latency_ms)
-        except Exception:
-            pass
-        logger.exception(
-            "request_failed",
-            extra={
-                "request_id": req_id,
-                "method": request.method,
-                "path": request.url.path,
-                "status": 500,
-                "latency_ms": latency_ms,
-                "client_ip": (request.client.host if request.client else "unknown"),
-                "user_agent": request.headers.get("user-agent", ""),
-            },
-        )
-        raise
-
-    latency_ms = int((time.perf_counter() - start) * 1000)
-    req_id = getattr(request.state, "request_id", "")
-    try:
-        if metrics is not None:
-            metrics.observe(status=int(getattr(response, "status_code", 0) or 0), latency_ms=latency_ms)
-    except Exception:
-        pass
-    logger.info(
-        "request",
-        extra={
-            "request_id": req_id,
-            "method": request.method,
-            "path": request.url.path,
-            "status": int(getattr(response, "status_code", 0) or 0),
-            "latency_ms": latency_ms,
-            "client_ip": (request.client.host if request.client else "unknown"),
-            "user_agent": request.headers.get("user-agent", ""),
-        },
-    )
-    return response
+# Middleware: request id, tenant context, timing/metrics and access log in a
+# single pure-ASGI pass. Added last so it wraps everything else (incl. CORS).
+app.add_middleware(RequestContextMiddleware, logger=logger, metrics=metrics)
 
 # Error handlers: ensure consistent {detail}
 try:
@@ -198,6 +193,8 @@ try:
     from fastapi.openapi.utils import get_openapi
 
     def custom_openapi():
+        if app.openapi_schema:
+            return app.openapi_schema
         openapi_schema = get_openapi(
             title=app.title,
             version="0.1.0",
@@ -223,10 +220,8 @@ try:
         app.openapi_schema = openapi_schema
         return app.openapi_schema
 
-    # Assign override and eagerly generate schema so it's ready before first request
+    # Generated on first use (startup), once every route is registered.
     app.openapi = custom_openapi
-    with suppress(Exception):
-        app.openapi()
 except Exception:
     # If OpenAPI customization fails, proceed without breaking runtime.
     pass
@@ -262,7 +257,8 @@ except Exception:
 
 @app.get("/api/health")
 async def health():
-    return {"ok": True, "service": "api", "db_ok": db_ping()}
+    return {"ok": True, "service": "api", "db_ok": await async_db_ping()}
+
 
 
 @app.get("/api/flags")
@@ -298,7 +294,7 @@ async def create_item(payload: dict = DEFAULT_CREATE_ITEM_BODY):
 async def _enqueue_celery_ping(request: Request):
     try:
         rid = getattr(request.state, "request_id", None) or request.headers.get("x-request-id")
-        res = tasks.ping.delay(request_id=(str(rid) if rid else None))
+        res = _celery_tasks().ping.delay(request_id=(str(rid) if rid else None))
         return {"task_id": res.id}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"enqueue_failed: {e}") from e
@@ -309,20 +305,17 @@ async def celery_ping_root(request: Request):
     return await _enqueue_celery_ping(request)
 
 
-async def _read_celery_result(task_id: str):
+async def _read_celery_result(task_id: str, wait: float = 0.0):
     try:
-        ar = AsyncResult(task_id, app=tasks.app)
-        return {
-            "task_id": task_id,
-            "ready": ar.ready(),
-            "successful": ar.successful() if ar.ready() else False,
-            "state": ar.state,
-            "result": (ar.result if ar.ready() else None),
-        }
+        from api.services.task_results import task_result_payload, wait_for_task_meta
+
+        meta = await wait_for_task_meta(_celery_tasks().app.backend, task_id, wait)
+        return task_result_payload(task_id, meta)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"result_failed: {e}") from e
 
 
 @app.get("/api/celery/result/{task_id}")
-async def celery_result_root(task_id: str):
-    return await _read_celery_result(task_id)
+async def celery_result_root(task_id: str, wait: float = 0.0):
+    # ?wait=N long-polls up to N seconds (capped) for the task to finish.
+    return await _read_celery_result(task_id, wait)
@@ -1,31 +1,118 @@
 from __future__ import annotations
 
+from bisect import bisect_left
+from collections import deque
 import threading
 import time
-from collections import deque
+from typing import Callable, Iterable
+
+# (name, type, help, labels, value) produced by collectors at scrape time.
+Sample = tuple[str, str, str, dict[str, str], float]
+
+
+# Upper bounds (seconds) of the request duration histogram buckets.
+LATENCY_BUCKETS_S: tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_STATUS_CLASSES = ("1xx", "2xx", "3xx", "4xx", "5xx")
+
+# Recent latencies each thread keeps for the rolling-window p95 gauge.
+RECENT_LATENCY_WINDOW = 1024
+
+
+class _Shard:
+    """Per-thread accumulator; only its owning thread writes to it."""
+
+    __slots__ = ("requests_total", "responses_by_class", "latency_ms_sum", "recent_ms", "buckets", "sums")
+
+    def __init__(self) -> None:
+        self.requests_total = 0
+        self.responses_by_class: dict[str, int] = dict.fromkeys(_STATUS_CLASSES, 0)
+        self.latency_ms_sum = 0.0
+        self.recent_ms: deque[float] = deque(maxlen=RECENT_LATENCY_WINDOW)
+        # (method, route) -> per-bucket counts, last slot is +Inf.
+        self.buckets: dict[tuple[str, str], list[int]] = {}
+        self.sums: dict[tuple[str, str], float] = {}
+
+
+def _bucket_index(seconds: float) -> int:
+    # First bucket whose upper bound is >= seconds; len(buckets) means +Inf.
+    return bisect_left(LATENCY_BUCKETS_S, seconds)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
 
 
 class ApiMetrics:
     def __init__(self) -> None:
         self._started_at = time.time()
         self._lock = threading.Lock()
-        self._requests_total = 0
-        self._responses_by_class: dict[str, int] = {"1xx": 0, "2xx": 0, "3xx": 0, "4xx": 0, "5xx": 0}
-        self._latency_ms_sum = 0
-        self._latency_ms_count = 0
-        self._recent_latencies_ms: deque[int] = deque(maxlen=1024)
+        self._local = threading.local()
+        self._shards: list[_Shard] = []
+        self._collectors: list[Callable[[], Iterable[Sample]]] = []
 
-    def observe(self, *, status: int, latency_ms: int) -> None:
+    def register_collector(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        """Add a callable polled on every scrape for point-in-time samples (e.g. pool gauges)."""
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def observe(self, *, status: int, latency_ms: float, method: str = "", route: str = "") -> None:
+        """Record one request. `route` should be the route template, not the raw path."""
+        shard = self._shard()
         status_class = f"{int(status) // 100}xx" if status else "unknown"
+        shard.requests_total += 1
+        if status_class in shard.responses_by_class:
+            shard.responses_by_class[status_class] += 1
+        shard.latency_ms_sum += float(latency_ms)
+        shard.recent_ms.append(float(latency_ms))
+
+        series = ((method or "").upper() or "UNKNOWN", route or "unmatched")
+        counts = shard.buckets.get(series)
+        if counts is None:
+            counts = shard.buckets[series] = [0] * (len(LATENCY_BUCKETS_S) + 1)
+            shard.sums[series] = 0.0
+        seconds = float(latency_ms) / 1000.0
+        counts[_bucket_index(seconds)] += 1
+        shard.sums[series] += seconds
+
+    def _merged(
+        self,
+    ) -> tuple[int, dict[str, int], float, list[float], dict[tuple[str, str], list[int]], dict[tuple[str, str], float]]:
         with self._lock:
-            self._requests_total += 1
-            if status_class in self._responses_by_class:
-                self._responses_by_class[status_class] += 1
-            self._latency_ms_sum += int(latency_ms)
-            self._latency_ms_count += 1
-            self._recent_latencies_ms.append(int(latency_ms))
-
-    def _p95_ms(self, samples: list[int]) -> float | None:
+            shards = list(self._shards)
+
+        requests_total = 0
+        responses_by_class = dict.fromkeys(_STATUS_CLASSES, 0)
+        latency_ms_sum = 0.0
+        recent_ms: list[float] = []
+        buckets: dict[tuple[str, str], list[int]] = {}
+        sums: dict[tuple[str, str], float] = {}
+        for shard in shards:
+            requests_total += shard.requests_total
+            for k, v in list(shard.responses_by_class.items()):
+                responses_by_class[k] += v
+            latency_ms_sum += shard.latency_ms_sum
+            # deque.copy() runs without releasing the GIL, so it cannot see a
+            # concurrent append half-done.
+            recent_ms.extend(shard.recent_ms.copy())
+            for series, counts in list(shard.buckets.items()):
+                merged = buckets.setdefault(series, [0] * (len(LATENCY_BUCKETS_S) + 1))
+                for i, c in enumerate(list(counts)):
+                    merged[i] += c
+                sums[series] = sums.get(series, 0.0) + shard.sums.get(series, 0.0)
+        return requests_total, responses_by_class, latency_ms_sum, recent_ms, buckets, sums
+
+    @staticmethod
+    def _p95_ms(samples: list[float]) -> float | None:
         if not samples:
             return None
         samples.sort()
@@ -36,15 +123,13 @@ class ApiMetrics:
 
     def render_prometheus(self) -> str:
         now = time.time()
+        uptime = max(0.0, now - self._started_at)
+        requests_total, responses_by_class, latency_sum, recent_ms, buckets, sums = self._merged()
+        latency_count = sum(sum(counts) for counts in buckets.values())
         with self._lock:
-            uptime = max(0.0, now - self._started_at)
-            requests_total = int(self._requests_total)
-            responses_by_class = dict(self._responses_by_class)
-            latency_sum = int(self._latency_ms_sum)
-            latency_count = int(self._latency_ms_count)
-            recent = list(self._recent_latencies_ms)
+            collectors = list(self._collectors)
 
-        p95 = self._p95_ms(recent)
+        p95 = self._p95_ms(recent_ms)
 
         lines: list[str] = []
         lines.append("# HELP base2_api_uptime_seconds Uptime of the API process in seconds")
@@ -57,12 +142,12 @@ class ApiMetrics:
 
         lines.append("# HELP base2_api_responses_total Total number of HTTP responses by status class")
         lines.append("# TYPE base2_api_responses_total counter")
-        for k in ["1xx", "2xx", "3xx", "4xx", "5xx"]:
+        for k in _STATUS_CLASSES:
             lines.append(f"base2_api_responses_total{{status_class=\"{k}\"}} {int(responses_by_class.get(k, 0))}")
 
         lines.append("# HELP base2_api_request_latency_ms_sum Sum of request latencies in milliseconds")
         lines.append("# TYPE base2_api_request_latency_ms_sum counter")
-        lines.append(f"base2_api_request_latency_ms_sum {latency_sum}")
+        lines.append(f"base2_api_request_latency_ms_sum {int(latency_sum)}")
 
         lines.append("# HELP base2_api_request_latency_ms_count Count of request latencies observed")
         lines.append("# TYPE base2_api_request_latency_ms_count counter")
@@ -73,7 +158,45 @@ class ApiMetrics:
             lines.append("# TYPE base2_api_request_latency_ms_p95 gauge")
             lines.append(f"base2_api_request_latency_ms_p95 {p95:.3f}")
 
+        lines.append("# HELP base2_api_request_duration_seconds HTTP request duration by method and route template")
+        lines.append("# TYPE base2_api_request_duration_seconds histogram")
+        for (method, route), counts in sorted(buckets.items()):
+            labels = f'method="{_escape_label(method)}",route="{_escape_label(route)}"'
+            cumulative = 0
+            for bound, c in zip(LATENCY_BUCKETS_S, counts[:-1], strict=True):
+                cumulative += c
+                lines.append(f'base2_api_request_duration_seconds_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+            cumulative += counts[-1]
+            lines.append(f'base2_api_request_duration_seconds_bucket{{{labels},le="+Inf"}} {cumulative}')
+            lines.append(f"base2_api_request_duration_seconds_sum{{{labels}}} {sums.get((method, route), 0.0):.6f}")
+            lines.append(f"base2_api_request_duration_seconds_count{{{labels}}} {cumulative}")
+
+        lines.extend(self._render_collected(collectors))
+
         return "\n".join(lines) + "\n"
 
+    @staticmethod
+    def _render_collected(collectors: list[Callable[[], Iterable[Sample]]]) -> list[str]:
+        grouped: dict[str, tuple[str, str, list[tuple[dict[str, str], float]]]] = {}
+        for collector in collectors:
+            try:
+                samples = list(collector())
+            except Exception:
+                continue
+            for name, kind, help_text, labels, value in samples:
+                grouped.setdefault(name, (kind, help_text, []))[2].append((labels, value))
+
+        lines: list[str] = []
+        for name, (kind, help_text, values) in grouped.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in values:
+                label_str = ",".join(f'{k}="{_escape_label(str(v))}"' for k, v in labels.items())
+                suffix = f"{{{label_str}}}" if label_str else ""
+                number = float(value)
+                rendered = str(int(number)) if number.is_integer() else f"{number:.6f}"
+                lines.append(f"{name}{suffix} {rendered}")
+        return lines
+
 
 metrics = ApiMetrics()
@@ -2,7 +2,7 @@ from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
-from ..exceptions import UpstreamTimeout, UpstreamBadResponse, ConfigError
+from ..exceptions import UpstreamTimeout, UpstreamBadResponse, ConfigError, ServiceOverloaded
 
 
 def register_error_handlers(app: FastAPI) -> None:
@@ -27,6 +27,10 @@ def register_error_handlers(app: FastAPI) -> None:
     async def config_error_handler(request: Request, exc: ConfigError):
         return JSONResponse(status_code=500, content={"detail": "configuration_error"})
 
+    @app.exception_handler(ServiceOverloaded)
+    async def service_overloaded_handler(request: Request, exc: ServiceOverloaded):
+        return JSONResponse(status_code=503, content={"detail": "service_overloaded"}, headers={"Retry-After": "1"})
+
     @app.exception_handler(Exception)
     async def unhandled_exception_handler(request: Request, exc: Exception):
         # Avoid leaking internals; log via server logs; return generic error
@@ -0,0 +1,106 @@
+import logging
+import time
+import uuid
+from contextlib import suppress
+from typing import Any
+
+from api.logging import AccessLogSampler, access_log_sampler, set_request_id
+from api.middleware.tenant import TENANT_HEADER
+
+_REQUEST_ID_HEADER = b"x-request-id"
+_TENANT_HEADER = TENANT_HEADER.lower().encode("latin-1")
+
+
+class RequestContextMiddleware:
+    """Request id, tenant context, timing, metrics and access log in one ASGI pass.
+
+    Pure ASGI: the response body is passed through untouched (no buffering or
+    extra tasks); only the `http.response.start` message is inspected to add
+    `X-Request-Id` and capture the status.
+    """
+
+    def __init__(
+        self,
+        app: Any,
+        *,
+        logger: logging.Logger,
+        metrics: Any = None,
+        sampler: AccessLogSampler = access_log_sampler,
+    ) -> None:
+        self.app = app
+        self.logger = logger
+        self.metrics = metrics
+        self.sampler = sampler
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        req_id = ""
+        tenant_id = ""
+        user_agent = ""
+        for name, value in scope.get("headers") or ():
+            # First occurrence wins, matching Request.headers.get().
+            if name == _REQUEST_ID_HEADER and not req_id:
+                req_id = value.decode("latin-1")
+            elif name == _TENANT_HEADER and not tenant_id:
+                tenant_id = value.decode("latin-1").strip()
+            elif name == b"user-agent" and not user_agent:
+                user_agent = value.decode("latin-1")
+        req_id = req_id or str(uuid.uuid4())
+
+        state = scope.setdefault("state", {})
+        state["request_id"] = req_id
+        if tenant_id:
+            state["tenant_id"] = tenant_id
+        set_request_id(req_id)
+
+        status = 500
+        req_id_header = (b"X-Request-Id", req_id.encode("latin-1"))
+
+        async def send_with_context(message: dict) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = int(message.get("status") or 0)
+                # Replace, not add: an X-Request-Id set further in is overridden,
+                # as assigning response.headers[...] would.
+                headers = [h for h in message.get("headers") or () if h[0].lower() != _REQUEST_ID_HEADER]
+                message = {**message, "headers": [*headers, req_id_header]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_context)
+        except Exception:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self._observe(scope, 500, elapsed_ms)
+            self.logger.exception("request_failed", extra=self._log_fields(scope, req_id, 500, elapsed_ms, user_agent))
+            raise
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        route = self._observe(scope, status, elapsed_ms)
+        if self.sampler.should_log(route=route, path=scope.get("path", ""), status=status, latency_ms=elapsed_ms):
+            self.logger.info("request", extra=self._log_fields(scope, req_id, status, elapsed_ms, user_agent))
+
+    def _observe(self, scope: dict, status: int, elapsed_ms: float) -> str:
+        # Label by route template ("/api/tenants/{tenant_id}/echo"), never the
+        # raw path, so metric cardinality stays bounded.
+        route = str(getattr(scope.get("route"), "path", "") or "")
+        if self.metrics is not None:
+            with suppress(Exception):
+                self.metrics.observe(status=status, latency_ms=elapsed_ms, method=scope.get("method", ""), route=route)
+        return route
+
+    @staticmethod
+    def _log_fields(scope: dict, req_id: str, status: int, elapsed_ms: float, user_agent: str) -> dict[str, Any]:
+        client = scope.get("client")
+        return {
+            "request_id": req_id,
+            "method": scope.get("method", ""),
+            "path": scope.get("path", ""),
+            "status": status,
+            "latency_ms": int(elapsed_ms),
+            "client_ip": (client[0] if client else "unknown"),
+            "user_agent": user_agent,
+        }
@@ -4,18 +4,6 @@ from fastapi import Request, HTTPException
 TENANT_HEADER = "X-Tenant-Id"
 
 
-async def tenant_context_middleware(request: Request, call_next):
-    """Extract tenant id from header and attach to request.state.
-
-    This does not enforce tenant semantics by itself; routes can consume
-    `request.state.tenant_id` or use `require_tenant()` to enforce presence.
-    """
-    tenant_id = (request.headers.get(TENANT_HEADER, "") or "").strip()
-    if tenant_id:
-        request.state.tenant_id = tenant_id
-    return await call_next(request)
-
-
 def require_tenant(request: Request) -> str:
     """Return the current tenant id from header; raise 400 if missing."""
     tid = getattr(request.state, "tenant_id", None)
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+from typing import Any
+
+from fastapi import Request
+from fastapi.responses import Response
+
+try:  # Optional: only offered when the brotli package is installed.
+    import brotli as _brotli
+except Exception:  # pragma: no cover
+    _brotli = None
+
+
+class PrecomputedJson:
+    """A static JSON document serialized and compressed once, served with ETags.
+
+    Each encoding gets its own strong ETag (`"<sha>"`, `"<sha>-gzip"`,
+    `"<sha>-br"`); If-None-Match matching any of them yields 304, since they
+    all represent the same document.
+    """
+
+    def __init__(self, payload: Any) -> None:
+        # Same encoding as fastapi.responses.JSONResponse.
+        self.body = json.dumps(payload, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+        digest = hashlib.sha256(self.body).hexdigest()[:32]
+        self._variants: dict[str, tuple[bytes, str]] = {"identity": (self.body, f'"{digest}"')}
+        self._variants["gzip"] = (gzip.compress(self.body, compresslevel=9, mtime=0), f'"{digest}-gzip"')
+        if _brotli is not None:
+            self._variants["br"] = (_brotli.compress(self.body), f'"{digest}-br"')
+        self._etags = frozenset(etag for _body, etag in self._variants.values())
+
+    @property
+    def etag(self) -> str:
+        return self._variants["identity"][1]
+
+    def _encoding_for(self, accept_encoding: str) -> str:
+        offered = set()
+        for item in accept_encoding.lower().split(","):
+            coding, _, params = item.strip().partition(";")
+            key, _, value = params.strip().partition("=")
+            if key.strip() == "q":
+                try:
+                    if float(value) <= 0:
+                        continue
+                except ValueError:
+                    continue
+            offered.add(coding.strip())
+        for coding in ("br", "gzip"):
+            if coding in self._variants and (coding in offered or "*" in offered):
+                return coding
+        return "identity"
+
+    def _not_modified(self, if_none_match: str) -> bool:
+        if not if_none_match:
+            return False
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag == "*":
+                return True
+            # If-None-Match uses weak comparison.
+            if tag.startswith("W/"):
+                tag = tag[2:]
+            if tag in self._etags:
+                return True
+        return False
+
+    def response(self, request: Request) -> Response:
+        encoding = self._encoding_for(request.headers.get("accept-encoding", ""))
+        body, etag = self._variants[encoding]
+        headers = {"ETag": etag, "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+
+        if self._not_modified(request.headers.get("if-none-match", "")):
+            return Response(status_code=304, headers=headers)
+
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(content=body, media_type="application/json", headers=headers)
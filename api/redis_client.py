@@ -1,10 +1,18 @@
+import asyncio
 import os
+import threading
+
 import redis
+import redis.asyncio as aioredis
 
 _prefix = os.environ.get("RATE_LIMIT_REDIS_PREFIX", "rate_limit")
 _redis_url = os.environ.get("CELERY_BROKER_URL", "redis://redis:6379/0")
+# Bounds each command on the asyncio client, so request handlers that treat
+# Redis as optional (e.g. the profile cache) fail fast when it is unreachable.
+_async_timeout = float(os.environ.get("REDIS_ASYNC_TIMEOUT_SEC", "0.25") or 0.25)
 
 _client: redis.Redis | None = None
+_async_client: tuple[asyncio.AbstractEventLoop, aioredis.Redis] | None = None
 
 
 def get_client() -> redis.Redis:
@@ -14,6 +22,16 @@ def get_client() -> redis.Redis:
     return _client
 
 
+def get_async_client() -> aioredis.Redis:
+    # redis.asyncio connections belong to the loop that opened them.
+    global _async_client
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client[0] is not loop:
+        client = aioredis.from_url(_redis_url, socket_timeout=_async_timeout, socket_connect_timeout=_async_timeout)
+        _async_client = (loop, client)
+    return _async_client[1]
+
+
 def ping() -> bool:
     try:
         return bool(get_client().ping())
@@ -23,3 +41,21 @@ def ping() -> bool:
 
 def key(*parts: str) -> str:
     return ":".join([_prefix, *parts])
+
+
+_script_lock = threading.Lock()
+_script_client: redis.Redis | None = None
+_scripts: dict[str, object] = {}
+
+
+def script(client: redis.Redis, lua: str):
+    """Return `lua` registered on `client`; calls use EVALSHA and fall back to EVAL on NOSCRIPT."""
+    global _script_client
+    with _script_lock:
+        if _script_client is not client:
+            _scripts.clear()
+            _script_client = client
+        registered = _scripts.get(lua)
+        if registered is None:
+            registered = _scripts[lua] = client.register_script(lua)
+        return registered
@@ -9,6 +9,8 @@ from fastapi import APIRouter, HTTPException, Request, Response
 from contextlib import suppress
 from pydantic import BaseModel
 
+from api.auth.dependencies import CurrentProfile, CurrentUserId
+from api.exceptions import ServiceOverloaded
 from api.security import rate_limit
 from api.settings import settings
 
@@ -155,7 +157,7 @@ async def auth_login(request: Request, response: Response, payload: _LoginReques
         from api.auth.service import login_user
 
         refresh_ttl_days = _env_int("REFRESH_TOKEN_TTL_DAYS", 30)
-        user, tokens = login_user(
+        user, tokens = await login_user(
             email=payload.email,
             password=payload.password,
             ip=ip,
@@ -169,6 +171,9 @@ async def auth_login(request: Request, response: Response, payload: _LoginReques
         if str(e) == "inactive":
             raise HTTPException(status_code=403, detail="Account inactive") from e
         raise HTTPException(status_code=400, detail="Invalid request") from e
+    except ServiceOverloaded:
+        # Hashing pool is saturated; surface as 503 so clients back off.
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail="Login failed") from e
 
@@ -203,7 +208,7 @@ async def auth_register(request: Request, response: Response, payload: _Register
         from api.auth.service import register_user
 
         refresh_ttl_days = _env_int("REFRESH_TOKEN_TTL_DAYS", 30)
-        user, tokens = register_user(
+        user, tokens = await register_user(
             email=payload.email,
             password=payload.password,
             ip=ip,
@@ -220,6 +225,8 @@ async def auth_register(request: Request, response: Response, payload: _Register
                 detail=[{"loc": ["body", "password"], "msg": "Password does not meet policy", "type": "value_error"}],
             ) from e
         raise HTTPException(status_code=400, detail="Invalid request") from e
+    except ServiceOverloaded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail="Registration failed") from e
 
@@ -254,11 +261,11 @@ async def auth_verify_email(request: Request, response: Response):
     token = (payload or {}).get("token")
     try:
         from api.auth.service import verify_email
-        from api.auth.repo import insert_audit_event
+        from api.auth.async_repo import insert_audit_event
 
-        user_id = verify_email(token=str(token or ""))
+        user_id = await verify_email(token=str(token or ""))
         with suppress(Exception):
-            insert_audit_event(
+            await insert_audit_event(
                 user_id=user_id,
                 action="user.verify_email",
                 ip=_client_ip(request),
@@ -267,6 +274,8 @@ async def auth_verify_email(request: Request, response: Response):
         return {"detail": "Email verified"}
     except ValueError as e:
         raise HTTPException(status_code=400, detail="Invalid or expired token") from e
+    except ServiceOverloaded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail="Verification failed") from e
 
@@ -303,16 +312,16 @@ async def auth_forgot_password(request: Request, response: Response):
 
     try:
         from api.auth.service import issue_password_reset
-        from api.auth.repo import insert_audit_event
+        from api.auth.async_repo import insert_audit_event
 
-        issue_password_reset(
+        await issue_password_reset(
             email=str(email or "").strip(),
             host=request.headers.get("host"),
             proto=request.headers.get("x-forwarded-proto"),
             request_id=request.headers.get("x-request-id"),
         )
         with suppress(Exception):
-            insert_audit_event(
+            await insert_audit_event(
                 user_id=None,
                 action="user.reset_password_requested",
                 ip=ip,
@@ -337,11 +346,11 @@ async def auth_reset_password(request: Request, response: Response):
 
     try:
         from api.auth.service import reset_password
-        from api.auth.repo import insert_audit_event
+        from api.auth.async_repo import insert_audit_event
 
-        user_id = reset_password(token=str(token or ""), new_password=str(password or ""))
+        user_id = await reset_password(token=str(token or ""), new_password=str(password or ""))
         with suppress(Exception):
-            insert_audit_event(
+            await insert_audit_event(
                 user_id=user_id,
                 action="user.reset_password",
                 ip=_client_ip(request),
@@ -355,6 +364,8 @@ async def auth_reset_password(request: Request, response: Response):
                 detail=[{"loc": ["body", "password"], "msg": "Password does not meet policy", "type": "value_error"}],
             ) from e
         raise HTTPException(status_code=400, detail="Invalid request or token") from e
+    except ServiceOverloaded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail="Reset failed") from e
 
@@ -374,20 +385,23 @@ async def auth_logout(request: Request, response: Response):
 
     if refresh:
         try:
-            from api.auth.repo import find_refresh_token, revoke_refresh_token
-            from api.auth.repo import insert_audit_event
+            from api.auth.async_repo import find_refresh_token, revoke_refresh_token
+            from api.auth.async_repo import insert_audit_event
             from api.auth.tokens import hash_token
 
-            rec = find_refresh_token(token_hash=hash_token(str(refresh)))
+            rec = await find_refresh_token(token_hash=hash_token(str(refresh)))
             if rec is not None:
-                revoke_refresh_token(token_id=rec["id"], replaced_by_token_id=None)
+                await revoke_refresh_token(token_id=rec["id"], replaced_by_token_id=None)
                 with suppress(Exception):
-                    insert_audit_event(
+                    await insert_audit_event(
                         user_id=rec.get("user_id"),
                         action="auth.logout",
                         ip=_client_ip(request),
                         user_agent=request.headers.get("user-agent", ""),
                     )
+        except ServiceOverloaded:
+            # The refresh token is still valid; ask the client to retry.
+            raise
         except Exception:
             # Enumeration-safe: never error on logout bookkeeping.
             pass
@@ -403,46 +417,12 @@ async def users_logout(request: Request, response: Response):
 
 
 @router.get("/auth/me")
-async def auth_me(request: Request):
-    auth = request.headers.get("authorization", "")
-    if not auth.lower().startswith("bearer "):
-        raise HTTPException(status_code=401, detail="Not authenticated")
-    token = auth.split(" ", 1)[1].strip()
-    if not token:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-
-    try:
-        from api.auth.repo import get_user_by_id
-        from api.auth.tokens import decode_access_token
-        from uuid import UUID
-
-        payload = decode_access_token(token)
-        user_id = UUID(str(payload.get("sub")))
-        user = get_user_by_id(user_id)
-        if user is None:
-            raise HTTPException(status_code=401, detail="Not authenticated")
-        return {
-            "id": str(user.id),
-            "email": user.email,
-            "display_name": user.display_name,
-            "avatar_url": user.avatar_url,
-            "bio": user.bio,
-        }
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=401, detail="Not authenticated") from e
+async def auth_me(profile: CurrentProfile):
+    return profile
 
 
 @router.patch("/auth/me")
-async def auth_me_patch(request: Request):
-    auth = request.headers.get("authorization", "")
-    if not auth.lower().startswith("bearer "):
-        raise HTTPException(status_code=401, detail="Not authenticated")
-    token = auth.split(" ", 1)[1].strip()
-    if not token:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-
+async def auth_me_patch(request: Request, user_id: CurrentUserId):
     try:
         body = await request.json()
     except Exception:
@@ -452,13 +432,9 @@ async def auth_me_patch(request: Request):
     filtered = {k: v for k, v in (body or {}).items() if k in allowed_keys}
 
     try:
-        from api.auth.repo import update_profile
-        from api.auth.tokens import decode_access_token
-        from uuid import UUID
+        from api.auth.async_repo import update_profile
 
-        payload = decode_access_token(token)
-        user_id = UUID(str(payload.get("sub")))
-        user = update_profile(
+        user = await update_profile(
             user_id=user_id,
             display_name=filtered.get("display_name"),
             avatar_url=filtered.get("avatar_url"),
@@ -471,6 +447,8 @@ async def auth_me_patch(request: Request):
             "avatar_url": user.avatar_url,
             "bio": user.bio,
         }
+    except ServiceOverloaded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail="Invalid request") from e
 
@@ -495,7 +473,7 @@ async def auth_refresh(request: Request, response: Response):
         from api.auth.service import refresh_tokens
 
         refresh_ttl_days = _env_int("REFRESH_TOKEN_TTL_DAYS", 30)
-        user, tokens = refresh_tokens(
+        user, tokens = await refresh_tokens(
             refresh_token=refresh,
             ip=ip,
             user_agent=request.headers.get("user-agent", ""),
@@ -504,6 +482,8 @@ async def auth_refresh(request: Request, response: Response):
         )
     except ValueError as e:
         raise HTTPException(status_code=401, detail="Not authenticated") from e
+    except ServiceOverloaded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail="Refresh failed") from e
 
@@ -523,31 +503,20 @@ async def auth_refresh(request: Request, response: Response):
 
 
 @router.get("/auth/sessions")
-async def auth_sessions(request: Request):
-    auth = request.headers.get("authorization", "")
-    if not auth.lower().startswith("bearer "):
-        raise HTTPException(status_code=401, detail="Not authenticated")
-    token = auth.split(" ", 1)[1].strip()
-    if not token:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-
+async def auth_sessions(request: Request, user_id: CurrentUserId):
     refresh = request.cookies.get(_refresh_cookie_name())
 
     try:
-        from api.auth.repo import list_active_refresh_sessions, find_refresh_token
-        from api.auth.tokens import decode_access_token, hash_token
-        from uuid import UUID
-
-        payload = decode_access_token(token)
-        user_id = UUID(str(payload.get("sub")))
+        from api.auth.async_repo import list_active_refresh_sessions, find_refresh_token
+        from api.auth.tokens import hash_token
 
         current_id = None
         if refresh:
-            rec = find_refresh_token(token_hash=hash_token(str(refresh)))
+            rec = await find_refresh_token(token_hash=hash_token(str(refresh)))
             if rec is not None:
                 current_id = rec.get("id")
 
-        sessions = list_active_refresh_sessions(user_id=user_id)
+        sessions = await list_active_refresh_sessions(user_id=user_id)
         out = []
         for s in sessions:
             out.append(
@@ -565,19 +534,14 @@ async def auth_sessions(request: Request):
         return {"sessions": out}
     except HTTPException:
         raise
+    except ServiceOverloaded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail="Invalid request") from e
 
 
 @router.post("/auth/sessions/revoke-others")
-async def auth_sessions_revoke_others(request: Request, response: Response):
-    auth = request.headers.get("authorization", "")
-    if not auth.lower().startswith("bearer "):
-        raise HTTPException(status_code=401, detail="Not authenticated")
-    token = auth.split(" ", 1)[1].strip()
-    if not token:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-
+async def auth_sessions_revoke_others(request: Request, response: Response, user_id: CurrentUserId):
     refresh = request.cookies.get(_refresh_cookie_name())
     if not refresh:
         # In non-cookie mode, allow passing refresh in body.
@@ -591,20 +555,16 @@ async def auth_sessions_revoke_others(request: Request, response: Response):
         raise HTTPException(status_code=401, detail="Not authenticated")
 
     try:
-        from api.auth.repo import find_refresh_token, revoke_all_refresh_tokens_except, insert_audit_event
-        from api.auth.tokens import decode_access_token, hash_token
-        from uuid import UUID
-
-        payload = decode_access_token(token)
-        user_id = UUID(str(payload.get("sub")))
+        from api.auth.async_repo import find_refresh_token, revoke_all_refresh_tokens_except, insert_audit_event
+        from api.auth.tokens import hash_token
 
-        rec = find_refresh_token(token_hash=hash_token(str(refresh)))
+        rec = await find_refresh_token(token_hash=hash_token(str(refresh)))
         if rec is None or rec.get("user_id") != user_id:
             raise HTTPException(status_code=401, detail="Not authenticated")
 
-        revoke_all_refresh_tokens_except(user_id=user_id, keep_token_id=rec["id"])
+        await revoke_all_refresh_tokens_except(user_id=user_id, keep_token_id=rec["id"])
         with suppress(Exception):
-            insert_audit_event(
+            await insert_audit_event(
                 user_id=user_id,
                 action="auth.revoke_other_sessions",
                 ip=_client_ip(request),
@@ -615,6 +575,8 @@ async def auth_sessions_revoke_others(request: Request, response: Response):
         return None
     except HTTPException:
         raise
+    except ServiceOverloaded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail="Invalid request") from e
 
@@ -648,23 +610,23 @@ async def auth_oauth_google(request: Request, response: Response):
         raise HTTPException(status_code=500, detail="OAuth failed") from e
 
     try:
-        from api.auth import repo
+        from api.auth import async_repo as repo
         from api.auth.tokens import create_access_token, new_refresh_token, hash_token
 
         # 1) If provider account already linked, sign in that user.
-        linked = repo.find_oauth_account(provider="google", provider_account_id=ident.sub)
+        linked = await repo.find_oauth_account(provider="google", provider_account_id=ident.sub)
         user = None
         if linked is not None:
-            user = repo.get_user_by_id(linked["user_id"])
+            user = await repo.get_user_by_id(linked["user_id"])
 
         # 2) Else: try to attach to an existing local user by email, under merge rules.
         if user is None:
-            existing = repo.get_user_by_email(ident.email)
+            existing = await repo.get_user_by_email(ident.email)
             if existing is not None:
                 # Merge/link only if local email is already verified OR Google says verified.
                 if (existing.is_email_verified is True) or (ident.email_verified is True):
                     with suppress(Exception):
-                        repo.create_oauth_account(
+                        await repo.create_oauth_account(
                             user_id=existing.id,
                             provider="google",
                             provider_account_id=ident.sub,
@@ -672,7 +634,7 @@ async def auth_oauth_google(request: Request, response: Response):
                         )
                     user = existing
                 else:
-                    repo.insert_audit_event(
+                    await repo.insert_audit_event(
                         user_id=existing.id,
                         action="auth.oauth_link_rejected",
                         ip=ip,
@@ -682,9 +644,9 @@ async def auth_oauth_google(request: Request, response: Response):
                     raise HTTPException(status_code=401, detail="OAuth rejected")
             else:
                 # 3) Create new user and link.
-                user = repo.create_user(email=ident.email, password_hash="")
+                user = await repo.create_user(email=ident.email, password_hash="")
                 with suppress(Exception):
-                    repo.update_profile(
+                    await repo.update_profile(
                         user_id=user.id,
                         display_name=(ident.name or ""),
                         avatar_url=(ident.picture or ""),
@@ -692,9 +654,9 @@ async def auth_oauth_google(request: Request, response: Response):
                     )
                 if ident.email_verified:
                     with suppress(Exception):
-                        repo.set_user_email_verified(user_id=user.id)
+                        await repo.set_user_email_verified(user_id=user.id)
                 with suppress(Exception):
-                    repo.create_oauth_account(
+                    await repo.create_oauth_account(
                         user_id=user.id,
                         provider="google",
                         provider_account_id=ident.sub,
@@ -706,7 +668,7 @@ async def auth_oauth_google(request: Request, response: Response):
 
         refresh_ttl_days = int(os.getenv("REFRESH_TOKEN_TTL_DAYS", "30") or 30)
         refresh = new_refresh_token()
-        _token_id, _expires_at = repo.create_refresh_token(
+        _token_id, _expires_at = await repo.create_refresh_token(
             user_id=user.id,
             token_hash=hash_token(refresh),
             ttl_days=refresh_ttl_days,
@@ -715,7 +677,7 @@ async def auth_oauth_google(request: Request, response: Response):
         )
         access = create_access_token(subject=str(user.id), email=user.email, ttl_minutes=int(os.getenv("JWT_EXPIRE", "15") or 15))
 
-        repo.insert_audit_event(user_id=user.id, action="auth.oauth_login", ip=ip, user_agent=request.headers.get("user-agent", ""), metadata={"provider": "google"})
+        await repo.insert_audit_event(user_id=user.id, action="auth.oauth_login", ip=ip, user_agent=request.headers.get("user-agent", ""), metadata={"provider": "google"})
 
         _set_refresh_cookie(response, refresh, max_age_seconds=refresh_ttl_days * 86400)
         body = {
@@ -731,5 +693,7 @@ async def auth_oauth_google(request: Request, response: Response):
         return body
     except HTTPException:
         raise
+    except ServiceOverloaded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail="OAuth failed") from e
@@ -4,6 +4,7 @@ from fastapi import APIRouter
 from fastapi.responses import Response
 
 from api.metrics import metrics
+from api.services import retention as _retention  # noqa: F401  (registers the purge counters)
 
 router = APIRouter()
 
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import signal
+import threading
+
+from api.logging import configure_logging, flush_logging
+from api.services.outbox_relay import OutboxRelay, connect_listener
+
+
+def main() -> int:
+    configure_logging(service="outbox-relay")
+    stop = threading.Event()
+
+    def _stop(_signum, _frame) -> None:
+        stop.set()
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+
+    try:
+        OutboxRelay(connect=connect_listener).run(stop)
+    finally:
+        flush_logging()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
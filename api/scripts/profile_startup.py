@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def _env(name: str, default: str | None = None) -> str | None:
+    v = os.getenv(name)
+    if v is None:
+        return default
+    v = str(v).strip()
+    return v if v else default
+
+
+def parse_importtime(stderr: str) -> list[ImportTiming]:
+    """Parse `python -X importtime` output ("import time: self | cumulative | name")."""
+    timings: list[ImportTiming] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:") :].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us = int(parts[0].strip())
+            cumulative_us = int(parts[1].strip())
+        except ValueError:
+            continue  # header row
+        timings.append(ImportTiming(module=parts[2].strip(), self_us=self_us, cumulative_us=cumulative_us))
+    return timings
+
+
+def _top_level(module: str) -> str:
+    return module.split(".", 1)[0]
+
+
+def main() -> int:
+    target = _env("STARTUP_PROFILE_MODULE", "api.main") or "api.main"
+    limit = int(_env("STARTUP_PROFILE_TOP", "25") or "25")
+
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True,
+        text=True,
+        env=os.environ.copy(),
+        check=False,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    if proc.returncode != 0:
+        print(f"Startup profile failed: importing {target} exited with {proc.returncode}", file=sys.stderr)
+        print(proc.stderr[-4000:], file=sys.stderr)
+        return proc.returncode
+
+    timings = parse_importtime(proc.stderr)
+    total_us = sum(t.self_us for t in timings)
+
+    by_package: dict[str, int] = {}
+    for t in timings:
+        by_package[_top_level(t.module)] = by_package.get(_top_level(t.module), 0) + t.self_us
+
+    lazy = "on" if (_env("API_LAZY_IMPORTS", "") or "").lower() in {"1", "true", "yes", "on"} else "off"
+    print(f"import {target}: {total_us / 1000:.1f} ms in {len(timings)} modules (process wall {wall_ms:.1f} ms, API_LAZY_IMPORTS={lazy})")
+
+    print(f"\nTop {limit} modules by cumulative import time:")
+    for t in sorted(timings, key=lambda t: t.cumulative_us, reverse=True)[:limit]:
+        print(f"  {t.cumulative_us / 1000:9.1f} ms  {t.self_us / 1000:9.1f} ms self  {t.module}")
+
+    print(f"\nTop {limit} packages by total self time:")
+    for name, us in sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)[:limit]:
+        print(f"  {us / 1000:9.1f} ms  {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -4,7 +4,7 @@ import os
 import sys
 from dataclasses import dataclass
 
-from api.auth.passwords import hash_password
+from api.auth.passwords import hash_password_pooled, shutdown_hash_executor
 from api.auth.repo import (
     create_user,
     get_user_by_email,
@@ -32,7 +32,7 @@ class SeedUser:
 def _ensure_user(u: SeedUser) -> None:
     existing = get_user_by_email(u.email)
     if existing is None:
-        created = create_user(email=u.email, password_hash=hash_password(u.password))
+        created = create_user(email=u.email, password_hash=hash_password_pooled(u.password))
         if u.verified:
             set_user_email_verified(user_id=created.id)
         insert_audit_event(
@@ -45,7 +45,7 @@ def _ensure_user(u: SeedUser) -> None:
         return
 
     # Idempotent behavior: ensure password matches what the caller configured.
-    set_user_password_hash(user_id=existing.id, password_hash=hash_password(u.password))
+    set_user_password_hash(user_id=existing.id, password_hash=hash_password_pooled(u.password))
     if u.verified and not existing.is_email_verified:
         set_user_email_verified(user_id=existing.id)
 
@@ -95,8 +95,11 @@ def main() -> int:
         SeedUser(email="demo2@base2.local", password=demo_password, verified=True),
     ]
 
-    for u in users:
-        _ensure_user(u)
+    try:
+        for u in users:
+            _ensure_user(u)
+    finally:
+        shutdown_hash_executor()
 
     print(f"Seed complete: ensured {len(users)} users")
     return 0
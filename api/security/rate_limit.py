@@ -1,11 +1,16 @@
 import time
 import os
+import threading
+from collections import OrderedDict
 from contextlib import suppress
 from typing import Tuple
-from api.redis_client import get_client, key
+from api.redis_client import get_client, key, script
 
 WINDOW_MS = int(os.environ.get("RATE_LIMIT_WINDOW_MS", "900000"))  # 15 minutes default
 MAX_REQUESTS = int(os.environ.get("RATE_LIMIT_MAX_REQUESTS", "100"))
+# Identifiers already over their limit are remembered in-process until their
+# window ends, so repeated blocked requests skip the Redis round trip.
+LOCAL_DENY_MAX_ENTRIES = int(os.environ.get("RATE_LIMIT_LOCAL_DENY_MAX_ENTRIES", "10000"))
 
 # Scope-specific defaults (can be overridden by env).
 # NOTE: Keep these conservative; they apply to the public auth surface.
@@ -32,6 +37,22 @@ def bucket_start_for_window(ts_ms: int, window_ms: int) -> int:
     return ts_ms - (ts_ms % window_ms)
 
 
+def _env_overrides(scope: str) -> tuple[int | None, int | None]:
+    env_prefix = f"RATE_LIMIT_{scope.upper()}"
+    window_ms: int | None = None
+    max_requests: int | None = None
+    with suppress(Exception):
+        window_ms = int(os.environ[f"{env_prefix}_WINDOW_MS"])
+    with suppress(Exception):
+        max_requests = int(os.environ[f"{env_prefix}_MAX_REQUESTS"])
+    return window_ms, max_requests
+
+
+# Env overrides are read once per scope: the known scopes at import, any other
+# scope on first use.
+_SCOPE_OVERRIDES: dict[str, tuple[int | None, int | None]] = {name: _env_overrides(name) for name in SCOPE_LIMITS}
+
+
 def _limit_for_scope(scope: str) -> tuple[int, int]:
     """Return (window_ms, max_requests) for the given scope.
 
@@ -41,16 +62,67 @@ def _limit_for_scope(scope: str) -> tuple[int, int]:
     3) global defaults (WINDOW_MS / MAX_REQUESTS)
     """
     normalized = (scope or "").strip()
-    env_prefix = f"RATE_LIMIT_{normalized.upper()}"
+    overrides = _SCOPE_OVERRIDES.get(normalized)
+    if overrides is None:
+        overrides = _SCOPE_OVERRIDES.setdefault(normalized, _env_overrides(normalized))
 
     window_ms, max_requests = SCOPE_LIMITS.get(normalized, (WINDOW_MS, MAX_REQUESTS))
-
-    with suppress(Exception):
-        window_ms = int(os.environ.get(f"{env_prefix}_WINDOW_MS", str(window_ms)))
-    with suppress(Exception):
-        max_requests = int(os.environ.get(f"{env_prefix}_MAX_REQUESTS", str(max_requests)))
-
-    return window_ms, max_requests
+    return (
+        overrides[0] if overrides[0] is not None else window_ms,
+        overrides[1] if overrides[1] is not None else max_requests,
+    )
+
+
+# INCR, set the expiry only when the window starts, and report the remaining
+# TTL, all in one round trip. A key that somehow lost its TTL gets one again.
+_INCR_WITH_TTL_LUA = """
+local count = redis.call('INCR', KEYS[1])
+if count == 1 then
+  redis.call('PEXPIRE', KEYS[1], ARGV[1])
+end
+local ttl = redis.call('PTTL', KEYS[1])
+if ttl < 0 then
+  redis.call('PEXPIRE', KEYS[1], ARGV[1])
+  ttl = tonumber(ARGV[1])
+end
+return {count, ttl}
+"""
+
+_deny_lock = threading.Lock()
+_denied: OrderedDict[str, tuple[float, int]] = OrderedDict()
+
+
+def _local_denial(k: str) -> tuple[int, int] | None:
+    """Return (count, retry_after_seconds) if `k` is known to be over limit."""
+    now = time.monotonic()
+    with _deny_lock:
+        hit = _denied.get(k)
+        if hit is None:
+            return None
+        until, count = hit
+        if until <= now:
+            del _denied[k]
+            return None
+    return count, _retry_after_seconds((until - now) * 1000)
+
+
+def _remember_denial(k: str, count: int, ttl_ms: int) -> None:
+    if LOCAL_DENY_MAX_ENTRIES <= 0:
+        return
+    with _deny_lock:
+        _denied[k] = (time.monotonic() + ttl_ms / 1000.0, count)
+        _denied.move_to_end(k)
+        while len(_denied) > LOCAL_DENY_MAX_ENTRIES:
+            _denied.popitem(last=False)
+
+
+def clear_local_denials() -> None:
+    with _deny_lock:
+        _denied.clear()
+
+
+def _retry_after_seconds(remaining_ms: float) -> int:
+    return max(1, int((remaining_ms + 999) // 1000))
 
 
 def incr_and_check(ip: str, scope: str) -> Tuple[int, bool]:
@@ -78,27 +150,23 @@ def incr_and_check_identifier(identifier: str, scope: str) -> Tuple[int, bool]:
 def incr_and_check_identifier_detailed(identifier: str, scope: str) -> tuple[int, bool, int]:
     """Increment counter for (identifier, scope) and check if over limit.
 
-    Returns: (count, over_limit, retry_after_seconds)
+    The window starts at the first hit for (identifier, scope) and lasts
+    window_ms. Returns: (count, over_limit, retry_after_seconds)
     """
-    c = get_client()
-    ts = now_ms()
+    k = key("rl", scope, identifier)
+    denied = _local_denial(k)
+    if denied is not None:
+        count, retry_after = denied
+        return count, True, retry_after
+
     window_ms, max_requests = _limit_for_scope(scope)
-    start = bucket_start_for_window(ts, window_ms)
-    k = key("rl", scope, identifier, str(start))
-    pipe = c.pipeline()
-    pipe.incr(k, 1)
-    # Set expiry to window length in seconds if key is new
-    pipe.pexpire(k, window_ms)
-    val, _ = pipe.execute()
+    c = get_client()
+    val, ttl = script(c, _INCR_WITH_TTL_LUA)(keys=[k], args=[window_ms], client=c)
     count = int(val)
+    ttl_ms = int(ttl)
 
-    over = count > max_requests
-    if not over:
+    if count <= max_requests:
         return count, False, 0
 
-    # Seconds remaining in this fixed window.
-    remaining_ms = (start + window_ms) - ts
-    retry_after = int((remaining_ms + 999) // 1000)
-    if retry_after < 1:
-        retry_after = 1
-    return count, True, retry_after
+    _remember_denial(k, count, ttl_ms)
+    return count, True, _retry_after_seconds(ttl_ms)
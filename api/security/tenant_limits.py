@@ -1,9 +1,9 @@
 import os
 import time
 from contextlib import suppress
-from typing import Tuple
+from typing import Sequence, Tuple
 
-from api.redis_client import get_client, key
+from api.redis_client import get_client, key, script
 
 
 def now_ms() -> int:
@@ -43,12 +43,56 @@ def incr_and_check(tenant_id: str, scope: str) -> Tuple[int, bool]:
     return count, over
 
 
+# GCRA: the key holds the theoretical arrival time (TAT, ms) of the next
+# request. Each request advances it by window/limit; a request is rejected when
+# that would push TAT more than one window ahead of now. This behaves like a
+# sliding window of `limit` requests per `window` in a single O(1) key, and the
+# check-and-update happens atomically in one round trip.
+_GCRA_LUA = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+if limit <= 0 then
+  return {1, 1, window}
+end
+local interval = window / limit
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then
+  tat = now
+end
+local new_tat = tat + interval
+local allow_at = new_tat - window
+if now < allow_at then
+  return {limit + 1, 1, math.ceil(allow_at - now)}
+end
+redis.call('SET', KEYS[1], string.format('%.3f', new_tat), 'PX', math.ceil(new_tat - now))
+return {math.ceil((new_tat - now) / interval - 1e-9), 0, 0}
+"""
+
+# Fixed-window quota counters: INCR each key, set its expiry when the window
+# starts, and report count + TTL for every key in one round trip.
+# ARGV holds one window (seconds) per key.
+_QUOTA_LUA = """
+local out = {}
+for i, k in ipairs(KEYS) do
+  local count = redis.call('INCR', k)
+  local ttl = redis.call('TTL', k)
+  if count == 1 or ttl < 0 then
+    ttl = tonumber(ARGV[i])
+    redis.call('EXPIRE', k, ttl)
+  end
+  out[#out + 1] = count
+  out[#out + 1] = ttl
+end
+return out
+"""
+
+
 def incr_and_check_detailed(tenant_id: str, scope: str) -> tuple[int, bool, int]:
-    """Increment tenant limit counter and return (count, over_limit, retry_after_seconds).
+    """Count a request against the tenant limit and return (count, over_limit, retry_after_seconds).
 
-    Uses a fixed window anchored on first request by leveraging key TTL.
-    This avoids edge flakiness near window boundaries that can occur with
-    purely timestamp-bucketed keys.
+    `count` is the number of requests currently inside the sliding window
+    (limit + 1 when rejected). Rejected requests do not consume capacity.
     """
     tenant = (tenant_id or "").strip()
     if not tenant:
@@ -61,52 +105,49 @@ def incr_and_check_detailed(tenant_id: str, scope: str) -> tuple[int, bool, int]
     # when configuration changes at runtime (e.g., tests overriding window).
     # This also ensures counts reset when window policy changes.
     k = key("tenant_rl", scope, str(window_ms), tenant)
-    pipe = c.pipeline()
-    pipe.incr(k, 1)
-    # Only set expiry if the key is new (no TTL yet)
-    ttl_ms = c.pttl(k)
-    if ttl_ms < 0:
-        pipe.pexpire(k, window_ms)
-    res = pipe.execute()
-    count = int(res[0]) if res else 1
-
-    over = count > max_requests
-    if not over:
-        return count, False, 0
-
-    # Read remaining time in current window from key TTL
-    ttl_ms2 = c.pttl(k)
-    remaining_ms = int(ttl_ms2 if ttl_ms2 > 0 else window_ms)
-    retry_after = int((remaining_ms + 999) // 1000)
+    count, over, retry_ms = script(c, _GCRA_LUA)(keys=[k], args=[now_ms(), window_ms, max_requests], client=c)
+    if not int(over):
+        return int(count), False, 0
+
+    retry_after = int((int(retry_ms) + 999) // 1000)
     if retry_after < 1:
         retry_after = 1
-    return count, True, retry_after
+    return int(count), True, retry_after
 
 
 def quota_key(tenant_id: str, quota: str) -> str:
     return key("tenant_quota", quota.strip(), tenant_id.strip())
 
 
-def check_quota_and_incr(tenant_id: str, quota: str, limit: int, window_seconds: int) -> tuple[int, bool, int]:
-    """Increment a tenant quota counter and check exhaustion.
+def charge_quotas(tenant_id: str, quotas: Sequence[tuple[str, int, int]]) -> list[tuple[int, bool, int]]:
+    """Increment several tenant quota counters in one Redis call.
 
-    Returns (count, exhausted, seconds_until_reset).
+    `quotas` is a sequence of (quota, limit, window_seconds). Every counter is
+    charged; returns one (count, exhausted, seconds_until_reset) per quota, in
+    order.
     """
     tenant = (tenant_id or "").strip()
     if not tenant:
-        return 0, True, window_seconds
+        return [(0, True, int(window_seconds)) for _quota, _limit, window_seconds in quotas]
+    if not quotas:
+        return []
+
     c = get_client()
-    k = quota_key(tenant, quota)
-    pipe = c.pipeline()
-    pipe.incr(k, 1)
-    # Set expiry only if new (NX not directly supported here; emulate by setting if ttl < 0)
-    ttl = c.ttl(k)
-    if ttl < 0:
-        pipe.expire(k, window_seconds)
-    res = pipe.execute()
-    # First result is count; ttl may be updated asynchronously; re-read ttl.
-    count = int(res[0]) if res else 1
-    ttl2 = c.ttl(k)
-    exhausted = count > int(limit)
-    seconds_until_reset = int(ttl2 if ttl2 > 0 else window_seconds)
-    return count, exhausted, seconds_until_reset
+    keys = [quota_key(tenant, quota) for quota, _limit, _window in quotas]
+    windows = [int(window_seconds) for _quota, _limit, window_seconds in quotas]
+    flat = script(c, _QUOTA_LUA)(keys=keys, args=windows, client=c)
+
+    out: list[tuple[int, bool, int]] = []
+    for i, (_quota, limit, window_seconds) in enumerate(quotas):
+        count = int(flat[2 * i])
+        ttl = int(flat[2 * i + 1])
+        out.append((count, count > int(limit), ttl if ttl > 0 else int(window_seconds)))
+    return out
+
+
+def check_quota_and_incr(tenant_id: str, quota: str, limit: int, window_seconds: int) -> tuple[int, bool, int]:
+    """Increment a tenant quota counter and check exhaustion.
+
+    Returns (count, exhausted, seconds_until_reset).
+    """
+    return charge_quotas(tenant_id, [(quota, limit, window_seconds)])[0]
@@ -1,10 +1,18 @@
 from __future__ import annotations
 
 import logging
+import os
+import smtplib
+from contextlib import suppress
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from email.message import EmailMessage
+from email.utils import make_msgid
+from typing import Any
 from uuid import UUID, uuid4
 
+from psycopg2.extras import execute_values
+
 from api.db import db_conn
 
 
@@ -26,6 +34,22 @@ class EmailOutboxRow:
     sent_at: datetime | None
 
 
+def _outbox_row(row: tuple) -> EmailOutboxRow:
+    return EmailOutboxRow(
+        id=UUID(str(row[0])),
+        to_email=row[1],
+        subject=row[2],
+        body_text=row[3],
+        body_html=row[4] or "",
+        status=row[5],
+        provider=row[6],
+        provider_message_id=row[7] or "",
+        error=row[8] or "",
+        created_at=row[9],
+        sent_at=row[10],
+    )
+
+
 def _utcnow() -> datetime:
     return datetime.now(timezone.utc)
 
@@ -45,19 +69,7 @@ def create_outbox_email(*, to_email: str, subject: str, body_text: str, body_htm
             )
             row = cur.fetchone()
 
-    return EmailOutboxRow(
-        id=UUID(str(row[0])),
-        to_email=row[1],
-        subject=row[2],
-        body_text=row[3],
-        body_html=row[4] or "",
-        status=row[5],
-        provider=row[6],
-        provider_message_id=row[7] or "",
-        error=row[8] or "",
-        created_at=row[9],
-        sent_at=row[10],
-    )
+    return _outbox_row(row)
 
 
 def get_outbox_email(outbox_id: UUID) -> EmailOutboxRow | None:
@@ -75,19 +87,7 @@ def get_outbox_email(outbox_id: UUID) -> EmailOutboxRow | None:
     if not row:
         return None
 
-    return EmailOutboxRow(
-        id=UUID(str(row[0])),
-        to_email=row[1],
-        subject=row[2],
-        body_text=row[3],
-        body_html=row[4] or "",
-        status=row[5],
-        provider=row[6],
-        provider_message_id=row[7] or "",
-        error=row[8] or "",
-        created_at=row[9],
-        sent_at=row[10],
-    )
+    return _outbox_row(row)
 
 
 def mark_outbox_sent(
@@ -148,26 +148,231 @@ def queue_email(
     body_text: str,
     body_html: str = "",
     request_id: str | None = None,
-    send_async: bool = True,
 ) -> EmailOutboxRow:
+    """Insert a queued outbox row; the periodic dispatcher (`dispatch_outbox_batch`) sends it."""
     outbox = create_outbox_email(to_email=to_email, subject=subject, body_text=body_text, body_html=body_html)
+    with suppress(Exception):
+        logger.info("email_queued", extra={"outbox_id": str(outbox.id), "request_id": request_id})
+    return outbox
 
-    if not send_async:
-        return outbox
 
-    try:
-        # Import inside function so tests can run without Celery broker.
-        from api.tasks import app as celery_app
+# --- Batch dispatch ---
 
-        celery_app.send_task(
-            "base2.send_email_outbox",
-            args=[str(outbox.id)],
-            kwargs={"request_id": request_id},
+DISPATCH_BATCH_SIZE = int(os.getenv("EMAIL_DISPATCH_BATCH_SIZE", "100") or 100)
+# How long a claimed batch may take to send before other dispatchers may
+# claim its rows again; keep it above batch size x SMTP timeout in practice.
+DISPATCH_LEASE_SEC = int(os.getenv("EMAIL_DISPATCH_LEASE_SEC", "900") or 900)
+
+
+@dataclass(frozen=True)
+class SmtpConfig:
+    host: str
+    port: int
+    username: str
+    password: str
+    use_tls: bool
+    from_email: str
+    timeout_sec: float = 30.0
+
+    @classmethod
+    def from_env(cls) -> SmtpConfig | None:
+        # Same variables as the Django service, so one .env configures both.
+        host = (os.getenv("EMAIL_HOST", "") or "").strip()
+        if not host:
+            return None
+        return cls(
+            host=host,
+            port=int(os.getenv("EMAIL_PORT", "587") or 587),
+            username=os.getenv("EMAIL_HOST_USER", os.getenv("EMAIL_USER", "")) or "",
+            password=os.getenv("EMAIL_HOST_PASSWORD", os.getenv("EMAIL_PASSWORD", "")) or "",
+            use_tls=(os.getenv("EMAIL_USE_TLS", "true") or "").strip().lower() in {"1", "true", "yes", "on"},
+            from_email=os.getenv("DEFAULT_FROM_EMAIL", os.getenv("EMAIL_FROM", "noreply@example.com")) or "",
         )
-    except Exception as e:
-        # Never fail the request path because the broker is down.
-        from contextlib import suppress
-        with suppress(Exception):
-            logger.warning("email_enqueue_failed", extra={"outbox_id": str(outbox.id), "error": str(e)})
 
-    return outbox
+
+class LocalOutboxSender:
+    """Staging-safe sender: records the email as sent without any SMTP configuration."""
+
+    provider = "local_outbox"
+
+    def __enter__(self) -> LocalOutboxSender:
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        return None
+
+    def send(self, _row: EmailOutboxRow) -> str:
+        return "local"
+
+
+class SmtpSender:
+    """Sends a whole batch over one SMTP connection (one TLS handshake and login)."""
+
+    provider = "smtp"
+
+    def __init__(self, config: SmtpConfig) -> None:
+        self.config = config
+        self._smtp: smtplib.SMTP | None = None
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(self.config.host, self.config.port, timeout=self.config.timeout_sec)
+        try:
+            if self.config.use_tls:
+                smtp.starttls()
+            if self.config.username:
+                smtp.login(self.config.username, self.config.password)
+        except Exception:
+            with suppress(Exception):
+                smtp.close()
+            raise
+        return smtp
+
+    def __enter__(self) -> SmtpSender:
+        self._smtp = self._connect()
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        smtp, self._smtp = self._smtp, None
+        if smtp is not None:
+            with suppress(Exception):
+                smtp.quit()
+
+    def send(self, row: EmailOutboxRow) -> str:
+        msg = EmailMessage()
+        msg["Subject"] = row.subject
+        msg["From"] = self.config.from_email
+        msg["To"] = row.to_email
+        msg["Message-ID"] = make_msgid()
+        msg.set_content(row.body_text)
+        if row.body_html:
+            msg.add_alternative(row.body_html, subtype="html")
+
+        if self._smtp is None:
+            self._smtp = self._connect()
+        try:
+            self._smtp.send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            # Servers cap messages or idle time per session: reconnect once.
+            self._smtp = self._connect()
+            self._smtp.send_message(msg)
+        return str(msg["Message-ID"])
+
+
+def default_sender() -> LocalOutboxSender | SmtpSender:
+    config = SmtpConfig.from_env()
+    return SmtpSender(config) if config is not None else LocalOutboxSender()
+
+
+SQL_CLAIM_OUTBOX = """
+WITH claimable AS (
+    SELECT id
+    FROM api_email_outbox
+    WHERE status='queued' OR (status='sending' AND lease_until < NOW())
+    ORDER BY created_at
+    LIMIT %s
+    FOR UPDATE SKIP LOCKED
+)
+UPDATE api_email_outbox AS o
+SET status='sending', lease_until=NOW() + make_interval(secs => %s)
+FROM claimable
+WHERE o.id=claimable.id
+RETURNING o.id, o.to_email, o.subject, o.body_text, o.body_html, o.status, o.provider,
+          o.provider_message_id, o.error, o.created_at, o.sent_at, o.lease_until
+"""
+
+# Only rows still held under this batch's lease are updated: if the lease ran
+# out and another dispatcher re-claimed a row, its outcome is the one kept.
+SQL_RECORD_OUTBOX_OUTCOMES = """
+UPDATE api_email_outbox AS o
+SET status=v.status,
+    provider=v.provider,
+    provider_message_id=v.provider_message_id,
+    error=v.error,
+    sent_at=CASE WHEN v.status='sent' THEN NOW() ELSE o.sent_at END,
+    lease_until=NULL
+FROM (VALUES %s) AS v(id, status, provider, provider_message_id, error, lease_until)
+WHERE o.id=v.id::uuid AND o.status='sending' AND o.lease_until=v.lease_until::timestamptz
+"""
+
+SQL_RELEASE_OUTBOX = """
+UPDATE api_email_outbox
+SET status='queued', lease_until=NULL
+WHERE id = ANY(%s::uuid[]) AND status='sending' AND lease_until=%s
+"""
+
+
+def _claim_outbox_rows(limit: int) -> tuple[list[EmailOutboxRow], datetime | None]:
+    with db_conn() as conn:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(SQL_CLAIM_OUTBOX, (max(1, int(limit)), max(1, DISPATCH_LEASE_SEC)))
+            claimed = cur.fetchall()
+    if not claimed:
+        return [], None
+    rows = sorted((_outbox_row(r) for r in claimed), key=lambda r: r.created_at)
+    return rows, claimed[0][11]
+
+
+def _record_outbox_outcomes(
+    outcomes: list[tuple[str, str, str, str, str]], unsent: list[str], lease_until: datetime
+) -> None:
+    with db_conn() as conn:
+        conn.autocommit = False
+        with conn, conn.cursor() as cur:
+            if outcomes:
+                execute_values(cur, SQL_RECORD_OUTBOX_OUTCOMES, [(*o, lease_until) for o in outcomes])
+            if unsent:
+                cur.execute(SQL_RELEASE_OUTBOX, (unsent, lease_until))
+
+
+def dispatch_outbox_batch(*, limit: int = DISPATCH_BATCH_SIZE, sender: Any = None) -> dict[str, int]:
+    """Claim up to `limit` queued rows, send them, and record every outcome in one UPDATE.
+
+    Claiming and recording are two short transactions; no transaction or
+    pooled connection is held while SMTP runs. Claimed rows are marked
+    'sending' with a lease (`EMAIL_DISPATCH_LEASE_SEC`), so concurrent
+    dispatchers skip them. If the dispatcher dies mid-batch, the rows become
+    claimable again when the lease runs out; rows left unsent after a
+    connection failure are released at once.
+    """
+    sender = sender if sender is not None else default_sender()
+    rows, lease_until = _claim_outbox_rows(limit)
+    if not rows or lease_until is None:
+        return {"claimed": 0, "sent": 0, "failed": 0}
+
+    outcomes: list[tuple[str, str, str, str, str]] = []
+    try:
+        with sender:
+            for row in rows:
+                try:
+                    message_id = sender.send(row)
+                except (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError) as e:
+                    # Connection-level failure: keep what was sent, release the rest.
+                    with suppress(Exception):
+                        logger.warning("email_dispatch_interrupted", extra={"outbox_id": str(row.id), "error": str(e)})
+                    break
+                except Exception as e:
+                    outcomes.append((str(row.id), "failed", sender.provider, "", str(e)[:2000]))
+                else:
+                    outcomes.append((str(row.id), "sent", sender.provider, message_id or "", ""))
+    finally:
+        done = {o[0] for o in outcomes}
+        _record_outbox_outcomes(outcomes, [str(r.id) for r in rows if str(r.id) not in done], lease_until)
+
+    sent = sum(1 for o in outcomes if o[1] == "sent")
+    return {"claimed": len(rows), "sent": sent, "failed": len(outcomes) - sent}
+
+
+def drain_outbox(*, batch_size: int = DISPATCH_BATCH_SIZE, max_batches: int | None = None) -> dict[str, int]:
+    """Dispatch batches until the queue is empty, a batch is interrupted, or `max_batches` ran."""
+    batch_size = max(1, int(batch_size))
+    totals = {"claimed": 0, "sent": 0, "failed": 0}
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        counts = dispatch_outbox_batch(limit=batch_size)
+        batches += 1
+        for k in totals:
+            totals[k] += counts[k]
+        if counts["claimed"] < batch_size or counts["sent"] + counts["failed"] < counts["claimed"]:
+            break
+    return totals
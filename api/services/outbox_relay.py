@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import logging
+import os
+import select
+import threading
+from collections.abc import Callable
+from contextlib import suppress
+from typing import Any
+
+import psycopg2
+
+from api.services.email_service import drain_outbox
+
+
+logger = logging.getLogger("api.outbox_relay")
+
+# NOTIFY channel raised by the api_email_outbox insert trigger (api_schema 0002).
+CHANNEL = "api_email_outbox"
+
+# Queued rows are also scanned this often, so nothing waits on a lost or
+# missed notification (relay restart, trigger not yet migrated).
+SCAN_INTERVAL_SEC = float(os.getenv("OUTBOX_RELAY_SCAN_INTERVAL_SEC", "30") or 30)
+_RECONNECT_MAX_SEC = 30.0
+
+
+class OutboxRelay:
+    """Sends queued outbox emails as soon as Postgres reports new rows.
+
+    Holds one dedicated connection in LISTEN mode (never a pooled one: the
+    subscription belongs to the session). Sending goes through
+    `drain_outbox`, whose SKIP LOCKED claims make it safe to run alongside
+    other relays and the Celery beat dispatcher.
+    """
+
+    def __init__(
+        self,
+        *,
+        connect: Callable[[], Any],
+        drain: Callable[[], dict[str, int]] = drain_outbox,
+        scan_interval_sec: float = SCAN_INTERVAL_SEC,
+    ) -> None:
+        self._connect = connect
+        self._drain = drain
+        self.scan_interval_sec = max(0.1, float(scan_interval_sec))
+
+    def _listen(self) -> Any:
+        conn = self._connect()
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(f"LISTEN {CHANNEL}")
+        return conn
+
+    def _wait(self, conn: Any, stop: threading.Event) -> bool:
+        """Block until a notification arrives (True) or the scan interval passes (False)."""
+        # Short select slices keep shutdown responsive without a wakeup pipe.
+        remaining = self.scan_interval_sec
+        while remaining > 0 and not stop.is_set():
+            step = min(1.0, remaining)
+            readable, _w, _x = select.select([conn], [], [], step)
+            remaining -= step
+            if readable:
+                conn.poll()
+                if conn.notifies:
+                    # One drain covers every row queued so far.
+                    conn.notifies.clear()
+                    return True
+        return False
+
+    def run(self, stop: threading.Event) -> None:
+        backoff = 1.0
+        while not stop.is_set():
+            conn = None
+            try:
+                conn = self._listen()
+                backoff = 1.0
+                # Anything queued while we were not listening.
+                self._drain_logged(reason="startup")
+                while not stop.is_set():
+                    notified = self._wait(conn, stop)
+                    if stop.is_set():
+                        break
+                    self._drain_logged(reason=("notify" if notified else "scan"))
+            except Exception as e:
+                with suppress(Exception):
+                    logger.warning("outbox_relay_error", extra={"error": str(e), "retry_in_sec": backoff})
+                stop.wait(backoff)
+                backoff = min(_RECONNECT_MAX_SEC, backoff * 2)
+            finally:
+                if conn is not None:
+                    with suppress(Exception):
+                        conn.close()
+
+    def _drain_logged(self, *, reason: str) -> None:
+        totals = self._drain()
+        if totals["claimed"]:
+            with suppress(Exception):
+                logger.info("outbox_relay_dispatched", extra={"reason": reason, **totals})
+
+
+def connect_listener() -> Any:
+    from api.db import _build_dsn
+
+    return psycopg2.connect(_build_dsn())
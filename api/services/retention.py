@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from contextlib import suppress
+from dataclasses import dataclass
+from typing import Any
+
+from api.db import db_conn
+
+
+logger = logging.getLogger("api.retention")
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = os.getenv(name)
+    if raw is None or not raw.strip():
+        return default
+    return int(raw)
+
+
+# Rows deleted per statement; small enough that a batch never holds locks for long.
+BATCH_SIZE = _env_int("RETENTION_BATCH_SIZE", 1000)
+# Pause between batches so the purge leaves I/O and WAL headroom for live traffic.
+BATCH_SLEEP_MS = _env_int("RETENTION_BATCH_SLEEP_MS", 100)
+# Per table per run; whatever is left is picked up by the next run.
+MAX_BATCHES = _env_int("RETENTION_MAX_BATCHES", 100)
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    table: str
+    # Rows older than `days` matching this predicate are deleted; it must
+    # reference the `cutoff` parameter (a timestamptz) as %(cutoff)s.
+    predicate: str
+    days: int
+
+
+def policies_from_env() -> list[RetentionPolicy]:
+    """Retention windows in days; 0 disables purging for that table.
+
+    api_auth_audit_events is not listed: it is partitioned by month and old
+    partitions are dropped by the audit_event_partitions management command.
+    """
+    return [
+        RetentionPolicy(
+            table="api_auth_refresh_tokens",
+            # Revoked tokens are kept for the window so a replayed token is still
+            # recognised as reuse rather than as unknown.
+            predicate="(expires_at < %(cutoff)s OR revoked_at < %(cutoff)s)",
+            days=_env_int("RETENTION_REFRESH_TOKENS_DAYS", 30),
+        ),
+        RetentionPolicy(
+            table="api_auth_one_time_tokens",
+            predicate="(expires_at < %(cutoff)s OR consumed_at < %(cutoff)s)",
+            days=_env_int("RETENTION_ONE_TIME_TOKENS_DAYS", 7),
+        ),
+        RetentionPolicy(
+            table="api_email_outbox",
+            # Queued/sending rows are never purged, however old.
+            predicate="status IN ('sent', 'failed') AND created_at < %(cutoff)s",
+            days=_env_int("RETENTION_EMAIL_OUTBOX_DAYS", 30),
+        ),
+    ]
+
+
+def _delete_batch_sql(policy: RetentionPolicy) -> str:
+    # Keyset over the primary key: each batch starts after the last id it
+    # deleted, so later batches do not re-walk index entries of rows already
+    # removed. SKIP LOCKED leaves rows another transaction holds (e.g. an
+    # outbox claim) for the next run instead of waiting on them.
+    return f"""
+        WITH batch AS (
+            SELECT id
+            FROM {policy.table}
+            WHERE {policy.predicate}
+              AND id > %(after)s
+            ORDER BY id
+            LIMIT %(limit)s
+            FOR UPDATE SKIP LOCKED
+        )
+        DELETE FROM {policy.table} AS t
+        USING batch
+        WHERE t.id = batch.id
+        RETURNING t.id
+    """
+
+
+_MIN_UUID = "00000000-0000-0000-0000-000000000000"
+
+
+def purge_table(
+    policy: RetentionPolicy,
+    *,
+    batch_size: int = BATCH_SIZE,
+    max_batches: int = MAX_BATCHES,
+    sleep_ms: int = BATCH_SLEEP_MS,
+    sleep: Callable[[float], None] = time.sleep,
+) -> int:
+    """Delete expired rows of one table in short autocommitted batches; returns rows deleted."""
+    if policy.days <= 0:
+        return 0
+
+    sql = _delete_batch_sql(policy)
+    batch_size = max(1, int(batch_size))
+    deleted = 0
+    after: Any = _MIN_UUID
+    with db_conn() as conn:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute("SELECT NOW() - make_interval(days => %s)", (int(policy.days),))
+            cutoff = cur.fetchone()[0]
+            for batch in range(max(1, int(max_batches))):
+                if batch and sleep_ms > 0:
+                    sleep(sleep_ms / 1000)
+                cur.execute(sql, {"cutoff": cutoff, "after": after, "limit": batch_size})
+                ids = [r[0] for r in (cur.fetchall() or [])]
+                deleted += len(ids)
+                if len(ids) < batch_size:
+                    break
+                after = max(str(i) for i in ids)
+    return deleted
+
+
+def purge_expired(policies: list[RetentionPolicy] | None = None, **kwargs: Any) -> dict[str, int]:
+    """Run every retention policy; one failing table does not stop the others."""
+    totals: dict[str, int] = {}
+    for policy in policies if policies is not None else policies_from_env():
+        try:
+            totals[policy.table] = purge_table(policy, **kwargs)
+        except Exception as e:
+            with suppress(Exception):
+                logger.warning("retention_purge_failed", extra={"table": policy.table, "error": str(e)})
+            continue
+    with suppress(Exception):
+        record_deleted(totals)
+    return totals
+
+
+# The purge runs in the Celery worker, but /metrics is served by the API, so
+# cumulative deleted-row counts are kept in a Redis hash both can reach.
+def _totals_key() -> str:
+    from api import redis_client
+
+    return redis_client.key("retention", "deleted_total")
+
+
+def record_deleted(totals: dict[str, int]) -> None:
+    from api import redis_client
+
+    client = redis_client.get_client()
+    pipe = client.pipeline(transaction=False)
+    for table, n in totals.items():
+        if n:
+            pipe.hincrby(_totals_key(), table, int(n))
+    pipe.execute()
+
+
+_SAMPLES_TTL_SEC = 30.0
+_samples_lock = threading.Lock()
+_samples_cache: tuple[float, list[tuple[str, str, str, dict[str, str], float]]] = (float("-inf"), [])
+
+
+def _retention_samples() -> list[tuple[str, str, str, dict[str, str], float]]:
+    # Read at most every _SAMPLES_TTL_SEC so scrapes do not each hit Redis.
+    global _samples_cache
+    with _samples_lock:
+        fetched_at, samples = _samples_cache
+        if time.monotonic() - fetched_at < _SAMPLES_TTL_SEC:
+            return samples
+        try:
+            from api import redis_client
+
+            raw = redis_client.get_client().hgetall(_totals_key()) or {}
+            samples = [
+                (
+                    "base2_retention_deleted_rows_total",
+                    "counter",
+                    "Rows deleted by the retention purge",
+                    {"table": (k.decode() if isinstance(k, bytes) else str(k))},
+                    float(v),
+                )
+                for k, v in sorted(raw.items())
+            ]
+        except Exception:
+            samples = []
+        _samples_cache = (time.monotonic(), samples)
+        return samples
+
+
+with suppress(ImportError):
+    from api.metrics import metrics
+
+    metrics.register_collector(_retention_samples)
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from typing import Any
+
+import redis.asyncio as aioredis
+from celery import states
+from celery.backends.redis import RedisBackend
+
+
+# Upper bound for ?wait= on /api/celery/result/{task_id}.
+MAX_WAIT_SEC = float(os.getenv("CELERY_RESULT_MAX_WAIT_SEC", "25") or 25)
+# Long-polls waiting at once per worker; each holds a Redis pub/sub connection.
+MAX_WAITERS = int(os.getenv("CELERY_RESULT_MAX_WAITERS", "100") or 100)
+
+# Used only for non-Redis result backends, which have no completion channel.
+_FALLBACK_POLL_SEC = 0.5
+
+_client: tuple[asyncio.AbstractEventLoop, str, aioredis.Redis] | None = None
+_waiters: tuple[asyncio.AbstractEventLoop, asyncio.Semaphore] | None = None
+
+
+def _async_client(url: str) -> aioredis.Redis:
+    # redis.asyncio connections belong to the loop that opened them.
+    global _client
+    loop = asyncio.get_running_loop()
+    if _client is None or _client[0] is not loop or _client[1] != url:
+        _client = (loop, url, aioredis.from_url(url))
+    return _client[2]
+
+
+def _waiter_slots() -> asyncio.Semaphore:
+    global _waiters
+    loop = asyncio.get_running_loop()
+    if _waiters is None or _waiters[0] is not loop:
+        _waiters = (loop, asyncio.Semaphore(max(0, MAX_WAITERS)))
+    return _waiters[1]
+
+
+def _decode(backend: Any, raw: Any) -> dict[str, Any]:
+    if not raw:
+        return {"status": states.PENDING, "result": None}
+    return backend.decode_result(raw)
+
+
+def is_ready(meta: dict[str, Any]) -> bool:
+    return meta.get("status") in states.READY_STATES
+
+
+async def fetch_task_meta(backend: Any, task_id: str) -> dict[str, Any]:
+    """Task state and result from a single backend read, decoded once."""
+    if isinstance(backend, RedisBackend):
+        raw = await _async_client(backend.url).get(backend.get_key_for_task(task_id))
+        return _decode(backend, raw)
+    return await asyncio.to_thread(backend.get_task_meta, task_id)
+
+
+async def wait_for_task_meta(backend: Any, task_id: str, timeout: float) -> dict[str, Any]:
+    """Like fetch_task_meta, but waits up to `timeout` seconds for the task to finish.
+
+    The Redis backend publishes every stored state on the task's key, so the
+    wait is a pub/sub subscription rather than repeated GETs.
+    """
+    meta = await fetch_task_meta(backend, task_id)
+    timeout = min(max(0.0, timeout), MAX_WAIT_SEC)
+    slots = _waiter_slots()
+    if is_ready(meta) or timeout <= 0 or slots.locked():
+        return meta
+
+    deadline = time.monotonic() + timeout
+    async with slots:
+        if not isinstance(backend, RedisBackend):
+            while not is_ready(meta) and (remaining := deadline - time.monotonic()) > 0:
+                await asyncio.sleep(min(_FALLBACK_POLL_SEC, remaining))
+                meta = await fetch_task_meta(backend, task_id)
+            return meta
+
+        channel = backend.get_key_for_task(task_id)
+        pubsub = _async_client(backend.url).pubsub()
+        try:
+            await pubsub.subscribe(channel)
+            # Re-read after subscribing: the task may have finished in between.
+            meta = await fetch_task_meta(backend, task_id)
+            while not is_ready(meta) and (remaining := deadline - time.monotonic()) > 0:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=remaining)
+                if message is not None and message.get("type") == "message":
+                    meta = _decode(backend, message.get("data"))
+        finally:
+            await pubsub.aclose()
+        return meta
+
+
+def task_result_payload(task_id: str, meta: dict[str, Any]) -> dict[str, Any]:
+    state = str(meta.get("status") or states.PENDING)
+    ready = state in states.READY_STATES
+    result = meta.get("result") if ready else None
+    if isinstance(result, BaseException):
+        result = f"{type(result).__name__}: {result}"
+    return {
+        "task_id": task_id,
+        "ready": ready,
+        "successful": state == states.SUCCESS,
+        "state": state,
+        "result": result,
+    }
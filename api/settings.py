@@ -11,6 +11,8 @@ class Settings(BaseSettings):
     API_DOCS_URL: str = Field(default="/docs")
     API_REDOC_URL: str = Field(default="/redoc")
     API_OPENAPI_URL: str = Field(default="/openapi.json")
+    # Defer Celery imports and OpenAPI generation until first use (faster worker boot).
+    API_LAZY_IMPORTS: bool = Field(default=False)
 
     SESSION_COOKIE_NAME: str = Field(default="base2_session")
     CSRF_COOKIE_NAME: str = Field(default="base2_csrf")
@@ -41,6 +43,24 @@ class Settings(BaseSettings):
     DB_STATEMENT_TIMEOUT_MS: int = Field(default=3000)
     DB_POOL_MIN: int = Field(default=1)
     DB_POOL_MAX: int = Field(default=5)
+    # How long a caller waits for a free pooled connection before a 503.
+    DB_POOL_ACQUIRE_TIMEOUT_SEC: float = Field(default=5.0)
+    DB_POOL_MAX_LIFETIME_SEC: float = Field(default=1800.0)
+    DB_POOL_MAX_IDLE_SEC: float = Field(default=300.0)
+    # Connections idle at least this long are pinged before reuse.
+    DB_POOL_PING_AFTER_IDLE_SEC: float = Field(default=30.0)
+    # Server-side prepared statements on the asyncio pool. Disable when going
+    # through a pooler that cannot track them (e.g. pgbouncer transaction mode < 1.21).
+    DB_PREPARED_STATEMENTS: bool = Field(default=True)
+    # Read replica (DATABASE_REPLICA_URL). Reads fall back to the primary while
+    # the replica is further behind than this, or unreachable.
+    DB_REPLICA_MAX_LAG_SEC: float = Field(default=5.0)
+    # How often each worker re-measures replica lag.
+    DB_REPLICA_CHECK_INTERVAL_SEC: float = Field(default=1.0)
+
+    # Password hashing pool (per API process). 0 workers = one per CPU core.
+    PASSWORD_HASH_WORKERS: int = Field(default=0)
+    PASSWORD_HASH_MAX_PENDING: int = Field(default=64)
 
     # E2E test mode gate
     E2E_TEST_MODE: bool = Field(default=False)
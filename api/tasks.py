@@ -38,6 +38,61 @@ def add(x: int, y: int) -> int:
     return int(x) + int(y)
 
 
-# Register additional tasks (keep import failures from breaking app startup)
-with suppress(Exception):
-    from api.tasks import email_tasks as _email_tasks  # noqa: F401
+# --- Email outbox ---
+EMAIL_DISPATCH_INTERVAL_SEC = float(os.getenv("EMAIL_DISPATCH_INTERVAL_SEC", "60") or 60)
+EMAIL_DISPATCH_MAX_BATCHES = int(os.getenv("EMAIL_DISPATCH_MAX_BATCHES", "10") or 10)
+RETENTION_PURGE_INTERVAL_SEC = float(os.getenv("RETENTION_PURGE_INTERVAL_SEC", "3600") or 3600)
+
+app.conf.beat_schedule = {
+    "dispatch-email-outbox": {
+        "task": "base2.dispatch_email_outbox",
+        "schedule": EMAIL_DISPATCH_INTERVAL_SEC,
+        # A tick that waited longer than one interval is superseded by the next.
+        "options": {"expires": EMAIL_DISPATCH_INTERVAL_SEC},
+    },
+    "purge-expired-rows": {
+        "task": "base2.purge_expired_rows",
+        "schedule": RETENTION_PURGE_INTERVAL_SEC,
+        "options": {"expires": RETENTION_PURGE_INTERVAL_SEC},
+    },
+}
+
+
+@app.task(name="base2.dispatch_email_outbox")
+def dispatch_email_outbox() -> dict:
+    # Import inside the task so the API process never loads SMTP/DB code for Celery.
+    from api.services.email_service import drain_outbox
+
+    totals = drain_outbox(max_batches=max(1, EMAIL_DISPATCH_MAX_BATCHES))
+    if totals["claimed"]:
+        with suppress(Exception):
+            logger.info("dispatch_email_outbox", extra=totals)
+    return totals
+
+
+@app.task(bind=True, name="base2.send_email_outbox")
+def send_email_outbox(self, outbox_id: str, request_id: str | None = None) -> str:
+    # Single-row path kept for messages enqueued before batch dispatch existed.
+    from uuid import UUID
+
+    from api.services.email_service import process_outbox_email
+
+    with suppress(Exception):
+        logger.info(
+            "send_email_outbox",
+            extra={"task_id": self.request.id, "request_id": request_id, "outbox_id": outbox_id},
+        )
+    process_outbox_email(outbox_id=UUID(outbox_id))
+    return outbox_id
+
+
+# --- Retention ---
+@app.task(name="base2.purge_expired_rows")
+def purge_expired_rows() -> dict:
+    from api.services.retention import purge_expired
+
+    totals = purge_expired()
+    if any(totals.values()):
+        with suppress(Exception):
+            logger.info("purge_expired_rows", extra={"deleted": totals})
+    return totals
@@ -0,0 +1,57 @@
+import os
+import time
+
+import pytest
+
+from api.auth import repo
+
+psycopg = pytest.importorskip("psycopg")
+
+# Compares planning every execution with reusing a server-side prepared plan
+# for the user lookup on the login path. Requires Postgres with the API schema.
+pytestmark = [pytest.mark.perf, pytest.mark.integration]
+
+ITERATIONS = int(os.getenv("PERF_PREPARED_ITERATIONS", "2000"))
+
+
+def _connect():
+    return psycopg.connect(
+        host=os.getenv("DB_HOST", os.getenv("POSTGRES_HOST", "postgres")),
+        port=int(os.getenv("POSTGRES_PORT", "5432")),
+        dbname=os.getenv("POSTGRES_DB", "mydatabase"),
+        user=os.getenv("DB_USER", os.getenv("POSTGRES_USER", "myuser")),
+        password=os.getenv("DB_PASSWORD", os.getenv("POSTGRES_PASSWORD", "mypassword")),
+        autocommit=True,
+    )
+
+
+def _run(conn, *, prepare: bool) -> float:
+    started = time.perf_counter()
+    with conn.cursor() as cur:
+        for i in range(ITERATIONS):
+            cur.execute(repo.SQL_GET_USER_BY_EMAIL, (f"perf_{i % 50}@example.com",), prepare=prepare)
+            cur.fetchone()
+    return time.perf_counter() - started
+
+
+@pytest.mark.perf
+def test_prepared_user_lookup_is_not_slower():
+    try:
+        conn = _connect()
+    except Exception:
+        pytest.skip("Postgres not reachable")
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT to_regclass('public.api_auth_users')")
+            if cur.fetchone()[0] is None:
+                pytest.skip("api_auth_users table not present")
+
+        # Warm caches, then time each mode.
+        _run(conn, prepare=False)
+        unprepared = _run(conn, prepare=False)
+        prepared = _run(conn, prepare=True)
+        print(f"user lookup x{ITERATIONS}: unprepared={unprepared:.3f}s prepared={prepared:.3f}s ({unprepared / prepared:.2f}x)")
+        # Generous bound: the point is to catch regressions, not to benchmark CI hardware.
+        assert prepared <= unprepared * 1.2
+    finally:
+        conn.close()
@@ -114,3 +114,80 @@ def test_db_count_latency_p95_within_budget():
         assert p95 <= budget_ms, f"p95 {p95:.2f}ms exceeds budget {budget_ms}ms"
     finally:
         conn.close()
+
+
+def _explain_without_seqscan(conn, table: str, sql: str, params: Tuple) -> str:
+    # Tiny CI tables make a seq scan the cheapest plan; take it off the table
+    # so the check is about which index the planner can use, and VACUUM so the
+    # visibility map allows index-only scans.
+    prev_autocommit = conn.autocommit
+    conn.rollback()
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"VACUUM (ANALYZE) {table}")
+            cur.execute("SET enable_seqscan = off")
+            cur.execute("SET enable_bitmapscan = off")
+        return _explain_analyze(conn, sql, params)
+    finally:
+        with conn.cursor() as cur:
+            cur.execute("RESET enable_seqscan")
+            cur.execute("RESET enable_bitmapscan")
+        conn.autocommit = prev_autocommit
+
+
+@pytest.mark.perf
+def test_active_refresh_sessions_use_covering_index():
+    from api.auth.repo import SQL_LIST_ACTIVE_REFRESH_SESSIONS
+
+    conn = _connect()
+    try:
+        if not _table_exists(conn, "api_auth_refresh_tokens"):
+            pytest.skip("api_auth_refresh_tokens table not present; skipping index check")
+        plan = _explain_without_seqscan(
+            conn,
+            "api_auth_refresh_tokens",
+            SQL_LIST_ACTIVE_REFRESH_SESSIONS,
+            ("00000000-0000-0000-0000-000000000000",),
+        )
+        assert "Index Only Scan using idx_api_auth_refresh_tokens_active_by_user" in plan, plan
+        # The index is already in the query's order.
+        assert "Sort" not in plan, plan
+    finally:
+        conn.close()
+
+
+@pytest.mark.perf
+def test_one_time_token_lookup_uses_covering_index():
+    from api.auth.repo import SQL_FIND_ONE_TIME_TOKEN
+
+    conn = _connect()
+    try:
+        if not _table_exists(conn, "api_auth_one_time_tokens"):
+            pytest.skip("api_auth_one_time_tokens table not present; skipping index check")
+        plan = _explain_without_seqscan(
+            conn,
+            "api_auth_one_time_tokens",
+            SQL_FIND_ONE_TIME_TOKEN,
+            ("__perf_nonexistent__", "email_verify"),
+        )
+        assert "Index Only Scan using uq_api_auth_one_time_tokens_hash_type" in plan, plan
+    finally:
+        conn.close()
+
+
+@pytest.mark.perf
+def test_refresh_token_lookup_uses_unique_index():
+    conn = _connect()
+    try:
+        if not _table_exists(conn, "api_auth_refresh_tokens"):
+            pytest.skip("api_auth_refresh_tokens table not present; skipping index check")
+        plan = _explain_without_seqscan(
+            conn,
+            "api_auth_refresh_tokens",
+            "SELECT id FROM api_auth_refresh_tokens WHERE token_hash = %s",
+            ("__perf_nonexistent__",),
+        )
+        assert "Index Scan using uq_api_auth_refresh_tokens_token_hash" in plan, plan
+    finally:
+        conn.close()
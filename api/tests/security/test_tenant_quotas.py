@@ -0,0 +1,42 @@
+import api.security.tenant_limits as tl
+
+
+class _FakeQuotaRedis:
+    """Counts script calls and emulates the fixed-window quota script."""
+
+    def __init__(self):
+        self.counts = {}
+        self.calls = 0
+
+    def register_script(self, _lua: str):
+        def run(keys=None, args=None, client=None):
+            self.calls += 1
+            out = []
+            for k, window in zip(keys, args, strict=True):
+                self.counts[k] = self.counts.get(k, 0) + 1
+                out.extend([self.counts[k], int(window)])
+            return out
+
+        return run
+
+
+def test_charge_quotas_uses_one_call_for_all_quotas(monkeypatch):
+    fake = _FakeQuotaRedis()
+    monkeypatch.setattr(tl, "get_client", lambda: fake)
+
+    first = tl.charge_quotas("alpha", [("requests", 2, 60), ("exports", 1, 3600)])
+    assert first == [(1, False, 60), (1, False, 3600)]
+    second = tl.charge_quotas("alpha", [("requests", 2, 60), ("exports", 1, 3600)])
+    assert second == [(2, False, 60), (2, True, 3600)]
+    assert fake.calls == 2
+
+    assert tl.check_quota_and_incr("alpha", "requests", 2, 60) == (3, True, 60)
+    assert fake.calls == 3
+
+
+def test_charge_quotas_without_tenant_is_exhausted(monkeypatch):
+    fake = _FakeQuotaRedis()
+    monkeypatch.setattr(tl, "get_client", lambda: fake)
+
+    assert tl.charge_quotas("  ", [("requests", 2, 60)]) == [(0, True, 60)]
+    assert fake.calls == 0
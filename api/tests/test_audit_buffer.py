@@ -0,0 +1,133 @@
+import json
+import threading
+
+import psycopg2
+
+from api.auth.audit_buffer import AuditBuffer
+
+
+def _row(n: int) -> tuple:
+    return (f"00000000-0000-0000-0000-{n:012d}", None, "auth.login", "1.2.3.4", "ua", "{}", "2026-01-01T00:00:00+00:00")
+
+
+class _Writer:
+    def __init__(self):
+        self.batches = []
+        self.fail = False
+        self.written = threading.Event()
+
+        self.poisoned = set()
+
+    def __call__(self, rows):
+        if self.fail:
+            raise RuntimeError("db down")
+        if self.poisoned.intersection(rows):
+            raise psycopg2.IntegrityError("insert or update on table \"api_audit_events\" violates foreign key constraint")
+        self.batches.append(list(rows))
+        self.written.set()
+
+
+def test_flushes_in_batches_when_max_events_reached():
+    writer = _Writer()
+    buf = AuditBuffer(write=writer, flush_max_events=3, flush_interval_ms=60000)
+    for i in range(3):
+        buf.add(_row(i))
+    assert writer.written.wait(5)
+    buf.stop()
+    assert writer.batches == [[_row(0), _row(1), _row(2)]]
+    assert buf.flushed == 3
+
+
+def test_flush_writes_pending_rows_in_one_insert():
+    writer = _Writer()
+    buf = AuditBuffer(write=writer, flush_max_events=100, flush_interval_ms=60000)
+    buf.add(_row(1))
+    buf.add(_row(2))
+    buf.flush()
+    assert writer.batches == [[_row(1), _row(2)]]
+    assert buf.pending() == 0
+    buf.stop()
+
+
+def test_failed_batches_spill_to_disk_and_replay(tmp_path):
+    spill = tmp_path / "audit.jsonl"
+    writer = _Writer()
+    writer.fail = True
+    buf = AuditBuffer(write=writer, flush_max_events=100, flush_interval_ms=60000, spill_path=str(spill))
+
+    buf.add(_row(1))
+    buf.flush()
+    assert buf.spilled == 1
+    assert [tuple(json.loads(line)) for line in spill.read_text().splitlines()] == [_row(1)]
+
+    writer.fail = False
+    buf.add(_row(2))
+    buf.flush()
+    buf.stop()
+    assert writer.batches == [[_row(1)], [_row(2)]]
+    assert not spill.exists()
+    assert not (tmp_path / "audit.jsonl.replay").exists()
+
+
+def test_backlog_over_max_pending_moves_to_spill_file(tmp_path):
+    spill = tmp_path / "audit.jsonl"
+    writer = _Writer()
+    writer.fail = True
+    buf = AuditBuffer(write=writer, flush_max_events=100, flush_interval_ms=60000, max_pending=2, spill_path=str(spill))
+    with buf._write_lock:  # flusher busy: add() must not wait for it
+        for i in range(3):
+            buf.add(_row(i))
+        assert not spill.exists()
+        for i in range(3, 6):
+            buf.add(_row(i))
+    buf.stop()
+    assert buf.pending() == 0
+    assert buf.dropped == 3
+    # The failed replay leaves the rows in the .replay file for next time.
+    spilled = (tmp_path / "audit.jsonl.replay").read_text().splitlines()
+    assert [tuple(json.loads(line)) for line in spilled] == [_row(0), _row(1), _row(2)]
+
+
+def test_rows_the_database_rejects_are_quarantined_not_retried(tmp_path):
+    spill = tmp_path / "audit.jsonl"
+    writer = _Writer()
+    writer.poisoned = {_row(2)}
+    buf = AuditBuffer(write=writer, flush_max_events=100, flush_interval_ms=60000, spill_path=str(spill))
+    for i in range(1, 4):
+        buf.add(_row(i))
+    buf.flush()
+    buf.add(_row(4))
+    buf.flush()
+    buf.stop()
+
+    assert writer.batches == [[_row(1)], [_row(3)], [_row(4)]]
+    assert buf.flushed == 3
+    assert buf.quarantined == 1
+    assert buf.failures == 0
+    assert not spill.exists()
+    assert [tuple(json.loads(line)) for line in (tmp_path / "audit.jsonl.dead").read_text().splitlines()] == [_row(2)]
+
+
+def test_poisoned_spilled_row_does_not_block_replay(tmp_path):
+    spill = tmp_path / "audit.jsonl"
+    spill.write_text("".join(json.dumps(list(_row(n))) + "\n" for n in (1, 2)))
+    writer = _Writer()
+    writer.poisoned = {_row(1)}
+    buf = AuditBuffer(write=writer, flush_max_events=100, flush_interval_ms=60000, spill_path=str(spill))
+    buf.add(_row(3))
+    buf.flush()
+    buf.stop()
+
+    assert writer.batches == [[_row(2)], [_row(3)]]
+    assert not spill.exists()
+    assert (tmp_path / "audit.jsonl.dead").read_text().count("\n") == 1
+
+
+def test_replay_pads_rows_spilled_without_created_at(tmp_path):
+    spill = tmp_path / "audit.jsonl"
+    spill.write_text(json.dumps(list(_row(1)[:6])) + "\n")
+    writer = _Writer()
+    buf = AuditBuffer(write=writer, flush_max_events=100, flush_interval_ms=60000, spill_path=str(spill))
+    buf.flush()
+    buf.stop()
+    assert writer.batches == [[(*_row(1)[:6], None)]]
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.auth.profile_cache import profile_cache
+from api.auth.repo import User
+from api.auth.tokens import create_access_token, reset_token_verifier
+from api.auth.user_cache import user_cache
+from api.main import app
+
+
+@pytest.fixture(autouse=True)
+def _fresh_state(monkeypatch):
+    monkeypatch.setenv("JWT_SECRET", "test-secret")
+    # These tests cover the per-process cache; the Redis profile cache has its own.
+    monkeypatch.setattr(profile_cache, "ttl", 0)
+    reset_token_verifier()
+    user_cache.clear()
+    yield
+    user_cache.clear()
+    reset_token_verifier()
+
+
+def _user(user_id: uuid.UUID) -> User:
+    return User(
+        id=user_id,
+        email="u@example.com",
+        password_hash="x",
+        is_active=True,
+        is_email_verified=True,
+        display_name="U",
+        avatar_url="",
+        bio="",
+    )
+
+
+def _auth_headers(user_id: uuid.UUID) -> dict[str, str]:
+    token = create_access_token(subject=str(user_id), email="u@example.com", ttl_minutes=5)
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_me_loads_user_once_and_reuses_cache(monkeypatch):
+    user_id = uuid.uuid4()
+    calls = []
+
+    async def fake_get_user_by_id(uid):
+        calls.append(uid)
+        return _user(uid)
+
+    monkeypatch.setattr("api.auth.async_repo.get_user_by_id", fake_get_user_by_id)
+
+    c = TestClient(app)
+    headers = _auth_headers(user_id)
+    r1 = c.get("/api/auth/me", headers=headers)
+    r2 = c.get("/api/users/me", headers=headers)
+    assert r1.status_code == 200, r1.text
+    assert r2.status_code == 200, r2.text
+    assert r1.json() == r2.json()
+    assert r1.json()["id"] == str(user_id)
+    assert calls == [user_id]
+
+    user_cache.invalidate(user_id)
+    assert c.get("/api/auth/me", headers=headers).status_code == 200
+    assert calls == [user_id, user_id]
+
+
+def test_me_rejects_unknown_user_and_bad_token(monkeypatch):
+    async def fake_get_user_by_id(_uid):
+        return None
+
+    monkeypatch.setattr("api.auth.async_repo.get_user_by_id", fake_get_user_by_id)
+
+    c = TestClient(app)
+    r = c.get("/api/auth/me", headers=_auth_headers(uuid.uuid4()))
+    assert r.status_code == 401
+    assert r.json().get("detail") == "Not authenticated"
+
+    r = c.get("/api/users/me", headers={"Authorization": "Bearer not-a-jwt"})
+    assert r.status_code == 401
+    assert r.json().get("detail") == "Not authenticated"
+
+
+def test_me_database_error_is_not_reported_as_unauthenticated(monkeypatch):
+    async def broken_get_user_by_id(_uid):
+        raise RuntimeError("connection reset")
+
+    monkeypatch.setattr("api.auth.async_repo.get_user_by_id", broken_get_user_by_id)
+
+    c = TestClient(app, raise_server_exceptions=False)
+    r = c.get("/api/users/me", headers=_auth_headers(uuid.uuid4()))
+    assert r.status_code == 500
@@ -0,0 +1,100 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+import api.services.task_results as tr
+from api.main import app
+from api.tasks import app as celery_app
+
+
+class _FakePubSub:
+    def __init__(self, redis):
+        self.redis = redis
+        self.queue = asyncio.Queue()
+
+    async def subscribe(self, channel):
+        self.redis.subscribers.setdefault(channel, []).append(self.queue)
+
+    async def get_message(self, ignore_subscribe_messages=True, timeout=None):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def aclose(self):
+        for queues in self.redis.subscribers.values():
+            if self.queue in queues:
+                queues.remove(self.queue)
+
+
+class _FakeAsyncRedis:
+    def __init__(self):
+        self.data = {}
+        self.subscribers = {}
+        self.gets = 0
+
+    async def get(self, key):
+        self.gets += 1
+        return self.data.get(key)
+
+    def pubsub(self):
+        return _FakePubSub(self)
+
+    async def store(self, key, value):
+        self.data[key] = value
+        for queue in self.subscribers.get(key, []):
+            queue.put_nowait({"type": "message", "data": value})
+
+
+def _meta(task_id, status, result):
+    return celery_app.backend.encode(
+        {"status": status, "result": result, "task_id": task_id, "traceback": None, "children": []}
+    )
+
+
+def test_result_endpoint_reads_backend_once(monkeypatch):
+    fake = _FakeAsyncRedis()
+    monkeypatch.setattr(tr, "_async_client", lambda _url: fake)
+    backend = celery_app.backend
+    fake.data[backend.get_key_for_task("t-1")] = _meta("t-1", "SUCCESS", "pong")
+
+    c = TestClient(app)
+    r = c.get("/api/celery/result/t-1")
+    assert r.status_code == 200, r.text
+    assert r.json() == {"task_id": "t-1", "ready": True, "successful": True, "state": "SUCCESS", "result": "pong"}
+    assert fake.gets == 1
+
+    r = c.get("/api/celery/result/unknown")
+    assert r.json()["state"] == "PENDING"
+    assert r.json()["ready"] is False
+
+
+def test_wait_returns_when_task_completes(monkeypatch):
+    fake = _FakeAsyncRedis()
+    monkeypatch.setattr(tr, "_async_client", lambda _url: fake)
+    backend = celery_app.backend
+    key = backend.get_key_for_task("t-2")
+
+    async def run():
+        async def finish():
+            await asyncio.sleep(0.05)
+            await fake.store(key, _meta("t-2", "SUCCESS", 3))
+
+        finisher = asyncio.create_task(finish())
+        meta = await tr.wait_for_task_meta(backend, "t-2", 5)
+        await finisher
+        return meta
+
+    meta = asyncio.run(run())
+    assert tr.task_result_payload("t-2", meta)["result"] == 3
+    # Initial read plus the re-check after subscribing; completion came via pub/sub.
+    assert fake.gets == 2
+
+
+def test_wait_times_out_with_pending_state(monkeypatch):
+    fake = _FakeAsyncRedis()
+    monkeypatch.setattr(tr, "_async_client", lambda _url: fake)
+
+    meta = asyncio.run(tr.wait_for_task_meta(celery_app.backend, "t-3", 0.05))
+    assert tr.task_result_payload("t-3", meta)["state"] == "PENDING"
+    assert fake.subscribers[celery_app.backend.get_key_for_task("t-3")] == []
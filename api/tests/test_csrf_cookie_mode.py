@@ -32,7 +32,7 @@ def test_refresh_cookie_mode_requires_double_submit_csrf(monkeypatch):
         refresh_token_expires_at=datetime.now(timezone.utc) + timedelta(days=30),
     )
 
-    def fake_refresh_tokens(*, refresh_token: str, ip: str, user_agent: str, refresh_ttl_days: int, access_ttl_minutes: int):
+    async def fake_refresh_tokens(*, refresh_token: str, ip: str, user_agent: str, refresh_ttl_days: int, access_ttl_minutes: int):
         called["refresh"] = True
         return u, tokens
 
@@ -71,7 +71,7 @@ def test_refresh_cookie_mode_accepts_double_submit_csrf(monkeypatch):
         refresh_token_expires_at=datetime.now(timezone.utc) + timedelta(days=30),
     )
 
-    def fake_refresh_tokens(*, refresh_token: str, ip: str, user_agent: str, refresh_ttl_days: int, access_ttl_minutes: int):
+    async def fake_refresh_tokens(*, refresh_token: str, ip: str, user_agent: str, refresh_ttl_days: int, access_ttl_minutes: int):
         assert refresh_token == "refresh"
         return u, tokens
 
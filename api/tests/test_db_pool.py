@@ -0,0 +1,160 @@
+import threading
+import time
+
+import pytest
+from psycopg2 import extensions as pg_ext
+
+import api.db as db
+from api.exceptions import ServiceOverloaded
+from api.metrics import metrics
+
+
+class _FakeCursor:
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql):
+        self._conn.pings += 1
+        if self._conn.broken:
+            raise RuntimeError("server closed the connection unexpectedly")
+
+    def fetchone(self):
+        return (1,)
+
+
+class _FakeConn:
+    def __init__(self):
+        self.closed = 0
+        self.broken = False
+        self.pings = 0
+
+    def cursor(self):
+        return _FakeCursor(self)
+
+    def get_transaction_status(self):
+        return pg_ext.TRANSACTION_STATUS_IDLE
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = 1
+
+
+def _pool(monkeypatch, **overrides):
+    opened = []
+
+    def fake_connect(_dsn, **_kwargs):
+        conn = _FakeConn()
+        opened.append(conn)
+        return conn
+
+    monkeypatch.setattr(db.psycopg2, "connect", fake_connect)
+    kwargs = dict(
+        dsn="postgresql://x",
+        min_size=0,
+        max_size=1,
+        acquire_timeout=0.05,
+        max_lifetime=1800,
+        max_idle=300,
+        ping_after_idle=30,
+    )
+    kwargs.update(overrides)
+    return db.ConnectionPool(**kwargs), opened
+
+
+def test_exhausted_pool_waits_then_sheds_load(monkeypatch):
+    pool, _opened = _pool(monkeypatch)
+    conn = pool.getconn()
+
+    with pytest.raises(ServiceOverloaded):
+        pool.getconn()
+    assert pool.stats()["timeouts_total"] == 1
+
+    # A waiter is handed the connection as soon as it is returned.
+    pool._acquire_timeout = 2.0
+    threading.Timer(0.05, pool.putconn, args=(conn,)).start()
+    started = time.monotonic()
+    assert pool.getconn() is conn
+    assert time.monotonic() - started < 1.5
+
+
+def test_idle_connections_are_pinged_and_replaced_when_dead(monkeypatch):
+    pool, opened = _pool(monkeypatch, ping_after_idle=0)
+    conn = pool.getconn()
+    pool.putconn(conn)
+
+    assert pool.getconn() is conn
+    assert conn.pings == 1
+    pool.putconn(conn)
+
+    conn.broken = True
+    fresh = pool.getconn()
+    assert fresh is not conn and conn.closed
+    assert len(opened) == 2
+    assert pool.stats()["recycled_total"] == 1
+
+
+def test_connections_past_max_lifetime_are_recycled(monkeypatch):
+    pool, opened = _pool(monkeypatch, max_lifetime=0.01)
+    conn = pool.getconn()
+    time.sleep(0.02)
+    pool.putconn(conn)
+
+    assert conn.closed
+    assert pool.stats()["size"] == 0
+    assert pool.getconn() is opened[1]
+
+
+def test_pool_gauges_are_exported(monkeypatch):
+    pool, _opened = _pool(monkeypatch, max_size=3)
+    monkeypatch.setattr(db, "_pool", pool)
+    held = pool.getconn()
+    pool.putconn(pool.getconn())
+
+    body = metrics.render_prometheus()
+    assert 'base2_api_db_pool_connections{pool="sync",state="in_use"} 1' in body
+    assert 'base2_api_db_pool_connections{pool="sync",state="idle"} 1' in body
+    assert 'base2_api_db_pool_max_connections{pool="sync"} 3' in body
+    assert 'base2_api_db_pool_wait_seconds_count{pool="sync"} 2' in body
+    pool.putconn(held)
+
+
+def test_pool_exhaustion_is_503_not_401_or_500(monkeypatch):
+    import uuid
+
+    from fastapi.testclient import TestClient
+
+    from api.auth.tokens import create_access_token, reset_token_verifier
+    from api.auth.user_cache import user_cache
+    from api.main import app
+
+    async def overloaded(*_args, **_kwargs):
+        raise ServiceOverloaded("db_pool")
+
+    monkeypatch.setenv("JWT_SECRET", "test-secret")
+    reset_token_verifier()
+    user_cache.clear()
+    monkeypatch.setattr("api.auth.async_repo.get_user_by_id", overloaded)
+    monkeypatch.setattr("api.auth.async_repo.list_active_refresh_sessions", overloaded)
+    monkeypatch.setattr("api.auth.service.refresh_tokens", overloaded)
+    monkeypatch.setattr("api.auth.profile_cache.profile_cache.ttl", 0)
+
+    c = TestClient(app)
+    token = create_access_token(subject=str(uuid.uuid4()), email="u@example.com", ttl_minutes=5)
+    headers = {"Authorization": f"Bearer {token}"}
+    responses = [
+        c.get("/api/users/me", headers=headers),
+        c.get("/api/auth/sessions", headers=headers),
+        c.post("/api/auth/refresh", json={"refresh_token": "rt"}),
+    ]
+    reset_token_verifier()
+    for r in responses:
+        assert r.status_code == 503, r.text
+        assert r.headers.get("Retry-After") == "1"
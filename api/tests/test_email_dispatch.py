@@ -0,0 +1,96 @@
+import smtplib
+import uuid
+from datetime import datetime, timezone
+
+import api.services.email_service as es
+
+
+class _FakeSmtp:
+    instances: list["_FakeSmtp"] = []
+
+    def __init__(self, host, port, timeout=None):
+        self.host = host
+        self.port = port
+        self.sent = []
+        self.tls = False
+        self.login_user = None
+        self.disconnect_next = False
+        _FakeSmtp.instances.append(self)
+
+    def starttls(self):
+        self.tls = True
+
+    def login(self, user, _password):
+        self.login_user = user
+
+    def send_message(self, msg):
+        if self.disconnect_next:
+            raise smtplib.SMTPServerDisconnected("bye")
+        self.sent.append(msg)
+
+    def quit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def _row(to_email: str) -> es.EmailOutboxRow:
+    return es.EmailOutboxRow(
+        id=uuid.uuid4(),
+        to_email=to_email,
+        subject="Hi",
+        body_text="plain",
+        body_html="<p>html</p>",
+        status="queued",
+        provider="local_outbox",
+        provider_message_id="",
+        error="",
+        created_at=datetime.now(timezone.utc),
+        sent_at=None,
+    )
+
+
+def _config() -> es.SmtpConfig:
+    return es.SmtpConfig(
+        host="smtp.example.com", port=587, username="user", password="pw", use_tls=True, from_email="no@example.com"
+    )
+
+
+def test_smtp_sender_reuses_one_connection_per_batch(monkeypatch):
+    _FakeSmtp.instances = []
+    monkeypatch.setattr(es.smtplib, "SMTP", _FakeSmtp)
+
+    with es.SmtpSender(_config()) as sender:
+        ids = [sender.send(_row(f"u{i}@example.com")) for i in range(3)]
+
+    assert len(_FakeSmtp.instances) == 1
+    smtp = _FakeSmtp.instances[0]
+    assert smtp.tls is True
+    assert smtp.login_user == "user"
+    assert [m["To"] for m in smtp.sent] == ["u0@example.com", "u1@example.com", "u2@example.com"]
+    assert ids == [m["Message-ID"] for m in smtp.sent]
+    assert len(set(ids)) == 3
+
+
+def test_smtp_sender_reconnects_once_after_server_disconnect(monkeypatch):
+    _FakeSmtp.instances = []
+    monkeypatch.setattr(es.smtplib, "SMTP", _FakeSmtp)
+
+    with es.SmtpSender(_config()) as sender:
+        sender.send(_row("a@example.com"))
+        _FakeSmtp.instances[0].disconnect_next = True
+        sender.send(_row("b@example.com"))
+
+    assert len(_FakeSmtp.instances) == 2
+    assert [m["To"] for m in _FakeSmtp.instances[1].sent] == ["b@example.com"]
+
+
+def test_default_sender_follows_email_host(monkeypatch):
+    monkeypatch.delenv("EMAIL_HOST", raising=False)
+    assert isinstance(es.default_sender(), es.LocalOutboxSender)
+    monkeypatch.setenv("EMAIL_HOST", "smtp.example.com")
+    monkeypatch.setenv("EMAIL_USE_TLS", "false")
+    sender = es.default_sender()
+    assert isinstance(sender, es.SmtpSender)
+    assert sender.config.use_tls is False
@@ -18,7 +18,6 @@ def test_queue_email_creates_outbox_row():
         to_email="test@example.com",
         subject="Hello",
         body_text="Hello world",
-        send_async=False,
     )
     fetched = get_outbox_email(UUID(str(outbox.id)))
     assert fetched is not None
@@ -33,7 +32,6 @@ def test_process_outbox_marks_sent():
         to_email="test2@example.com",
         subject="Hello2",
         body_text="Hello world 2",
-        send_async=False,
     )
     process_outbox_email(outbox_id=UUID(str(outbox.id)))
 
@@ -41,3 +39,85 @@ def test_process_outbox_marks_sent():
     assert fetched is not None
     assert fetched.status == "sent"
     assert fetched.sent_at is not None
+
+
+class _FailingForSender:
+    provider = "test"
+
+    def __init__(self, bad_email: str):
+        self.bad_email = bad_email
+        self.opened = 0
+
+    def __enter__(self):
+        self.opened += 1
+        return self
+
+    def __exit__(self, *_exc):
+        return None
+
+    def send(self, row):
+        if row.to_email == self.bad_email:
+            raise ValueError("rejected")
+        return f"<{row.id}@test>"
+
+
+def test_dispatch_outbox_batch_sends_and_bulk_updates():
+    from api.services.email_service import dispatch_outbox_batch
+
+    ok = queue_email(to_email="batch-ok@example.com", subject="A", body_text="a")
+    bad = queue_email(to_email="batch-bad@example.com", subject="B", body_text="b")
+
+    sender = _FailingForSender("batch-bad@example.com")
+    counts = dispatch_outbox_batch(limit=1000, sender=sender)
+    assert counts["claimed"] >= 2
+    assert sender.opened == 1
+
+    sent = get_outbox_email(UUID(str(ok.id)))
+    assert sent is not None
+    assert sent.status == "sent"
+    assert sent.provider == "test"
+    assert sent.provider_message_id == f"<{ok.id}@test>"
+    assert sent.sent_at is not None
+
+    failed = get_outbox_email(UUID(str(bad.id)))
+    assert failed is not None
+    assert failed.status == "failed"
+    assert failed.error == "rejected"
+    assert failed.sent_at is None
+
+
+def test_dispatch_sends_outside_the_claim_transaction_and_releases_unsent_rows():
+    import smtplib
+
+    from api.db import db_conn
+    from api.services.email_service import dispatch_outbox_batch
+
+    first = queue_email(to_email="lease-1@example.com", subject="A", body_text="a")
+    second = queue_email(to_email="lease-2@example.com", subject="B", body_text="b")
+    seen: dict[str, str] = {}
+
+    class _DisconnectsOnSecond:
+        provider = "test"
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *_exc):
+            return None
+
+        def send(self, row):
+            if row.id not in (first.id, second.id):
+                return "other"
+            # Claimed rows are committed as 'sending' before any SMTP work.
+            with db_conn() as conn, conn.cursor() as cur:
+                cur.execute("SELECT status FROM api_email_outbox WHERE id=%s", (str(row.id),))
+                seen[row.to_email] = cur.fetchone()[0]
+            if row.id == second.id:
+                raise smtplib.SMTPServerDisconnected("bye")
+            return "<ok@test>"
+
+    dispatch_outbox_batch(limit=1000, sender=_DisconnectsOnSecond())
+
+    assert seen == {"lease-1@example.com": "sending", "lease-2@example.com": "sending"}
+    assert get_outbox_email(UUID(str(first.id))).status == "sent"
+    assert get_outbox_email(UUID(str(second.id))).status == "queued"
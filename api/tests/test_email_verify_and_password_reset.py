@@ -26,6 +26,9 @@ def _count_unrevoked_refresh_tokens(user_id: str) -> int:
 
 
 def _count_audit_events(action: str, user_id: str | None = None) -> int:
+    from api.auth.audit_buffer import flush_audit_events
+
+    flush_audit_events()
     with db_conn() as conn, conn.cursor() as cur:
         if user_id is None:
             cur.execute(
@@ -2,10 +2,18 @@ from __future__ import annotations
 
 import pytest
 
-from api.auth.tokens import create_access_token, decode_access_token
+from api.auth.tokens import create_access_token, decode_access_token, reset_token_verifier
 import jwt
 
 
+@pytest.fixture(autouse=True)
+def _fresh_verifier():
+    # The verifier snapshots JWT_* env on first use; rebuild it around each test.
+    reset_token_verifier()
+    yield
+    reset_token_verifier()
+
+
 def test_access_token_includes_and_validates_iss_aud(monkeypatch):
     monkeypatch.setenv("JWT_SECRET", "test-secret")
     monkeypatch.setenv("JWT_ISSUER", "base2")
@@ -24,6 +32,7 @@ def test_decode_rejects_wrong_issuer(monkeypatch):
 
     token = create_access_token(subject="123", email="a@b.com", ttl_minutes=5)
     monkeypatch.setenv("JWT_ISSUER", "issuer-b")
+    reset_token_verifier()
 
     with pytest.raises(jwt.InvalidTokenError):
         decode_access_token(token)
@@ -36,6 +45,43 @@ def test_decode_rejects_wrong_audience(monkeypatch):
 
     token = create_access_token(subject="123", email="a@b.com", ttl_minutes=5)
     monkeypatch.setenv("JWT_AUDIENCE", "aud-b")
+    reset_token_verifier()
 
     with pytest.raises(jwt.InvalidTokenError):
         decode_access_token(token)
+
+
+def test_verifier_caches_verified_tokens_until_exp(monkeypatch):
+    monkeypatch.setenv("JWT_SECRET", "test-secret")
+    monkeypatch.setenv("JWT_ISSUER", "base2")
+    monkeypatch.setenv("JWT_AUDIENCE", "base2")
+
+    token = create_access_token(subject="123", email="a@b.com", ttl_minutes=5)
+    first = decode_access_token(token)
+
+    calls = {"n": 0}
+    real_decode = jwt.PyJWT.decode
+
+    def counting_decode(self, *args, **kwargs):
+        calls["n"] += 1
+        return real_decode(self, *args, **kwargs)
+
+    monkeypatch.setattr(jwt.PyJWT, "decode", counting_decode)
+
+    second = decode_access_token(token)
+    assert second == first
+    assert calls["n"] == 0
+
+    # Mutating a returned payload must not poison the cache.
+    second["sub"] = "tampered"
+    assert decode_access_token(token)["sub"] == "123"
+
+
+def test_verifier_rejects_tampered_token_even_after_cache_hit(monkeypatch):
+    monkeypatch.setenv("JWT_SECRET", "test-secret")
+
+    token = create_access_token(subject="123", email="a@b.com", ttl_minutes=5)
+    decode_access_token(token)
+
+    with pytest.raises(jwt.InvalidTokenError):
+        decode_access_token(token[:-2] + ("AA" if not token.endswith("AA") else "BB"))
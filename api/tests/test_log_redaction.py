@@ -35,3 +35,75 @@ def test_redacts_url_credentials_in_message():
     payload = _capture_log("broker=redis://:mypassword@redis:6379/0")
     assert "mypassword" not in payload["message"]
     assert ":[REDACTED]@redis:6379/0" in payload["message"]
+
+
+def test_redacts_sensitive_extra_fields_and_user_agent():
+    stream = StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonFormatter(service="api"))
+    handler.addFilter(RedactingFilter())
+
+    logger = logging.getLogger("test.redaction.extra")
+    logger.handlers = [handler]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    logger.info("request %s", "Bearer abc123", extra={"user_agent": "curl Bearer xyz789", "refresh_token": "r"})
+    payload = json.loads(stream.getvalue().strip())
+    assert "abc123" not in payload["message"]
+    assert "xyz789" not in payload["user_agent"]
+
+
+def test_queue_handler_drops_and_counts_when_full():
+    import queue
+
+    from api.logging import _BoundedQueueHandler
+
+    handler = _BoundedQueueHandler(queue.Queue(maxsize=1))
+    logger = logging.getLogger("test.redaction.queue")
+    logger.handlers = [handler]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    logger.info("first %s", "arg")
+    logger.warning("second")
+    logger.warning("third")
+
+    queued = handler.queue.get_nowait()
+    assert queued.msg == "first arg" and queued.args is None
+    assert handler.dropped == {"WARNING": 2}
+
+
+def test_access_log_sampler_keeps_errors_and_slow_requests():
+    from api.logging import AccessLogSampler
+
+    sampler = AccessLogSampler(
+        default_rate=0.0,
+        route_rates={"/api/users/me": 1.0},
+        exclude_paths=frozenset({"/api/health"}),
+        slow_ms=500,
+    )
+
+    assert sampler.should_log(route="/api/health", path="/api/health", status=200, latency_ms=1) is False
+    assert sampler.should_log(route="/api/health", path="/api/health", status=503, latency_ms=1) is True
+    assert sampler.should_log(route="/api/auth/refresh", path="/api/auth/refresh", status=200, latency_ms=1) is False
+    assert sampler.should_log(route="/api/auth/refresh", path="/api/auth/refresh", status=401, latency_ms=1) is True
+    assert sampler.should_log(route="/api/auth/refresh", path="/api/auth/refresh", status=200, latency_ms=750) is True
+    assert sampler.should_log(route="/api/users/me", path="/api/users/me", status=200, latency_ms=1) is True
+
+    assert sampler.sampled_out == {("/api/health", "excluded"): 1, ("/api/auth/refresh", "sampled"): 1}
+    names = {(s[0], s[3]["reason"]) for s in sampler.samples()}
+    assert ("base2_api_access_log_sampled_out_total", "excluded") in names
+
+
+def test_access_log_sampler_reads_env(monkeypatch):
+    from api.logging import AccessLogSampler
+
+    monkeypatch.setenv("ACCESS_LOG_SAMPLE_RATE", "0.25")
+    monkeypatch.setenv("ACCESS_LOG_ROUTE_RATES", "/api/users/me=0.1, /api/auth/me=2")
+    monkeypatch.delenv("ACCESS_LOG_EXCLUDE_PATHS", raising=False)
+
+    sampler = AccessLogSampler.from_env()
+    assert sampler.default_rate == 0.25
+    assert sampler.route_rates == {"/api/users/me": 0.1, "/api/auth/me": 1.0}
+    assert sampler.exclude_paths == frozenset({"/api/health", "/api/metrics"})
@@ -12,3 +12,49 @@ def test_metrics_exists_and_has_expected_names():
     body = r.text
     assert "base2_api_requests_total" in body
     assert "base2_api_uptime_seconds" in body
+
+
+def test_metrics_exports_latency_histogram_per_route():
+    client = TestClient(app)
+    client.get("/api/items/123")
+    client.get("/api/does-not-exist")
+    body = client.get("/api/metrics").text
+
+    assert "# TYPE base2_api_request_duration_seconds histogram" in body
+    assert 'base2_api_request_duration_seconds_bucket{method="GET",route="/api/items/{item_id}",le="+Inf"}' in body
+    assert 'base2_api_request_duration_seconds_count{method="GET",route="unmatched"}' in body
+    assert "/api/items/123" not in body
+
+
+def test_histogram_merges_observations_from_threads():
+    import threading
+
+    from api.metrics import ApiMetrics
+
+    m = ApiMetrics()
+    workers = [
+        threading.Thread(target=lambda: [m.observe(status=200, latency_ms=20, method="get", route="/x") for _ in range(100)])
+        for _ in range(4)
+    ]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    m.observe(status=500, latency_ms=20_000, method="GET", route="/x")
+
+    body = m.render_prometheus()
+    assert "base2_api_requests_total 401" in body
+    assert 'base2_api_request_duration_seconds_bucket{method="GET",route="/x",le="0.025"} 400' in body
+    assert 'base2_api_request_duration_seconds_bucket{method="GET",route="/x",le="10"} 400' in body
+    assert 'base2_api_request_duration_seconds_bucket{method="GET",route="/x",le="+Inf"} 401' in body
+    # The p95 gauge keeps its rolling-window meaning: the nearest-rank p95 of
+    # the recent samples, not a histogram bucket bound.
+    assert "base2_api_request_latency_ms_p95 20.000" in body
+
+
+def test_collected_label_values_are_escaped():
+    from api.metrics import ApiMetrics
+
+    m = ApiMetrics()
+    m.register_collector(lambda: [("base2_test_total", "counter", "Test", {"table": 'a"b\\c\nd'}, 1)])
+    assert 'base2_test_total{table="a\\"b\\\\c\\nd"} 1' in m.render_prometheus()
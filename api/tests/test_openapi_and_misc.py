@@ -70,3 +70,31 @@ def test_api_openapi_alias_exists_and_is_json():
     assert r.status_code == 200
     assert isinstance(r.json(), dict)
     assert "openapi" in r.json() or "paths" in r.json()
+
+
+def test_api_openapi_alias_serves_etag_and_304():
+    c = _client()
+    r = c.get("/api/openapi.json", headers={"Accept-Encoding": "identity"})
+    assert r.status_code == 200
+    etag = r.headers.get("etag")
+    assert etag and etag.startswith('"')
+    assert "content-encoding" not in r.headers
+    assert "/api/auth/me" in r.json()["paths"]
+
+    again = c.get("/api/openapi.json", headers={"Accept-Encoding": "identity", "If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers.get("etag") == etag
+    assert again.content == b""
+
+
+def test_api_openapi_alias_serves_gzip_variant():
+    c = _client()
+    r = c.get("/api/openapi.json", headers={"Accept-Encoding": "gzip"})
+    assert r.status_code == 200
+    assert r.headers.get("content-encoding") == "gzip"
+    assert "Accept-Encoding" in r.headers.get("vary", "")
+    assert r.json()["paths"]
+
+    plain = c.get("/api/openapi.json", headers={"Accept-Encoding": "gzip;q=0"})
+    assert "content-encoding" not in plain.headers
+    assert plain.headers.get("etag") != r.headers.get("etag")
@@ -0,0 +1,111 @@
+import socket
+import threading
+
+from api.services.outbox_relay import CHANNEL, OutboxRelay
+
+
+class _FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        return None
+
+    def execute(self, sql):
+        self.conn.executed.append(sql)
+
+
+class _FakeListenConn:
+    """psycopg2-like LISTEN connection backed by a socket pair."""
+
+    def __init__(self):
+        self._server, self._client = socket.socketpair()
+        self.executed = []
+        self.notifies = []
+        self.autocommit = False
+        self.closed = False
+
+    def fileno(self):
+        return self._client.fileno()
+
+    def cursor(self):
+        return _FakeCursor(self)
+
+    def notify(self):
+        self._server.send(b"x")
+
+    def poll(self):
+        self._client.recv(1024)
+        self.notifies.append(object())
+
+    def close(self):
+        self.closed = True
+        self._server.close()
+        self._client.close()
+
+
+def test_relay_drains_on_startup_and_on_notify():
+    conn = _FakeListenConn()
+    stop = threading.Event()
+    drained = threading.Event()
+    calls = []
+
+    def drain():
+        calls.append(len(calls))
+        if len(calls) == 2:
+            drained.set()
+            stop.set()
+        return {"claimed": 1, "sent": 1, "failed": 0}
+
+    relay = OutboxRelay(connect=lambda: conn, drain=drain, scan_interval_sec=30)
+    worker = threading.Thread(target=relay.run, args=(stop,), daemon=True)
+    worker.start()
+    try:
+        conn.notify()
+        assert drained.wait(5)
+    finally:
+        stop.set()
+        worker.join(5)
+
+    assert conn.autocommit is True
+    assert conn.executed == [f"LISTEN {CHANNEL}"]
+    assert len(calls) == 2  # startup scan, then the notification
+    assert conn.closed is True
+
+
+def test_relay_scans_periodically_without_notifications():
+    conn = _FakeListenConn()
+    stop = threading.Event()
+    calls = []
+
+    def drain():
+        calls.append(1)
+        if len(calls) == 3:
+            stop.set()
+        return {"claimed": 0, "sent": 0, "failed": 0}
+
+    relay = OutboxRelay(connect=lambda: conn, drain=drain, scan_interval_sec=0.1)
+    worker = threading.Thread(target=relay.run, args=(stop,), daemon=True)
+    worker.start()
+    worker.join(5)
+    assert not worker.is_alive()
+    assert len(calls) == 3
+
+
+def test_relay_reconnects_after_connection_errors():
+    stop = threading.Event()
+    attempts = []
+
+    def connect():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise OSError("connection refused")
+        stop.set()
+        return _FakeListenConn()
+
+    relay = OutboxRelay(connect=connect, drain=lambda: {"claimed": 0, "sent": 0, "failed": 0})
+    relay.run(stop)
+    assert len(attempts) == 2
@@ -0,0 +1,40 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.auth import passwords
+from api.exceptions import ServiceOverloaded
+from api.main import app
+
+
+def test_hash_and_verify_run_on_pool():
+    try:
+        hashed = asyncio.run(passwords.hash_password_async("Test1234!"))
+        assert hashed.startswith("$pbkdf2-sha256$")
+        assert asyncio.run(passwords.verify_password_async("Test1234!", hashed)) is True
+        assert asyncio.run(passwords.verify_password_async("wrong", hashed)) is False
+    finally:
+        passwords.shutdown_hash_executor()
+
+
+def test_full_hash_queue_raises_overloaded(monkeypatch):
+    monkeypatch.setattr("api.settings.settings.PASSWORD_HASH_MAX_PENDING", 0)
+    with pytest.raises(ServiceOverloaded):
+        asyncio.run(passwords.hash_password_async("Test1234!"))
+
+
+def test_login_returns_503_when_hash_queue_is_full(monkeypatch):
+    import api.security.rate_limit as rl
+
+    monkeypatch.setattr(rl, "incr_and_check_detailed", lambda ip, scope: (1, False, 0))
+
+    async def fake_login_user(**_kwargs):
+        raise ServiceOverloaded("password_hashing")
+
+    monkeypatch.setattr("api.auth.service.login_user", fake_login_user)
+
+    r = TestClient(app).post("/api/auth/login", json={"email": "u@example.com", "password": "pw"})
+    assert r.status_code == 503
+    assert r.json() == {"detail": "service_overloaded"}
+    assert r.headers.get("Retry-After") == "1"
@@ -0,0 +1,62 @@
+import asyncio
+from contextlib import asynccontextmanager
+from uuid import uuid4
+
+from api import db
+from api.auth import async_repo
+
+
+class _RecordingCursor:
+    def __init__(self, calls):
+        self._calls = calls
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, sql, params=None, *, prepare=None):
+        self._calls.append((sql, prepare))
+
+    async def fetchone(self):
+        return None
+
+
+class _RecordingConn:
+    def __init__(self, calls):
+        self._calls = calls
+
+    def cursor(self):
+        return _RecordingCursor(self._calls)
+
+    async def execute(self, sql, params=None, *, prepare=None):
+        self._calls.append((sql, prepare))
+
+
+def test_hot_statements_are_prepared_and_others_use_threshold(monkeypatch):
+    calls = []
+
+    @asynccontextmanager
+    async def fake_conn():
+        yield _RecordingConn(calls)
+
+    monkeypatch.setattr(async_repo, "async_db_conn", fake_conn)
+    # Replica-routable reads fall back to the primary through api.db.
+    monkeypatch.setattr(db, "async_db_conn", fake_conn)
+
+    async def run():
+        await async_repo.get_user_by_id(uuid4())
+        await async_repo.find_refresh_token(token_hash="h")
+        await async_repo.consume_one_time_token(token_id=uuid4())
+
+    asyncio.run(run())
+    assert calls == [
+        (async_repo.repo.SQL_GET_USER_BY_ID, True),
+        (async_repo.repo.SQL_FIND_REFRESH_TOKEN, True),
+        (async_repo.repo.SQL_CONSUME_ONE_TIME_TOKEN, None),
+    ]
+
+
+def test_registry_names_are_unique_statements():
+    assert len(set(async_repo.PREPARED_STATEMENTS.values())) == len(async_repo.PREPARED_STATEMENTS)
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import asyncio
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api import redis_client
+from api.auth import async_repo
+from api.auth.profile_cache import profile_cache
+from api.auth.tokens import create_access_token, reset_token_verifier
+from api.auth.user_cache import user_cache
+from api.main import app
+
+
+class _FakeGetScript:
+    """Mimics the cache's version-then-entry Lua script."""
+
+    def __init__(self, redis):
+        self._redis = redis
+
+    async def __call__(self, keys=None, args=None, client=None):
+        self._redis.calls += 1
+        if self._redis.down:
+            raise ConnectionError("redis down")
+        version = self._redis.store.get(keys[0], b"0")
+        return [version, self._redis.store.get(args[0] + version.decode())]
+
+
+class _FakePipeline:
+    def __init__(self, redis, ops):
+        self._redis = redis
+        self._ops = ops
+
+    def incr(self, key):
+        self._ops.append(("incr", key))
+
+    def expire(self, key, seconds):
+        self._ops.append(("expire", key, seconds))
+
+    def _apply(self):
+        if self._redis.down:
+            raise ConnectionError("redis down")
+        for op in self._ops:
+            if op[0] == "incr":
+                self._redis.store[op[1]] = str(int(self._redis.store.get(op[1], b"0")) + 1).encode()
+
+
+class _FakeAsyncPipeline(_FakePipeline):
+    async def execute(self):
+        self._apply()
+
+
+class _FakeSyncPipeline(_FakePipeline):
+    def execute(self):
+        self._apply()
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.store: dict[str, bytes] = {}
+        self.calls = 0
+        self.down = False
+
+    def register_script(self, _lua):
+        return _FakeGetScript(self)
+
+    async def set(self, key, value, ex=None):
+        if self.down:
+            raise ConnectionError("redis down")
+        self.store[key] = value.encode()
+
+    def pipeline(self, transaction=True):
+        return _FakeAsyncPipeline(self, [])
+
+
+class _FakeSyncRedis:
+    def __init__(self, redis):
+        self._redis = redis
+
+    def pipeline(self, transaction=True):
+        return _FakeSyncPipeline(self._redis, [])
+
+
+def _row(user_id, *, display_name="U", email="u@example.com"):
+    return (str(user_id), email, "x", True, True, display_name, "", "")
+
+
+@pytest.fixture()
+def redis(monkeypatch):
+    fake = _FakeRedis()
+    monkeypatch.setenv("JWT_SECRET", "test-secret")
+    monkeypatch.setattr(redis_client, "get_async_client", lambda: fake)
+    monkeypatch.setattr(redis_client, "get_client", lambda: _FakeSyncRedis(fake))
+    reset_token_verifier()
+    user_cache.clear()
+    profile_cache.reset()
+    yield fake
+    user_cache.clear()
+    profile_cache.reset()
+    reset_token_verifier()
+
+
+@pytest.fixture()
+def db_reads(monkeypatch):
+    users: dict[uuid.UUID, tuple] = {}
+    reads: list[tuple[uuid.UUID, bool]] = []
+
+    async def fake_get_user_by_id(uid, *, primary=False):
+        reads.append((uid, primary))
+        row = users.get(uid)
+        return async_repo.repo._user_from_row(row) if row else None
+
+    monkeypatch.setattr(async_repo, "get_user_by_id", fake_get_user_by_id)
+    return users, reads
+
+
+def _headers(user_id):
+    token = create_access_token(subject=str(user_id), email="u@example.com", ttl_minutes=5)
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_profile_is_shared_across_workers_until_a_write_bumps_the_version(monkeypatch, redis, db_reads):
+    users, reads = db_reads
+    user_id = uuid.uuid4()
+    users[user_id] = _row(user_id)
+    c = TestClient(app)
+
+    assert c.get("/api/auth/me", headers=_headers(user_id)).json()["display_name"] == "U"
+    user_cache.clear()  # as seen by another worker
+    assert c.get("/api/users/me", headers=_headers(user_id)).json()["display_name"] == "U"
+    assert reads == [(user_id, True)]
+
+    users[user_id] = _row(user_id, display_name="Renamed")
+
+    async def fake_fetchone(sql, params, **_kw):
+        return users[user_id]
+
+    monkeypatch.setattr(async_repo, "_fetchone", fake_fetchone)
+    asyncio.run(async_repo.update_profile(user_id=user_id, display_name="Renamed", avatar_url=None, bio=None))
+
+    assert c.get("/api/users/me", headers=_headers(user_id)).json()["display_name"] == "Renamed"
+    assert reads == [(user_id, True), (user_id, True)]
+    samples = profile_cache.samples()
+    assert ("base2_api_profile_cache_lookups_total", "counter", "Profile cache lookups by result", {"result": "hit"}, 1) in samples
+    assert ("base2_api_profile_cache_lookups_total", "counter", "Profile cache lookups by result", {"result": "miss"}, 2) in samples
+    assert ("base2_api_profile_cache_invalidations_total", "counter", "Profile versions bumped by writes", {}, 1) in samples
+
+
+def test_fill_that_raced_a_write_is_never_served(redis):
+    user_id = uuid.uuid4()
+
+    async def scenario():
+        _, version = await profile_cache.get(user_id)
+        await profile_cache.invalidate(user_id)  # write lands while the reader queries Postgres
+        await profile_cache.put(user_id, version, {"id": str(user_id), "display_name": "stale"})
+        return await profile_cache.get(user_id)
+
+    profile, version = asyncio.run(scenario())
+    assert profile is None
+    assert version == "1"
+
+
+def test_sync_repo_writes_bump_the_version(monkeypatch, redis):
+    from api.auth import repo
+
+    user_id = uuid.uuid4()
+
+    class _Cursor:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def execute(self, sql, params=None):
+            pass
+
+    class _Conn:
+        autocommit = False
+
+        def cursor(self):
+            return _Cursor()
+
+    class _DbConn:
+        def __enter__(self):
+            return _Conn()
+
+        def __exit__(self, *exc):
+            return False
+
+    monkeypatch.setattr(repo, "db_conn", lambda: _DbConn())
+    repo.set_user_email_verified(user_id=user_id)
+
+    assert redis.store[redis_client.key("profile", "ver", str(user_id))] == b"1"
+
+
+def test_redis_errors_fall_back_to_postgres_and_cool_down(redis, db_reads):
+    users, reads = db_reads
+    user_id = uuid.uuid4()
+    users[user_id] = _row(user_id)
+    redis.down = True
+    c = TestClient(app)
+
+    for _ in range(3):
+        user_cache.clear()
+        r = c.get("/api/auth/me", headers=_headers(user_id))
+        assert r.status_code == 200, r.text
+        assert r.json()["email"] == "u@example.com"
+
+    assert redis.calls == 1  # later requests skip Redis during the cooldown
+    assert reads == [(user_id, False)] * 3
+    assert ("base2_api_profile_cache_errors_total", "counter", "Failed profile cache Redis calls", {}, 1) in profile_cache.samples()
+
+
+def test_unknown_user_is_not_cached(redis, db_reads):
+    _users, reads = db_reads
+    user_id = uuid.uuid4()
+    c = TestClient(app)
+
+    for _ in range(2):
+        r = c.get("/api/users/me", headers=_headers(user_id))
+        assert r.status_code == 401
+    assert len(reads) == 2
+    assert not [k for k in redis.store if k.startswith(redis_client.key("profile", "v1"))]
@@ -6,34 +6,28 @@ if _REPO_ROOT not in sys.path:
     sys.path.insert(0, _REPO_ROOT)
 
 
-class _FakePipeline:
-    def __init__(self, store: dict):
-        self._store = store
-        self._ops: list[tuple[str, str, int]] = []
-
-    def incr(self, k: str, n: int):
-        self._ops.append(("incr", k, n))
-        return self
+class _FakeLimiterScript:
+    """Mimics the limiter's INCR + PEXPIRE-on-first-hit Lua script."""
 
-    def pexpire(self, k: str, ms: int):
-        self._ops.append(("pexpire", k, ms))
-        return self
+    def __init__(self, store: dict, window_ms: dict):
+        self._store = store
+        self._window_ms = window_ms
 
-    def execute(self):
-        val = None
-        for op, k, arg in self._ops:
-            if op == "incr":
-                self._store[k] = int(self._store.get(k, 0)) + int(arg)
-                val = self._store[k]
-        return val, True
+    def __call__(self, keys=None, args=None, client=None):
+        k = keys[0]
+        self._store[k] = int(self._store.get(k, 0)) + 1
+        if self._store[k] == 1:
+            self._window_ms[k] = int(args[0])
+        return [self._store[k], self._window_ms[k]]
 
 
 class _FakeRedis:
     def __init__(self):
         self.store = {}
+        self.ttl_ms = {}
 
-    def pipeline(self):
-        return _FakePipeline(self.store)
+    def register_script(self, _lua: str):
+        return _FakeLimiterScript(self.store, self.ttl_ms)
 
 
 def test_incr_and_check_over_limit(monkeypatch):
@@ -42,6 +36,7 @@ def test_incr_and_check_over_limit(monkeypatch):
     fake = _FakeRedis()
 
     monkeypatch.setattr(rl, "get_client", lambda: fake)
+    rl.clear_local_denials()
     monkeypatch.setattr(rl, "MAX_REQUESTS", 2)
     monkeypatch.setattr(rl, "WINDOW_MS", 60000)
 
@@ -53,3 +48,35 @@ def test_incr_and_check_over_limit(monkeypatch):
 
     c3, over3 = rl.incr_and_check("1.2.3.4", "login")
     assert c3 == 3 and over3 is True
+
+
+def test_denied_identifier_skips_redis_until_window_ends(monkeypatch):
+    import api.security.rate_limit as rl
+
+    fake = _FakeRedis()
+    calls = []
+    script = fake.register_script("")
+
+    def counting_script(keys=None, args=None, client=None):
+        calls.append(keys[0])
+        return script(keys=keys, args=args, client=client)
+
+    monkeypatch.setattr(fake, "register_script", lambda _lua: counting_script)
+    monkeypatch.setattr(rl, "get_client", lambda: fake)
+    rl.clear_local_denials()
+    monkeypatch.setitem(rl.SCOPE_LIMITS, "auth_login", (60_000, 1))
+
+    assert rl.incr_and_check_detailed("5.6.7.8", "auth_login") == (1, False, 0)
+    count, over, retry_after = rl.incr_and_check_detailed("5.6.7.8", "auth_login")
+    assert (count, over, retry_after) == (2, True, 60)
+    assert len(calls) == 2
+
+    for _ in range(3):
+        _count, over, retry_after = rl.incr_and_check_detailed("5.6.7.8", "auth_login")
+        assert over is True and 1 <= retry_after <= 60
+    assert len(calls) == 2
+
+    # Other identifiers still go to Redis.
+    assert rl.incr_and_check_detailed("9.9.9.9", "auth_login") == (1, False, 0)
+    assert len(calls) == 3
+    rl.clear_local_denials()
@@ -7,34 +7,28 @@ from fastapi.testclient import TestClient
 from api.main import app
 
 
-class _FakePipeline:
-    def __init__(self, store: dict):
-        self._store = store
-        self._ops: list[tuple[str, str, int]] = []
-
-    def incr(self, k: str, n: int):
-        self._ops.append(("incr", k, n))
-        return self
+class _FakeLimiterScript:
+    """Mimics the limiter's INCR + PEXPIRE-on-first-hit Lua script."""
 
-    def pexpire(self, k: str, ms: int):
-        self._ops.append(("pexpire", k, ms))
-        return self
+    def __init__(self, store: dict, window_ms: dict):
+        self._store = store
+        self._window_ms = window_ms
 
-    def execute(self):
-        val = None
-        for op, k, arg in self._ops:
-            if op == "incr":
-                self._store[k] = int(self._store.get(k, 0)) + int(arg)
-                val = self._store[k]
-        return val, True
+    def __call__(self, keys=None, args=None, client=None):
+        k = keys[0]
+        self._store[k] = int(self._store.get(k, 0)) + 1
+        if self._store[k] == 1:
+            self._window_ms[k] = int(args[0])
+        return [self._store[k], self._window_ms[k]]
 
 
 class _FakeRedis:
     def __init__(self):
         self.store = {}
+        self.ttl_ms = {}
 
-    def pipeline(self):
-        return _FakePipeline(self.store)
+    def register_script(self, _lua: str):
+        return _FakeLimiterScript(self.store, self.ttl_ms)
 
 
 def test_auth_login_cookie_mode_sets_http_only_cookie_and_hides_refresh(monkeypatch):
@@ -44,6 +38,7 @@ def test_auth_login_cookie_mode_sets_http_only_cookie_and_hides_refresh(monkeypa
 
     fake = _FakeRedis()
     monkeypatch.setattr(rl, "get_client", lambda: fake)
+    rl.clear_local_denials()
 
     # Force cookie mode on for this test.
     monkeypatch.setattr("api.routes.auth.settings.AUTH_REFRESH_COOKIE", True)
@@ -66,7 +61,7 @@ def test_auth_login_cookie_mode_sets_http_only_cookie_and_hides_refresh(monkeypa
         refresh_token_expires_at=datetime.now(timezone.utc) + timedelta(days=30),
     )
 
-    def fake_login_user(*, email: str, password: str, ip: str, user_agent: str, refresh_ttl_days: int, access_ttl_minutes: int):
+    async def fake_login_user(*, email: str, password: str, ip: str, user_agent: str, refresh_ttl_days: int, access_ttl_minutes: int):
         return u, tokens
 
     monkeypatch.setattr("api.auth.service.login_user", fake_login_user)
@@ -91,6 +86,7 @@ def test_auth_login_non_cookie_mode_returns_refresh_in_json(monkeypatch):
 
     fake = _FakeRedis()
     monkeypatch.setattr(rl, "get_client", lambda: fake)
+    rl.clear_local_denials()
 
     # Force cookie mode off for this test.
     monkeypatch.setattr("api.routes.auth.settings.AUTH_REFRESH_COOKIE", False)
@@ -112,7 +108,7 @@ def test_auth_login_non_cookie_mode_returns_refresh_in_json(monkeypatch):
         refresh_token_expires_at=datetime.now(timezone.utc) + timedelta(days=30),
     )
 
-    def fake_login_user(*, email: str, password: str, ip: str, user_agent: str, refresh_ttl_days: int, access_ttl_minutes: int):
+    async def fake_login_user(*, email: str, password: str, ip: str, user_agent: str, refresh_ttl_days: int, access_ttl_minutes: int):
         return u, tokens
 
     monkeypatch.setattr("api.auth.service.login_user", fake_login_user)
@@ -0,0 +1,90 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from api.auth import async_repo, service
+from api.auth.repo import User
+
+
+@pytest.fixture(autouse=True)
+def _jwt_secret(monkeypatch):
+    monkeypatch.setenv("JWT_SECRET", "test-secret")
+    from api.auth.tokens import reset_token_verifier
+
+    reset_token_verifier()
+    yield
+    reset_token_verifier()
+
+
+def _user() -> User:
+    return User(
+        id=uuid.uuid4(),
+        email="u@example.com",
+        password_hash="x",
+        is_active=True,
+        is_email_verified=True,
+        display_name="",
+        avatar_url="",
+        bio="",
+    )
+
+
+def _refresh(**kwargs):
+    return asyncio.run(
+        service.refresh_tokens(refresh_token="r", ip="1.2.3.4", user_agent="ua", refresh_ttl_days=7, access_ttl_minutes=5, **kwargs)
+    )
+
+
+def test_refresh_rotates_in_one_repo_call(monkeypatch):
+    user = _user()
+    expires = datetime.now(timezone.utc) + timedelta(days=7)
+    calls = []
+
+    async def rotate(**kwargs):
+        calls.append(kwargs)
+        return user, uuid.uuid4(), expires
+
+    async def unexpected(**_kwargs):
+        raise AssertionError("fallback lookup on the happy path")
+
+    monkeypatch.setattr(async_repo, "rotate_refresh_token", rotate)
+    monkeypatch.setattr(async_repo, "find_refresh_token", unexpected)
+
+    got_user, tokens = _refresh()
+    assert got_user == user
+    assert tokens.refresh_token and tokens.refresh_token != "r"
+    assert tokens.refresh_token_expires_at == expires
+    assert len(calls) == 1
+    assert calls[0]["token_hash"] != calls[0]["new_token_hash"]
+
+
+@pytest.mark.parametrize(
+    ("rec", "error", "reuse_audited"),
+    [
+        (None, "invalid_refresh", False),
+        ({"revoked_at": datetime.now(timezone.utc), "expires_at": None}, "invalid_refresh", True),
+        ({"revoked_at": None, "expires_at": datetime.now(timezone.utc) - timedelta(seconds=1)}, "expired_refresh", False),
+    ],
+)
+def test_failed_rotation_is_classified(monkeypatch, rec, error, reuse_audited):
+    audits = []
+    user_id = uuid.uuid4()
+
+    async def rotate(**_kwargs):
+        return None
+
+    async def find(**_kwargs):
+        return None if rec is None else {"id": uuid.uuid4(), "user_id": user_id, **rec}
+
+    async def audit(**kwargs):
+        audits.append(kwargs["action"])
+
+    monkeypatch.setattr(async_repo, "rotate_refresh_token", rotate)
+    monkeypatch.setattr(async_repo, "find_refresh_token", find)
+    monkeypatch.setattr(async_repo, "insert_audit_event", audit)
+
+    with pytest.raises(ValueError, match=error):
+        _refresh()
+    assert audits == (["auth.refresh_reuse"] if reuse_audited else [])
@@ -0,0 +1,185 @@
+import asyncio
+from contextlib import contextmanager
+
+import psycopg2
+import pytest
+from psycopg_pool import PoolTimeout
+
+import api.db as db
+
+
+class _Cursor:
+    def __init__(self, conn):
+        self._conn = conn
+        self._row = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        if self._conn.fail:
+            raise psycopg2.OperationalError("canceling statement due to conflict with recovery")
+        self._conn.queries.append(sql)
+        self._row = (self._conn.lag,) if sql == db.SQL_REPLICA_LAG else (self._conn.name,)
+
+    def fetchone(self):
+        return self._row
+
+
+class _Conn:
+    def __init__(self, name, lag=0.0):
+        self.name = name
+        self.lag = lag
+        self.fail = False
+        self.autocommit = True
+        self.queries = []
+
+    def cursor(self):
+        return _Cursor(self)
+
+
+class _Pool:
+    def __init__(self, conn, *, unavailable=False):
+        self.conn = conn
+        self.unavailable = unavailable
+        self.returned = []
+
+    def getconn(self):
+        if self.unavailable:
+            raise psycopg2.OperationalError("could not connect to server")
+        return self.conn
+
+    def putconn(self, conn, close=False):
+        self.returned.append((conn, close))
+
+
+@pytest.fixture()
+def routed(monkeypatch):
+    router = db.ReplicaRouter(max_lag_sec=5, check_interval_sec=60)
+    primary = _Pool(_Conn("primary"))
+    replica = _Pool(_Conn("replica"))
+    monkeypatch.setattr(db, "_get_router", lambda: router)
+    monkeypatch.setattr(db, "_get_pool", lambda: primary)
+    monkeypatch.setattr(db, "_get_replica_pool", lambda: replica)
+    return router, primary, replica
+
+
+def _which(conn):
+    with conn.cursor() as cur:
+        cur.execute("SELECT which")
+        return cur.fetchone()[0]
+
+
+def test_reads_use_replica_and_check_lag_once_per_interval(routed):
+    router, _primary, replica = routed
+
+    assert db.run_read(_which, read=db.READ_ONLY) == "replica"
+    assert db.run_read(_which, read=db.READ_ONLY) == "replica"
+
+    assert replica.conn.queries.count(db.SQL_REPLICA_LAG) == 1
+    assert ("base2_api_db_reads_total", "counter", "Routed reads by target and reason", {"target": "replica", "reason": "read_only"}, 2) in router.samples()
+
+
+def test_lagging_replica_falls_back_to_primary(routed):
+    router, _primary, replica = routed
+    replica.conn.lag = 30.0
+
+    with db.db_conn(read=db.READ_ONLY) as conn:
+        assert conn.name == "primary"
+    assert router.lagging()
+    assert ("base2_api_db_replica_lag_seconds", "gauge", "Replica replay lag at the last check", {}, 30.0) in router.samples()
+
+
+def test_unreachable_replica_falls_back_and_cools_down(routed):
+    router, _primary, replica = routed
+    replica.unavailable = True
+
+    with db.db_conn(read=db.READ_ONLY) as conn:
+        assert conn.name == "primary"
+    assert router.choose(db.READ_ONLY) == "replica_unavailable"
+
+
+def test_replica_error_mid_query_is_retried_on_primary(routed):
+    router, _primary, replica = routed
+    db.run_read(_which, read=db.READ_ONLY)  # lag checked, replica healthy
+    replica.conn.fail = True
+
+    assert db.run_read(_which, read=db.READ_ONLY) == "primary"
+    assert router.choose(db.READ_ONLY) == "replica_unavailable"
+    assert (replica.conn, False) in replica.returned
+
+
+def test_read_your_writes_uses_primary_for_recently_written_keys(routed):
+    router, _primary, _replica = routed
+    db.note_write(("user", "u1"))
+
+    assert db.run_read(_which, read=db.READ_YOUR_WRITES, key=("user", "u1")) == "primary"
+    assert db.run_read(_which, read=db.READ_YOUR_WRITES, key=("user", "u2")) == "replica"
+    # READ_ONLY callers accept staleness, so the write marker does not apply.
+    assert db.run_read(_which, read=db.READ_ONLY, key=("user", "u1")) == "replica"
+
+
+def test_write_markers_expire_after_the_lag_window(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(db.time, "monotonic", lambda: now[0])
+    router = db.ReplicaRouter(max_lag_sec=2, check_interval_sec=1, max_keys=2)
+
+    router.note_write("a")
+    assert router.choose(db.READ_YOUR_WRITES, "a") == "recent_write"
+    now[0] += 3.0
+    assert router.choose(db.READ_YOUR_WRITES, "a") is None
+
+    for key in ("b", "c", "d"):
+        router.note_write(key)
+    assert router.choose(db.READ_YOUR_WRITES, "b") is None  # evicted beyond max_keys
+    assert router.choose(db.READ_YOUR_WRITES, "d") == "recent_write"
+
+
+def test_without_replica_url_reads_use_primary(monkeypatch):
+    primary = _Pool(_Conn("primary"))
+    monkeypatch.setattr(db, "_get_router", lambda: None)
+    monkeypatch.setattr(db, "_get_pool", lambda: primary)
+
+    @contextmanager
+    def _never():
+        raise AssertionError("replica pool should not be used")
+        yield
+
+    monkeypatch.setattr(db, "_get_replica_pool", _never)
+    assert db.run_read(_which, read=db.READ_YOUR_WRITES, key="k") == "primary"
+
+
+class _TimingOutAsyncPool:
+    def __init__(self):
+        self.connections_errors = 0
+
+    async def getconn(self, timeout=None):
+        raise PoolTimeout("couldn't get a connection after 1.00 sec")
+
+    def get_stats(self):
+        return {"pool_size": 2, "connections_errors": self.connections_errors}
+
+
+def test_async_acquire_timeout_is_busy_unless_replica_connects_fail(monkeypatch):
+    router = db.ReplicaRouter(max_lag_sec=5, check_interval_sec=60)
+    replica = _TimingOutAsyncPool()
+
+    async def _get_async_replica_pool():
+        return replica
+
+    monkeypatch.setattr(db, "_get_router", lambda: router)
+    monkeypatch.setattr(db, "_get_async_replica_pool", _get_async_replica_pool)
+    monkeypatch.setattr(db, "_async_replica_connect_errors", 0)
+
+    # Saturated: every connection is checked out, none failed to open.
+    assert asyncio.run(db._async_replica_conn(db.READ_ONLY, None)) is None
+    assert router.choose(db.READ_ONLY) is None
+    assert ("base2_api_db_reads_total", "counter", "Routed reads by target and reason", {"target": "primary", "reason": "replica_busy"}, 1) in router.samples()
+
+    # Down: the pool's background connects are failing.
+    replica.connections_errors = 3
+    assert asyncio.run(db._async_replica_conn(db.READ_ONLY, None)) is None
+    assert router.choose(db.READ_ONLY) == "replica_unavailable"
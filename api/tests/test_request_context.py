@@ -0,0 +1,91 @@
+import logging
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from api.logging import AccessLogSampler
+from api.main import app as main_app
+from api.metrics import ApiMetrics
+from api.middleware.request_context import RequestContextMiddleware
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def _app():
+    logger = logging.getLogger("test.request_context")
+    logger.propagate = False
+    handler = _ListHandler()
+    logger.handlers = [handler]
+    logger.setLevel(logging.INFO)
+    metrics = ApiMetrics()
+
+    app = FastAPI()
+
+    @app.get("/ctx/{item}")
+    async def ctx(item: str, request: Request):
+        return {"request_id": request.state.request_id, "tenant_id": getattr(request.state, "tenant_id", None)}
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for i in range(3):
+                yield f"chunk{i}\n".encode()
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    @app.get("/own-id")
+    async def own_id():
+        return JSONResponse({}, headers={"X-Request-Id": "from-route"})
+
+    app.add_middleware(
+        RequestContextMiddleware,
+        logger=logger,
+        metrics=metrics,
+        sampler=AccessLogSampler(exclude_paths=frozenset({"/stream"})),
+    )
+    return app, handler, metrics
+
+
+def test_sets_request_id_tenant_and_logs_once():
+    app, handler, metrics = _app()
+    r = TestClient(app).get("/ctx/1", headers={"X-Request-Id": "rid-123", "X-Tenant-Id": " acme "})
+
+    assert r.status_code == 200
+    assert r.headers["X-Request-Id"] == "rid-123"
+    assert r.json() == {"request_id": "rid-123", "tenant_id": "acme"}
+
+    [record] = handler.records
+    assert record.getMessage() == "request"
+    assert (record.method, record.path, record.status) == ("GET", "/ctx/1", 200)
+    assert 'route="/ctx/{item}"' in metrics.render_prometheus()
+
+
+def test_generates_request_id_and_streams_untouched():
+    app, handler, _metrics = _app()
+    r = TestClient(app).get("/stream")
+
+    assert r.status_code == 200
+    assert r.text == "chunk0\nchunk1\nchunk2\n"
+    assert r.headers["X-Request-Id"]
+    # Excluded from access logs when healthy.
+    assert handler.records == []
+
+
+def test_request_id_header_replaces_one_set_by_the_route():
+    app, _handler, _metrics = _app()
+    r = TestClient(app).get("/own-id", headers={"X-Request-Id": "rid-1"})
+
+    assert r.headers.get_list("X-Request-Id") == ["rid-1"]
+
+
+def test_main_app_echoes_request_id():
+    r = TestClient(main_app).get("/api/health", headers={"X-Request-Id": "abc"})
+    assert r.headers.get("X-Request-Id") == "abc"
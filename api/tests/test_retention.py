@@ -0,0 +1,144 @@
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import api.services.retention as retention
+
+
+class _FakeCursor:
+    def __init__(self, batches):
+        self.batches = list(batches)
+        self.calls = []
+        self._result = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.calls.append((sql, params))
+        if "make_interval" in sql:
+            self._result = [(datetime(2026, 1, 1, tzinfo=timezone.utc),)]
+        else:
+            self._result = [(i,) for i in (self.batches.pop(0) if self.batches else [])]
+
+    def fetchone(self):
+        return self._result[0]
+
+    def fetchall(self):
+        return self._result
+
+
+class _FakeConn:
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.autocommit = False
+
+    def cursor(self):
+        return self._cursor
+
+
+def _fake_db(monkeypatch, batches):
+    cur = _FakeCursor(batches)
+
+    @contextmanager
+    def _db_conn():
+        yield _FakeConn(cur)
+
+    monkeypatch.setattr(retention, "db_conn", _db_conn)
+    return cur
+
+
+_POLICY = retention.RetentionPolicy(table="api_auth_one_time_tokens", predicate="expires_at < %(cutoff)s", days=7)
+
+
+def test_purge_table_walks_keyset_batches_and_sleeps_between(monkeypatch):
+    ids = sorted(str(uuid.uuid4()) for _ in range(5))
+    cur = _fake_db(monkeypatch, [ids[:2], ids[2:4], ids[4:]])
+    sleeps = []
+
+    deleted = retention.purge_table(_POLICY, batch_size=2, max_batches=10, sleep_ms=50, sleep=sleeps.append)
+
+    assert deleted == 5
+    deletes = [params for sql, params in cur.calls if "DELETE" in sql]
+    assert [p["after"] for p in deletes] == [retention._MIN_UUID, ids[1], ids[3]]
+    assert all(p["limit"] == 2 for p in deletes)
+    # The final short batch ends the run; no sleep before the first batch.
+    assert sleeps == [0.05, 0.05]
+
+
+def test_purge_table_stops_at_max_batches(monkeypatch):
+    cur = _fake_db(monkeypatch, [[str(uuid.uuid4())] for _ in range(5)])
+
+    assert retention.purge_table(_POLICY, batch_size=1, max_batches=3, sleep_ms=0) == 3
+    assert len([c for c in cur.calls if "DELETE" in c[0]]) == 3
+
+
+def test_purge_table_disabled_policy_skips_database(monkeypatch):
+    def _boom():
+        raise AssertionError("db should not be used")
+
+    monkeypatch.setattr(retention, "db_conn", _boom)
+    disabled = retention.RetentionPolicy(table="api_auth_audit_events", predicate="created_at < %(cutoff)s", days=0)
+    assert retention.purge_table(disabled) == 0
+
+
+def test_purge_expired_continues_after_a_failing_table(monkeypatch):
+    recorded = []
+
+    def _purge(policy, **_kwargs):
+        if policy.table == "api_auth_refresh_tokens":
+            raise RuntimeError("lock timeout")
+        return 3
+
+    monkeypatch.setattr(retention, "purge_table", _purge)
+    monkeypatch.setattr(retention, "record_deleted", recorded.append)
+
+    totals = retention.purge_expired()
+
+    assert "api_auth_refresh_tokens" not in totals
+    assert totals["api_email_outbox"] == 3
+    assert recorded == [totals]
+
+
+def test_outbox_policy_never_purges_unsent_rows():
+    outbox = {p.table: p for p in retention.policies_from_env()}["api_email_outbox"]
+    assert "status IN ('sent', 'failed')" in outbox.predicate
+
+
+@pytest.mark.integration
+def test_purge_deletes_only_rows_past_retention():
+    from api.db import db_conn
+
+    old = datetime.now(timezone.utc) - timedelta(days=40)
+    old_id, new_id = uuid.uuid4(), uuid.uuid4()
+    with db_conn() as conn:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            for row_id, created in ((old_id, old), (new_id, datetime.now(timezone.utc))):
+                cur.execute(
+                    """
+                    INSERT INTO api_email_outbox(id, to_email, subject, body_text, status, created_at)
+                    VALUES (%s, 'retention@example.com', 's', 'b', 'sent', %s)
+                    """,
+                    (str(row_id), created),
+                )
+
+    policy = retention.RetentionPolicy(
+        table="api_email_outbox",
+        predicate="status IN ('sent', 'failed') AND created_at < %(cutoff)s AND to_email = 'retention@example.com'",
+        days=30,
+    )
+    assert retention.purge_table(policy, batch_size=10, sleep_ms=0) == 1
+
+    with db_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT id FROM api_email_outbox WHERE to_email='retention@example.com'")
+            remaining = {str(r[0]) for r in cur.fetchall()}
+            cur.execute("DELETE FROM api_email_outbox WHERE to_email='retention@example.com'")
+        conn.commit()
+    assert remaining == {str(new_id)}
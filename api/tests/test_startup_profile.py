@@ -0,0 +1,33 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from api.scripts.profile_startup import parse_importtime
+
+_REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+def test_parse_importtime_skips_header_and_noise():
+    stderr = "\n".join(
+        [
+            "import time: self [us] | cumulative | imported package",
+            "import time:       307 |        307 |   _io",
+            "import time:      1176 |     127936 |   celery.result",
+            "some other warning",
+        ]
+    )
+    timings = parse_importtime(stderr)
+    assert [(t.module, t.self_us, t.cumulative_us) for t in timings] == [
+        ("_io", 307, 307),
+        ("celery.result", 1176, 127936),
+    ]
+
+
+def test_lazy_imports_defer_celery_until_first_use():
+    env = {**os.environ, "API_LAZY_IMPORTS": "1"}
+    code = "import sys, api.main; print('celery' in sys.modules, api.main._openapi_doc is None)"
+    proc = subprocess.run(
+        [sys.executable, "-c", code], cwd=_REPO_ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    assert proc.stdout.strip().splitlines()[-1] == "False True"
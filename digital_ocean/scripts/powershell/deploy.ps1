@@ -184,7 +184,7 @@ echo "Rolling back to $PREV"
 git reset --hard "$PREV" || true
 
 # Recreate core services to match the rolled-back code.
-docker compose -f local.docker.yml up -d --build --remove-orphans postgres django api react-app nginx nginx-static traefik redis pgadmin flower celery-worker celery-beat >/root/logs/build/rollback-compose-up.txt 2>&1 || true
+docker compose -f local.docker.yml up -d --build --remove-orphans postgres django api react-app nginx nginx-static traefik redis pgadmin flower celery-worker celery-beat outbox-relay >/root/logs/build/rollback-compose-up.txt 2>&1 || true
 
 echo "Rollback completed. Current HEAD: $(git rev-parse HEAD 2>/dev/null || true)"
 '@
@@ -215,7 +215,7 @@ function Get-ServiceFolderForServiceLog([string]$logFileName) {
     '^postgres$' { return 'database' }
     '^redis$' { return 'database' }
     '^pgadmin$' { return 'database' }
-    '^(celery-worker|celery-beat|flower)$' { return 'celery' }
+    '^(celery-worker|celery-beat|outbox-relay|flower)$' { return 'celery' }
     '^react-app$' { return 'react-app' }
     default { return '' }
   }
@@ -857,7 +857,7 @@ PY
   # Bring up core services needed for edge routing (avoid 502 due to missing upstreams)
   # Also start Celery worker/beat by default (Option A: no profile gating).
   echo "STEP: compose up core $(date -u +"%Y-%m-%dT%H:%M:%SZ")" >> /root/logs/build/steps.txt
-  docker compose -f local.docker.yml up -d --build --remove-orphans postgres django api nginx nginx-static traefik redis pgadmin flower celery-worker celery-beat > /root/logs/build/compose-up-core.txt 2>&1 || true
+  docker compose -f local.docker.yml up -d --build --remove-orphans postgres django api nginx nginx-static traefik redis pgadmin flower celery-worker celery-beat outbox-relay > /root/logs/build/compose-up-core.txt 2>&1 || true
   # Ensure API container uses the freshly built image
   docker compose -f local.docker.yml up -d --build --force-recreate --no-deps api > /root/logs/build/api-up.txt 2>&1 || true
   docker compose -f local.docker.yml up -d --build --force-recreate --no-deps traefik > /root/logs/build/traefik-up.txt 2>&1 || true
@@ -920,6 +920,7 @@ sys.stderr.write(str(status))
 PY
   # Schema compatibility check (fails if migrations unapplied or schema drift)
   set +e
+  docker compose -f local.docker.yml exec -T django python manage.py audit_event_partitions --create-only > /root/logs/audit-event-partitions.txt 2>&1
   docker compose -f local.docker.yml exec -T django python manage.py schema_compat_check --json > /root/logs/schema-compat-check.json 2> /root/logs/schema-compat-check.err
   echo $? > /root/logs/schema-compat-check.status
   set -e
@@ -931,7 +932,7 @@ PY
     docker compose -f local.docker.yml build celery-worker > /root/logs/build/celery-worker-build.txt 2>&1 || true
     docker compose -f local.docker.yml build celery-beat > /root/logs/build/celery-beat-build.txt 2>&1 || true
     # Start Redis, Celery worker and beat under the celery profile; ignore if services not defined
-    docker compose -f local.docker.yml --profile celery up -d --build redis celery-worker celery-beat > /root/logs/build/celery-up.txt 2>&1 || true
+    docker compose -f local.docker.yml --profile celery up -d --build redis celery-worker celery-beat outbox-relay > /root/logs/build/celery-up.txt 2>&1 || true
     # Start Flower if defined
     docker compose -f local.docker.yml up -d --build flower > /root/logs/build/flower-up.txt 2>&1 || true
   fi
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from django.db import migrations
+
+
+def _execute_postgres_statements(schema_editor, statements: list[str]) -> None:
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        for stmt in statements:
+            s = (stmt or "").strip()
+            if not s:
+                continue
+            cursor.execute(s)
+
+
+def create_notify_trigger(apps, schema_editor) -> None:
+    # Wakes the API outbox relay (LISTEN api_email_outbox) when rows are queued.
+    # Statement-level, so a bulk insert sends one notification; NOTIFY is
+    # delivered only if the inserting transaction commits.
+    statements: list[str] = [
+        """
+        CREATE OR REPLACE FUNCTION api_email_outbox_notify() RETURNS trigger AS $$
+        BEGIN
+          PERFORM pg_notify('api_email_outbox', '');
+          RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        "DROP TRIGGER IF EXISTS api_email_outbox_notify_trg ON api_email_outbox",
+        """
+        CREATE TRIGGER api_email_outbox_notify_trg
+        AFTER INSERT ON api_email_outbox
+        FOR EACH STATEMENT EXECUTE FUNCTION api_email_outbox_notify()
+        """,
+    ]
+    _execute_postgres_statements(schema_editor, statements)
+
+
+def drop_notify_trigger(apps, schema_editor) -> None:
+    statements = [
+        "DROP TRIGGER IF EXISTS api_email_outbox_notify_trg ON api_email_outbox",
+        "DROP FUNCTION IF EXISTS api_email_outbox_notify()",
+    ]
+    _execute_postgres_statements(schema_editor, statements)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api_schema", "0001_api_auth_and_outbox_tables"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_notify_trigger, reverse_code=drop_notify_trigger),
+    ]
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from django.db import migrations
+
+
+# Built CONCURRENTLY so a deploy never blocks logins/refreshes on a table lock;
+# that requires running outside a transaction (Migration.atomic = False).
+INDEXES: list[tuple[str, str]] = [
+    # Refresh lookup/rotation by hash (also guarantees hashes never collide).
+    (
+        "uq_api_auth_refresh_tokens_token_hash",
+        "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_api_auth_refresh_tokens_token_hash "
+        "ON api_auth_refresh_tokens (token_hash)",
+    ),
+    # Active sessions per user (list_active_refresh_sessions, revoke-all):
+    # ordered like the query and covering every selected column, so listing
+    # is an index-only scan over live tokens regardless of revoked history.
+    (
+        "idx_api_auth_refresh_tokens_active_by_user",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_api_auth_refresh_tokens_active_by_user "
+        "ON api_auth_refresh_tokens (user_id, last_seen_at DESC, created_at DESC) "
+        "INCLUDE (id, expires_at, user_agent, ip) "
+        "WHERE revoked_at IS NULL",
+    ),
+    # One-time token lookup by (hash, type), covering find_one_time_token.
+    (
+        "uq_api_auth_one_time_tokens_hash_type",
+        "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_api_auth_one_time_tokens_hash_type "
+        "ON api_auth_one_time_tokens (token_hash, type) "
+        "INCLUDE (id, user_id, expires_at, consumed_at)",
+    ),
+    # Unconsumed one-time tokens by expiry (expired-token cleanup).
+    (
+        "idx_api_auth_one_time_tokens_unconsumed_expires",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_api_auth_one_time_tokens_unconsumed_expires "
+        "ON api_auth_one_time_tokens (expires_at) "
+        "WHERE consumed_at IS NULL",
+    ),
+]
+
+# Superseded by the unique indexes above.
+REDUNDANT_INDEXES = [
+    "idx_api_auth_refresh_tokens_token_hash",
+    "idx_api_auth_one_time_tokens_token_hash",
+]
+
+
+def _drop_if_invalid(cursor, name: str) -> None:
+    # An interrupted CONCURRENTLY build leaves an INVALID index behind, which
+    # IF NOT EXISTS would otherwise keep forever.
+    cursor.execute(
+        """
+        SELECT 1
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE c.relname = %s AND NOT i.indisvalid
+        """,
+        [name],
+    )
+    if cursor.fetchone():
+        cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def create_indexes(apps, schema_editor) -> None:
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        for name, stmt in INDEXES:
+            _drop_if_invalid(cursor, name)
+            cursor.execute(stmt)
+        for name in REDUNDANT_INDEXES:
+            cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def drop_indexes(apps, schema_editor) -> None:
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_api_auth_refresh_tokens_token_hash "
+            "ON api_auth_refresh_tokens (token_hash)"
+        )
+        cursor.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_api_auth_one_time_tokens_token_hash "
+            "ON api_auth_one_time_tokens (token_hash)"
+        )
+        for name, _stmt in reversed(INDEXES):
+            cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("api_schema", "0002_email_outbox_notify"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, reverse_code=drop_indexes),
+    ]
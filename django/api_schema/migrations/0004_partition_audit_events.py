@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+
+from django.db import migrations, transaction
+
+
+TABLE = "api_auth_audit_events"
+LEGACY = "api_auth_audit_events_unpartitioned"
+# Monthly partitions created ahead of the current month; the
+# audit_event_partitions command keeps this window moving.
+MONTHS_AHEAD = 3
+
+COLUMNS = "id, user_id, action, ip, user_agent, metadata_json, created_at"
+# Rows copied per autocommitted INSERT while backfilling from the legacy table.
+BACKFILL_BATCH = 10000
+
+
+# _add_months and _month_partition_sql are frozen copies of the helpers in
+# common.partitions: a migration must keep doing what it did when it shipped.
+def _add_months(month: date, n: int) -> date:
+    index = month.year * 12 + (month.month - 1) + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _month_partition_sql(month: date) -> str:
+    end = _add_months(month, 1)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {TABLE}_p{month.year:04d}{month.month:02d} "
+        f"PARTITION OF {TABLE} "
+        f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{end.isoformat()} 00:00:00+00')"
+    )
+
+
+def _is_partitioned(cursor) -> bool:
+    cursor.execute("SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(%s)", [TABLE])
+    row = cursor.fetchone()
+    return bool(row and row[0])
+
+
+def _legacy_exists(cursor) -> bool:
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [LEGACY])
+    return bool(cursor.fetchone()[0])
+
+
+def _backfill_from_legacy(cursor) -> None:
+    # Keyset batches over the legacy primary key, each committed on its own,
+    # so no lock is held for the whole copy and a failed run resumes: rows
+    # already copied are skipped by ON CONFLICT.
+    last = "00000000-0000-0000-0000-000000000000"
+    while True:
+        cursor.execute(
+            f"SELECT id FROM {LEGACY} WHERE id > %s ORDER BY id OFFSET %s LIMIT 1",
+            [last, BACKFILL_BATCH - 1],
+        )
+        row = cursor.fetchone()
+        upper = row[0] if row else None
+        if upper is None:
+            cursor.execute(
+                f"INSERT INTO {TABLE} ({COLUMNS}) SELECT {COLUMNS} FROM {LEGACY} "
+                f"WHERE id > %s ON CONFLICT DO NOTHING",
+                [last],
+            )
+            return
+        cursor.execute(
+            f"INSERT INTO {TABLE} ({COLUMNS}) SELECT {COLUMNS} FROM {LEGACY} "
+            f"WHERE id > %s AND id <= %s ON CONFLICT DO NOTHING",
+            [last, upper],
+        )
+        last = upper
+
+
+def _swap_in_partitioned_table(cursor) -> None:
+    cursor.execute(f"ALTER TABLE {TABLE} RENAME TO {LEGACY}")
+    cursor.execute(f"ALTER TABLE {LEGACY} RENAME CONSTRAINT {TABLE}_pkey TO {LEGACY}_pkey")
+    for suffix in ("user_id", "action", "created_at"):
+        cursor.execute(f"DROP INDEX IF EXISTS idx_{TABLE}_{suffix}")
+
+    cursor.execute(
+        f"""
+        CREATE TABLE {TABLE} (
+          id UUID NOT NULL,
+          user_id UUID NULL REFERENCES api_auth_users(id) ON DELETE SET NULL,
+          action TEXT NOT NULL,
+          ip TEXT NOT NULL DEFAULT '',
+          user_agent TEXT NOT NULL DEFAULT '',
+          metadata_json JSONB NOT NULL DEFAULT '{{}}'::jsonb,
+          created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+          PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{TABLE}_user_id ON {TABLE} (user_id)")
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{TABLE}_action ON {TABLE} (action)")
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{TABLE}_created_at ON {TABLE} (created_at)")
+
+    cursor.execute(f"SELECT MIN(created_at) FROM {LEGACY}")
+    oldest = cursor.fetchone()[0]
+    now = datetime.now(timezone.utc)
+    current = date(now.year, now.month, 1)
+    month = current
+    if oldest is not None:
+        oldest = oldest.astimezone(timezone.utc)
+        month = min(current, date(oldest.year, oldest.month, 1))
+    while month <= _add_months(current, MONTHS_AHEAD):
+        cursor.execute(_month_partition_sql(month))
+        month = _add_months(month, 1)
+    # Safety net: inserts keep working even if future partitions were not
+    # created in time. The command moves such rows into their month.
+    cursor.execute(f"CREATE TABLE IF NOT EXISTS {TABLE}_default PARTITION OF {TABLE} DEFAULT")
+
+
+def partition_audit_events(apps, schema_editor) -> None:
+    # Rebuilds the table as PARTITION BY RANGE (created_at), one partition per
+    # UTC month, so old events are removed by dropping a partition instead of
+    # a long DELETE. The primary key must include the partition key, so it
+    # becomes (id, created_at).
+    #
+    # Only the swap runs in a transaction; new events go to the partitioned
+    # table as soon as it commits. Existing rows are then copied in batches
+    # (this migration is not atomic) and the legacy table is dropped last.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            if not _is_partitioned(cursor):
+                _swap_in_partitioned_table(cursor)
+        if _legacy_exists(cursor):
+            _backfill_from_legacy(cursor)
+            cursor.execute(f"DROP TABLE {LEGACY}")
+
+
+def unpartition_audit_events(apps, schema_editor) -> None:
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        if not _is_partitioned(cursor):
+            return
+
+        cursor.execute(f"ALTER TABLE {TABLE} RENAME TO {LEGACY}")
+        for suffix in ("user_id", "action", "created_at"):
+            cursor.execute(f"DROP INDEX IF EXISTS idx_{TABLE}_{suffix}")
+        cursor.execute(f"ALTER TABLE {LEGACY} RENAME CONSTRAINT {TABLE}_pkey TO {LEGACY}_pkey")
+        cursor.execute(
+            f"""
+            CREATE TABLE {TABLE} (
+              id UUID PRIMARY KEY,
+              user_id UUID NULL REFERENCES api_auth_users(id) ON DELETE SET NULL,
+              action TEXT NOT NULL,
+              ip TEXT NOT NULL DEFAULT '',
+              user_agent TEXT NOT NULL DEFAULT '',
+              metadata_json JSONB NOT NULL DEFAULT '{{}}'::jsonb,
+              created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+            )
+            """
+        )
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{TABLE}_user_id ON {TABLE} (user_id)")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{TABLE}_action ON {TABLE} (action)")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{TABLE}_created_at ON {TABLE} (created_at)")
+        cursor.execute(
+            f"INSERT INTO {TABLE} ({COLUMNS}) SELECT {COLUMNS} FROM {LEGACY} ON CONFLICT (id) DO NOTHING"
+        )
+        cursor.execute(f"DROP TABLE {LEGACY} CASCADE")
+
+
+class Migration(migrations.Migration):
+    # The backfill commits batch by batch; see partition_audit_events.
+    atomic = False
+
+    dependencies = [
+        ("api_schema", "0003_auth_token_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_audit_events, reverse_code=unpartition_audit_events),
+    ]
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from django.db import migrations
+
+
+def _execute_postgres_statements(schema_editor, statements: list[str]) -> None:
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        for stmt in statements:
+            s = (stmt or "").strip()
+            if not s:
+                continue
+            cursor.execute(s)
+
+
+def add_outbox_lease(apps, schema_editor) -> None:
+    # The API dispatcher claims rows by setting status='sending' and a lease,
+    # commits, and sends outside any transaction. A row whose lease ran out
+    # (dispatcher crashed mid-batch) is claimable again.
+    statements: list[str] = [
+        "ALTER TABLE api_email_outbox ADD COLUMN IF NOT EXISTS lease_until TIMESTAMPTZ NULL",
+    ]
+    _execute_postgres_statements(schema_editor, statements)
+
+
+def drop_outbox_lease(apps, schema_editor) -> None:
+    statements = [
+        "UPDATE api_email_outbox SET status='queued' WHERE status='sending'",
+        "ALTER TABLE api_email_outbox DROP COLUMN IF EXISTS lease_until",
+    ]
+    _execute_postgres_statements(schema_editor, statements)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api_schema", "0004_partition_audit_events"),
+    ]
+
+    operations = [
+        migrations.RunPython(add_outbox_lease, reverse_code=drop_outbox_lease),
+    ]
@@ -123,6 +123,7 @@ class ApiEmailOutbox(models.Model):
     error = models.TextField(default="", blank=True)
     created_at = models.DateTimeField()
     sent_at = models.DateTimeField(null=True, blank=True)
+    lease_until = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         managed = False
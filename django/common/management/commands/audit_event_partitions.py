@@ -0,0 +1,258 @@
+import json
+import os
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+
+from common.partitions import (
+    AUDIT_EVENTS_TABLE,
+    Partition,
+    add_months,
+    create_partition_sql,
+    default_partition_name,
+    is_partitioned,
+    list_partitions,
+    month_start,
+    partition_name,
+)
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = os.getenv(name)
+    if raw is None or not raw.strip():
+        return default
+    return int(raw)
+
+
+class Command(BaseCommand):
+    help = (
+        "Maintains monthly partitions of api_auth_audit_events: creates upcoming "
+        "months, moves rows out of the default partition, and drops (or detaches) "
+        "months older than the retention window."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database", default="default", help="Database connection name (default: default)"
+        )
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=_env_int("AUDIT_PARTITIONS_MONTHS_AHEAD", 3),
+            help="Monthly partitions to keep created ahead of the current month (default: 3).",
+        )
+        parser.add_argument(
+            "--retain-months",
+            type=int,
+            default=_env_int("AUDIT_EVENTS_RETAIN_MONTHS", 0),
+            help=(
+                "Months kept before the current one; older partitions are removed. "
+                "0 keeps everything (default: 0)."
+            ),
+        )
+        parser.add_argument(
+            "--create-only",
+            action="store_true",
+            help="Only create partitions and empty the default one; never remove a month.",
+        )
+        parser.add_argument(
+            "--detach-only",
+            action="store_true",
+            help=(
+                "Detach expired partitions as standalone tables (for archiving) "
+                "instead of dropping them."
+            ),
+        )
+        parser.add_argument(
+            "--lock-timeout-ms",
+            type=int,
+            default=5000,
+            help=(
+                "Give up on a partition change rather than queue behind "
+                "long-running queries (default: 5000)."
+            ),
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Report planned changes without applying them."
+        )
+        parser.add_argument("--json", action="store_true", help="Output machine-readable JSON.")
+
+    @contextmanager
+    def _short_transaction(self, cursor) -> Iterator[None]:
+        # One short transaction per partition change: lock_timeout bounds how
+        # long writers can queue behind the parent's lock.
+        with transaction.atomic(using=self._database):
+            cursor.execute(f"SET LOCAL lock_timeout = {self._lock_timeout_ms}")
+            yield
+
+    def _default_months(self, cursor) -> list[date]:
+        # Months that currently only have rows in the default partition.
+        cursor.execute(
+            f"""
+            SELECT DISTINCT date_trunc('month', created_at AT TIME ZONE 'UTC')::date
+            FROM {default_partition_name(AUDIT_EVENTS_TABLE)}
+            """
+        )
+        return [r[0] for r in cursor.fetchall()]
+
+    def _create_month(self, cursor, month: date, *, has_default: bool) -> int:
+        """Create one monthly partition; returns rows moved out of the default partition."""
+        parent = AUDIT_EVENTS_TABLE
+        name = partition_name(parent, month)
+        start = f"{month.isoformat()} 00:00:00+00"
+        end = f"{add_months(month, 1).isoformat()} 00:00:00+00"
+        moved = 0
+        if has_default:
+            default = default_partition_name(parent)
+            cursor.execute(
+                f"SELECT COUNT(*) FROM {default} WHERE created_at >= %s AND created_at < %s",
+                [start, end],
+            )
+            moved = int(cursor.fetchone()[0])
+        if not moved:
+            cursor.execute(create_partition_sql(parent, month))
+            return 0
+        # Postgres refuses a new partition whose range has rows in the default
+        # partition, so the default is detached while its rows are moved over.
+        cursor.execute(f"ALTER TABLE {parent} DETACH PARTITION {default}")
+        cursor.execute(create_partition_sql(parent, month, if_not_exists=False))
+        cursor.execute(
+            f"""
+            WITH moved AS (
+                DELETE FROM {default}
+                WHERE created_at >= %s AND created_at < %s
+                RETURNING id, user_id, action, ip, user_agent, metadata_json, created_at
+            )
+            INSERT INTO {name} (id, user_id, action, ip, user_agent, metadata_json, created_at)
+            SELECT id, user_id, action, ip, user_agent, metadata_json, created_at FROM moved
+            """,
+            [start, end],
+        )
+        cursor.execute(f"ALTER TABLE {parent} ATTACH PARTITION {default} DEFAULT")
+        return moved
+
+    def _create_months(
+        self,
+        cursor,
+        partitions: list[Partition],
+        *,
+        current: date,
+        months_ahead: int,
+        oldest_kept: date | None,
+        dry_run: bool,
+    ) -> tuple[list[str], int]:
+        """Create the current and upcoming months plus any month stuck in the default partition."""
+        existing = {p.month for p in partitions if p.month is not None}
+        has_default = any(p.is_default for p in partitions)
+        wanted = {add_months(current, n) for n in range(months_ahead + 1)}
+        if has_default:
+            wanted.update(self._default_months(cursor))
+
+        created: list[str] = []
+        moved = 0
+        for month in sorted(wanted - existing):
+            if oldest_kept is not None and month < oldest_kept:
+                continue  # expired already; leave it for the purge
+            created.append(partition_name(AUDIT_EVENTS_TABLE, month))
+            if dry_run:
+                continue
+            with self._short_transaction(cursor):
+                moved += self._create_month(cursor, month, has_default=has_default)
+        return created, moved
+
+    def _remove_expired(
+        self,
+        cursor,
+        partitions: list[Partition],
+        *,
+        oldest_kept: date,
+        detach_only: bool,
+        dry_run: bool,
+    ) -> list[str]:
+        if any(p.is_default for p in partitions) and not dry_run:
+            cursor.execute(
+                f"DELETE FROM {default_partition_name(AUDIT_EVENTS_TABLE)} WHERE created_at < %s",
+                [f"{oldest_kept.isoformat()} 00:00:00+00"],
+            )
+        removed: list[str] = []
+        for p in partitions:
+            if p.month is None or p.month >= oldest_kept:
+                continue
+            removed.append(p.name)
+            if dry_run:
+                continue
+            with self._short_transaction(cursor):
+                cursor.execute(f"ALTER TABLE {AUDIT_EVENTS_TABLE} DETACH PARTITION {p.name}")
+                if not detach_only:
+                    cursor.execute(f"DROP TABLE {p.name}")
+        return removed
+
+    def _print_report(self, *, payload: dict, json_mode: bool) -> None:
+        if json_mode:
+            self.stdout.write(json.dumps(payload, indent=2, sort_keys=True))
+            return
+        prefix = "audit_event_partitions"
+        if payload["dry_run"]:
+            prefix += " (dry run)"
+        self.stdout.write(
+            f"{prefix}: created {len(payload['created'])}, "
+            f"{'detached' if payload['detach_only'] else 'dropped'} {len(payload['removed'])}, "
+            f"moved {payload['moved_from_default']} rows from default"
+        )
+        for name in payload["created"]:
+            self.stdout.write(f"  + {name}")
+        for name in payload["removed"]:
+            self.stdout.write(f"  - {name}")
+
+    def handle(self, *args: Any, **options: Any):
+        self._database = options["database"]
+        self._lock_timeout_ms = int(options["lock_timeout_ms"])
+        retain_months = 0 if options["create_only"] else max(0, int(options["retain_months"]))
+        detach_only = bool(options["detach_only"])
+        dry_run = bool(options["dry_run"])
+
+        conn = connections[self._database]
+        if conn.vendor != "postgresql":
+            raise CommandError("postgresql_required")
+
+        current = month_start(datetime.now(timezone.utc))
+        oldest_kept = add_months(current, -retain_months) if retain_months else None
+        removed: list[str] = []
+
+        with conn.cursor() as cursor:
+            if not is_partitioned(cursor, AUDIT_EVENTS_TABLE):
+                raise CommandError(f"{AUDIT_EVENTS_TABLE}_not_partitioned (run migrations first)")
+
+            partitions = list_partitions(cursor, AUDIT_EVENTS_TABLE)
+            created, moved_total = self._create_months(
+                cursor,
+                partitions,
+                current=current,
+                months_ahead=max(0, int(options["months_ahead"])),
+                oldest_kept=oldest_kept,
+                dry_run=dry_run,
+            )
+            if oldest_kept is not None:
+                removed = self._remove_expired(
+                    cursor,
+                    partitions,
+                    oldest_kept=oldest_kept,
+                    detach_only=detach_only,
+                    dry_run=dry_run,
+                )
+
+        payload = {
+            "database": self._database,
+            "table": AUDIT_EVENTS_TABLE,
+            "dry_run": dry_run,
+            "detach_only": detach_only,
+            "retain_months": retain_months,
+            "created": created,
+            "removed": removed,
+            "moved_from_default": moved_total,
+        }
+        self._print_report(payload=payload, json_mode=bool(options["json"]))
@@ -6,11 +6,14 @@ from django.core.management.base import BaseCommand, CommandError
 from django.db import connections
 from django.db.migrations.executor import MigrationExecutor
 
+from common.partitions import is_partitioned, partition_coverage
+
 
 class Command(BaseCommand):
     help = (
         "Checks DB schema compatibility after migrations "
-        "(tables exist; no unapplied migrations)."
+        "(tables exist; no unapplied migrations; partitioned tables have "
+        "partitions for the current and upcoming months)."
     )
 
     def add_arguments(self, parser):
@@ -29,6 +32,15 @@ class Command(BaseCommand):
             action="store_true",
             help="Skip per-column checks (table presence only).",
         )
+        parser.add_argument(
+            "--min-future-partitions",
+            type=int,
+            default=1,
+            help=(
+                "Monthly partitions required ahead of the current month on "
+                "partitioned tables (default: 1)."
+            ),
+        )
 
     def _ensure_connection(self, conn) -> None:
         try:
@@ -88,6 +100,37 @@ class Command(BaseCommand):
                 missing_columns[table] = missing
         return missing_tables, missing_columns
 
+    def _collect_partition_issues(
+        self, conn, existing_tables: set[str], *, min_future: int
+    ) -> tuple[dict[str, dict], dict[str, list[str]]]:
+        # A partitioned parent passes the table/column checks even when no
+        # partition accepts today's rows, so coverage is checked separately.
+        partitioned: dict[str, dict] = {}
+        issues: dict[str, list[str]] = {}
+        if conn.vendor != "postgresql":
+            return partitioned, issues
+        models = apps.get_models(include_auto_created=True)
+        tables = sorted({m._meta.db_table for m in models} & existing_tables)
+        try:
+            with conn.cursor() as cursor:
+                for table in tables:
+                    if not is_partitioned(cursor, table):
+                        continue
+                    coverage = partition_coverage(cursor, table)
+                    partitioned[table] = coverage
+                    problems: list[str] = []
+                    if not coverage["covers_current_month"]:
+                        problems.append("no_partition_for_current_month")
+                    if coverage["future_months"] < min_future:
+                        problems.append(f"future_partitions_below_{min_future}")
+                    if problems:
+                        issues[table] = problems
+        except Exception as e:
+            raise CommandError(
+                f"partition_introspection_failed: {e.__class__.__name__}: {e}"
+            ) from e
+        return partitioned, issues
+
     def _print_report(self, *, payload: dict, json_mode: bool) -> None:
         if json_mode:
             self.stdout.write(json.dumps(payload, indent=2, sort_keys=True))
@@ -96,23 +139,29 @@ class Command(BaseCommand):
             self.stdout.write("schema_compat_check: OK")
             return
         self.stdout.write("schema_compat_check: FAIL")
-        if payload["unapplied_migrations"]:
-            self.stdout.write("Unapplied migrations:")
-            for m in payload["unapplied_migrations"]:
-                self.stdout.write(f"  - {m}")
-        if payload["missing_tables"]:
-            self.stdout.write("Missing tables:")
-            for t in payload["missing_tables"]:
-                self.stdout.write(f"  - {t}")
-        if payload["missing_columns"]:
-            self.stdout.write("Missing columns:")
-            for t, cols in payload["missing_columns"].items():
-                self.stdout.write(f"  - {t}: {', '.join(cols)}")
+        self._print_section("Unapplied migrations:", payload["unapplied_migrations"])
+        self._print_section("Missing tables:", payload["missing_tables"])
+        self._print_section(
+            "Missing columns:",
+            [f"{t}: {', '.join(cols)}" for t, cols in payload["missing_columns"].items()],
+        )
+        self._print_section(
+            "Partition issues (run audit_event_partitions):",
+            [f"{t}: {', '.join(problems)}" for t, problems in payload["partition_issues"].items()],
+        )
+
+    def _print_section(self, title: str, lines: list[str]) -> None:
+        if not lines:
+            return
+        self.stdout.write(title)
+        for line in lines:
+            self.stdout.write(f"  - {line}")
 
     def handle(self, *args: Any, **options: Any):
         database = options["database"]
         json_mode = bool(options["json"])
         skip_columns = bool(options["skip_columns"])
+        min_future = max(0, int(options["min_future_partitions"]))
 
         conn = connections[database]
         self._ensure_connection(conn)
@@ -128,7 +177,17 @@ class Command(BaseCommand):
             conn, existing_tables, skip_columns=skip_columns
         )
 
-        ok = (len(unapplied) == 0) and (len(missing_tables) == 0) and (len(missing_columns) == 0)
+        # 3) Partitioned tables: a partition must exist for today's rows and the next months
+        partitioned_tables, partition_issues = self._collect_partition_issues(
+            conn, existing_tables, min_future=min_future
+        )
+
+        ok = (
+            (len(unapplied) == 0)
+            and (len(missing_tables) == 0)
+            and (len(missing_columns) == 0)
+            and (len(partition_issues) == 0)
+        )
 
         payload = {
             "ok": ok,
@@ -136,10 +195,13 @@ class Command(BaseCommand):
             "unapplied_migrations": unapplied,
             "missing_tables": sorted(set(missing_tables)),
             "missing_columns": missing_columns,
+            "partitioned_tables": partitioned_tables,
+            "partition_issues": partition_issues,
             "counts": {
                 "unapplied_migrations": len(unapplied),
                 "missing_tables": len(set(missing_tables)),
                 "tables_with_missing_columns": len(missing_columns),
+                "tables_with_partition_issues": len(partition_issues),
             },
         }
 
@@ -0,0 +1,113 @@
+"""Monthly range partitions for append-only tables (api_auth_audit_events).
+
+Partitions are named `<parent>_pYYYYMM` and cover one UTC calendar month;
+`<parent>_default` catches rows no monthly partition covers yet.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+
+AUDIT_EVENTS_TABLE = "api_auth_audit_events"
+
+_MONTH_SUFFIX = re.compile(r"_p(\d{4})(\d{2})$")
+
+
+@dataclass(frozen=True)
+class Partition:
+    name: str
+    # First day of the month covered; None for the default partition.
+    month: date | None
+    is_default: bool
+
+
+def month_start(value: date | datetime) -> date:
+    if isinstance(value, datetime):
+        value = value.astimezone(timezone.utc) if value.tzinfo else value
+        value = value.date()
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, n: int) -> date:
+    index = month.year * 12 + (month.month - 1) + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(parent: str, month: date) -> str:
+    return f"{parent}_p{month.year:04d}{month.month:02d}"
+
+
+def default_partition_name(parent: str) -> str:
+    return f"{parent}_default"
+
+
+def month_bounds_sql(month: date) -> str:
+    # UTC boundaries, so a month's range never depends on the session time zone.
+    start, end = month, add_months(month, 1)
+    return f"FROM ('{start.isoformat()} 00:00:00+00') TO ('{end.isoformat()} 00:00:00+00')"
+
+
+def create_partition_sql(parent: str, month: date, *, if_not_exists: bool = True) -> str:
+    guard = "IF NOT EXISTS " if if_not_exists else ""
+    return (
+        f"CREATE TABLE {guard}{partition_name(parent, month)} "
+        f"PARTITION OF {parent} FOR VALUES {month_bounds_sql(month)}"
+    )
+
+
+def is_partitioned(cursor, table: str) -> bool:
+    cursor.execute(
+        "SELECT c.relkind = 'p' FROM pg_class c WHERE c.oid = to_regclass(%s)",
+        [table],
+    )
+    row = cursor.fetchone()
+    return bool(row and row[0])
+
+
+def list_partitions(cursor, parent: str) -> list[Partition]:
+    cursor.execute(
+        """
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) = 'DEFAULT'
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(%s)
+        ORDER BY c.relname
+        """,
+        [parent],
+    )
+    partitions: list[Partition] = []
+    for name, is_default in cursor.fetchall():
+        month = None
+        m = _MONTH_SUFFIX.search(name)
+        if m and not is_default:
+            month = date(int(m.group(1)), int(m.group(2)), 1)
+        partitions.append(Partition(name=name, month=month, is_default=bool(is_default)))
+    return partitions
+
+
+def partition_coverage(cursor, parent: str, *, today: date | None = None) -> dict:
+    """Summary used by schema_compat_check.
+
+    Reports whether a monthly partition covers the current month, and how far ahead.
+    """
+    current = month_start(today or datetime.now(timezone.utc))
+    partitions = list_partitions(cursor, parent)
+    months = {p.month for p in partitions if p.month is not None}
+    ahead = 0
+    while add_months(current, ahead + 1) in months:
+        ahead += 1
+    default_rows = 0
+    if any(p.is_default for p in partitions):
+        cursor.execute(f"SELECT COUNT(*) FROM {default_partition_name(parent)}")
+        default_rows = int(cursor.fetchone()[0])
+    return {
+        "partitions": len(months),
+        "has_default": any(p.is_default for p in partitions),
+        "default_rows": default_rows,
+        "covers_current_month": current in months,
+        "future_months": ahead,
+        "oldest": min(months).isoformat() if months else None,
+        "newest": max(months).isoformat() if months else None,
+    }
@@ -21,6 +21,12 @@ wait_for_db
 
 python manage.py migrate --noinput
 
+# Keep monthly audit partitions ahead of time; rows still land in the default
+# partition if this fails, so it must not block startup. Retention (dropping
+# old months) is the audit-partitions service's job, never a side effect of a
+# restart.
+python manage.py audit_event_partitions --create-only || echo "[entrypoint] audit_event_partitions failed" >&2
+
 python manage.py collectstatic --noinput
 
 python -m project.create_superuser || true
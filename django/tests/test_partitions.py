@@ -0,0 +1,41 @@
+from datetime import date, datetime, timedelta, timezone
+
+from common.partitions import (
+    add_months,
+    create_partition_sql,
+    month_bounds_sql,
+    month_start,
+    partition_name,
+)
+
+
+def test_add_months_crosses_year_boundaries():
+    assert add_months(date(2026, 11, 1), 2) == date(2027, 1, 1)
+    assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+    assert add_months(date(2026, 6, 1), -12) == date(2025, 6, 1)
+
+
+def test_month_start_uses_utc():
+    # 2026-03-01 00:30 at UTC+02:00 is still February in UTC.
+    local = datetime(2026, 3, 1, 0, 30, tzinfo=timezone(timedelta(hours=2)))
+    assert month_start(local) == date(2026, 2, 1)
+
+
+def test_partition_name_and_bounds():
+    month = date(2026, 12, 1)
+    assert partition_name("api_auth_audit_events", month) == "api_auth_audit_events_p202612"
+    assert month_bounds_sql(month) == (
+        "FROM ('2026-12-01 00:00:00+00') TO ('2027-01-01 00:00:00+00')"
+    )
+
+
+def test_create_partition_sql():
+    month = date(2026, 12, 1)
+    assert create_partition_sql("api_auth_audit_events", month) == (
+        "CREATE TABLE IF NOT EXISTS api_auth_audit_events_p202612 "
+        "PARTITION OF api_auth_audit_events FOR VALUES "
+        "FROM ('2026-12-01 00:00:00+00') TO ('2027-01-01 00:00:00+00')"
+    )
+    assert create_partition_sql("t", month, if_not_exists=False).startswith(
+        "CREATE TABLE t_p202612 PARTITION OF t"
+    )